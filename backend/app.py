@@ -1,18 +1,52 @@
 """
 Simple River Flood Prediction API for College Project
 """
+import os
 import json
 import time
+import asyncio
 import logging
+import functools
+import contextvars
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
-import numpy as np
-import pandas as pd
-import tensorflow as tf
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
 from enum import Enum
+from startup_profiler import StartupProfiler
+
+# Created first so every import and load phase below is timed
+startup_profiler = StartupProfiler()
+
+with startup_profiler.phase("import numpy"):
+    import numpy as np
+
+with startup_profiler.phase("import fastapi/pydantic"):
+    from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Depends, Request, BackgroundTasks
+    from fastapi.responses import StreamingResponse, Response, PlainTextResponse, JSONResponse
+    from fastapi.routing import APIRoute
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, Field, ValidationError
+
+with startup_profiler.phase("import inference modules"):
+    from inference_scheduler import InferenceScheduler
+    from feature_pipeline import (
+        FeaturePipeline, REQUEST_FIELDS, LAND_COVER_CODES, SOIL_TYPE_CODES, FIELD_BOUNDS, resolve_params_path
+    )
+    from prediction_cache import PredictionCache, SQLiteCacheBackend
+    from model_registry import ModelRegistry, ModelEntry
+    from model_comparison import ModelComparison
+    from risk_grid import RiskGridEngine, bounds_from_params, scenario_key
+    from sensitivity import SWEEPABLE_FIELDS, axis_values, sweep
+    from uncertainty import DEFAULT_SENSOR_ERRORS, monte_carlo, parse_sensor_errors
+    from attribution import ATTRIBUTION_METHODS, training_baseline, explain, by_field
+    from wire_format import (
+        MEDIA_TYPE as WIRE_MEDIA_TYPE, MAX_REPORTED_ROWS, decode as decode_wire, encode as encode_wire, validate_columns,
+        declared_rows, payload_size
+    )
+    from spatial_index import SpatialIndex, CONTEXT_COLUMNS
+    from drift_monitor import DriftMonitor, DriftReference
+    from scoring_jobs import JobManager, progress as job_progress
+    from metrics import MetricsRegistry, process_rss_bytes
+    from sampling_profiler import SamplingProfiler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -37,19 +71,20 @@ class SoilType(str, Enum):
     SILT = "Silt"
 
 class FloodPredictionRequest(BaseModel):
-    latitude: float = Field(..., ge=-90, le=90)
-    longitude: float = Field(..., ge=-180, le=180)
-    elevation: float = Field(..., ge=0, le=10000)
-    rainfall: float = Field(..., ge=0, le=1000)
-    temperature: float = Field(..., ge=-50, le=60)
-    humidity: float = Field(..., ge=0, le=100)
-    river_discharge: float = Field(..., ge=0, le=10000)
-    water_level: float = Field(..., ge=0, le=50)
+    latitude: float = Field(..., **FIELD_BOUNDS['latitude'])
+    longitude: float = Field(..., **FIELD_BOUNDS['longitude'])
+    elevation: float = Field(..., **FIELD_BOUNDS['elevation'])
+    rainfall: float = Field(..., **FIELD_BOUNDS['rainfall'])
+    temperature: float = Field(..., **FIELD_BOUNDS['temperature'])
+    humidity: float = Field(..., **FIELD_BOUNDS['humidity'])
+    river_discharge: float = Field(..., **FIELD_BOUNDS['river_discharge'])
+    water_level: float = Field(..., **FIELD_BOUNDS['water_level'])
     land_cover: LandCoverType
     soil_type: SoilType
-    population_density: float = Field(..., ge=0, le=50000)
-    infrastructure: int = Field(..., ge=0, le=1)
-    historical_floods: int = Field(..., ge=0, le=1)
+    # Filled from nearby historical records when omitted
+    population_density: Optional[float] = Field(None, **FIELD_BOUNDS['population_density'])
+    infrastructure: int = Field(..., **FIELD_BOUNDS['infrastructure'])
+    historical_floods: Optional[int] = Field(None, **FIELD_BOUNDS['historical_floods'])
 
 class FloodPredictionResponse(BaseModel):
     prediction: int = Field(..., description="0: No flood, 1: Flood")
@@ -57,6 +92,226 @@ class FloodPredictionResponse(BaseModel):
     confidence: str = Field(..., description="Low, Medium, High")
     model_used: str
     processing_time: float
+    context_filled: Optional[Dict[str, float]] = Field(None, description="Fields estimated from nearby records")
+
+class BatchPredictionRequest(BaseModel):
+    # Rows are validated one by one so a bad row does not reject the batch
+    predictions: List[Dict[str, Any]]
+
+class BatchPredictionResult(BaseModel):
+    index: int
+    prediction: Optional[int] = None
+    probability: Optional[float] = None
+    confidence: Optional[str] = None
+    context_filled: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[BatchPredictionResult]
+    total_processed: int
+    total_failed: int
+    model_used: str
+    processing_time: float
+
+class GridScenario(BaseModel):
+    # Every feature except latitude/longitude; defaults are the dataset medians
+    elevation: float = Field(4400.0, ge=0, le=10000)
+    rainfall: float = Field(150.0, ge=0, le=1000)
+    temperature: float = Field(30.0, ge=-50, le=60)
+    humidity: float = Field(60.0, ge=0, le=100)
+    river_discharge: float = Field(2500.0, ge=0, le=10000)
+    water_level: float = Field(5.0, ge=0, le=50)
+    land_cover: LandCoverType = LandCoverType.AGRICULTURAL
+    soil_type: SoilType = SoilType.LOAM
+    population_density: float = Field(5000.0, ge=0, le=50000)
+    infrastructure: int = Field(1, ge=0, le=1)
+    historical_floods: int = Field(0, ge=0, le=1)
+
+class UncertaintyOptions(BaseModel):
+    samples: Optional[int] = Field(None, ge=2, description="Monte Carlo samples (default UNCERTAINTY_SAMPLES)")
+    interval: float = Field(0.9, gt=0, lt=1, description="Central credible interval")
+    mc_dropout: bool = Field(True, description="Keep dropout active while sampling")
+    # Relative 1-sigma sensor errors; defaults from UNCERTAINTY_SENSOR_ERRORS
+    rainfall_error: Optional[float] = Field(None, ge=0, le=1)
+    water_level_error: Optional[float] = Field(None, ge=0, le=1)
+    river_discharge_error: Optional[float] = Field(None, ge=0, le=1)
+    seed: Optional[int] = Field(None, description="Fix the random draws for reproducible results")
+
+class UncertaintyResponse(BaseModel):
+    prediction: int = Field(..., description="0: No flood, 1: Flood (from the mean)")
+    probability: float = Field(..., ge=0, le=1, description="Mean of the sampled probabilities")
+    std: float
+    interval: float
+    interval_lower: float
+    interval_upper: float
+    flood_fraction: float = Field(..., description="Share of samples above 0.5")
+    deterministic_probability: float = Field(..., description="Plain prediction without sampling")
+    confidence: str
+    samples: int
+    mc_dropout: bool
+    sensor_errors: Dict[str, float]
+    model_used: str
+    processing_time: float
+    context_filled: Optional[Dict[str, float]] = None
+
+class FeatureExplanation(BaseModel):
+    prediction: int = Field(..., description="0: No flood, 1: Flood")
+    probability: float = Field(..., ge=0, le=1)
+    # Change in probability from setting each feature to its training mean (positive: raises risk)
+    contributions: Optional[Dict[str, float]] = None
+    # Input gradient times the offset from the training mean, per feature
+    gradient_x_input: Optional[Dict[str, float]] = None
+    top_features: List[str] = Field(..., description="Features by decreasing absolute attribution")
+    context_filled: Optional[Dict[str, float]] = None
+
+class ExplanationResponse(FeatureExplanation):
+    baseline_probability: float = Field(..., description="Probability at the training means")
+    baseline: Dict[str, float]
+    method: str
+    model_used: str
+    processing_time: float
+
+class BatchExplanationResponse(BaseModel):
+    explanations: List[FeatureExplanation]
+    baseline_probability: float
+    baseline: Dict[str, float]
+    method: str
+    model_used: str
+    processing_time: float
+
+class SweepAxis(BaseModel):
+    feature: str = Field(..., description="Continuous request field to vary, e.g. rainfall")
+    # Both ends default to the field's bounds on FloodPredictionRequest
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: int = Field(101, ge=2, le=100000)
+
+class SweepRequest(BaseModel):
+    base: FloodPredictionRequest
+    axes: List[SweepAxis] = Field(..., min_length=1, max_length=2)
+    threshold: float = Field(0.5, gt=0, lt=1)
+
+# Upper bound on rows accepted by /predict/batch
+MAX_BATCH_SIZE = 10000
+
+# Binary columnar /predict/columnar: most rows per payload, rows per forward pass
+COLUMNAR_MAX_ROWS = int(os.getenv("COLUMNAR_MAX_ROWS", "1000000"))
+COLUMNAR_CHUNK_ROWS = 65536
+
+# Micro-batching of concurrent /predict calls
+SCHEDULER_MAX_BATCH_SIZE = int(os.getenv("SCHEDULER_MAX_BATCH_SIZE", "64"))
+SCHEDULER_MAX_WAIT_MS = float(os.getenv("SCHEDULER_MAX_WAIT_MS", "2.0"))
+
+# "numpy" serves the exported .npz models without TensorFlow; "keras" forces Keras
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "numpy")
+
+# Serve best_model.float16.npz / best_model.int8.npz (from quantize_models.py) where present
+MODEL_WEIGHT_FORMAT = os.getenv("MODEL_WEIGHT_FORMAT", "float32")
+
+# Min-max parameters: a Normalized_param.json file, or a directory of versioned
+# Normalized_param.vN.json files (from streaming_stats.py) of which the newest is used
+NORMALIZATION_PARAMS = os.getenv("NORMALIZATION_PARAMS", "Normalized_param.json")
+
+# Model served when a request does not select one (production, base, v1 ... v7, v4.1)
+DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "production")
+
+# Candidate models scored on default-model traffic: ensemble members are averaged
+# into the response, shadow models are only compared (comma-separated names)
+ENSEMBLE_MODELS = [name.strip() for name in os.getenv("ENSEMBLE_MODELS", "").split(",") if name.strip()]
+SHADOW_MODELS = [name.strip() for name in os.getenv("SHADOW_MODELS", "").split(",") if name.strip()]
+COMPARISON_WORKERS = int(os.getenv("COMPARISON_WORKERS", "0")) or None
+SHADOW_LOG_PATH = os.getenv("SHADOW_LOG_PATH")
+
+# Flood-risk grid tiles for the map heatmap
+GRID_TILE_SIZE = int(os.getenv("GRID_TILE_SIZE", "64"))
+GRID_CACHE_TILES = int(os.getenv("GRID_CACHE_TILES", "2048"))
+GRID_MAX_CELLS = int(os.getenv("GRID_MAX_CELLS", "1000000"))
+
+# Monte Carlo samples for /predict/uncertainty, and the relative sensor errors
+# applied to the readings (field=fraction, comma-separated)
+UNCERTAINTY_SAMPLES = int(os.getenv("UNCERTAINTY_SAMPLES", "200"))
+UNCERTAINTY_MAX_SAMPLES = int(os.getenv("UNCERTAINTY_MAX_SAMPLES", "10000"))
+UNCERTAINTY_SENSOR_ERRORS = os.getenv(
+    "UNCERTAINTY_SENSOR_ERRORS", ",".join(f"{field}={error}" for field, error in DEFAULT_SENSOR_ERRORS.items())
+)
+
+# Normalized dataset whose training-split means are the /predict/explain baseline
+# (only read when Standardized_param.json, which holds those means, is missing)
+EXPLAIN_BASELINE_DATASET = os.getenv("EXPLAIN_BASELINE_DATASET", "../mapped_dataset_Normalized_version.csv")
+
+# Upper bound on the variants scored by one /predict/sweep
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "250000"))
+
+# Historical records used to fill omitted context fields and to answer /nearby
+SPATIAL_INDEX_CSV = os.getenv("SPATIAL_INDEX_CSV", "../flood_risk_dataset_india.csv")
+SPATIAL_INDEX_PATH = os.getenv("SPATIAL_INDEX_PATH", "spatial_index.pkl")
+CONTEXT_NEIGHBORS = int(os.getenv("CONTEXT_NEIGHBORS", "5"))
+CONTEXT_MAX_KM = float(os.getenv("CONTEXT_MAX_KM", "50"))
+
+# Input drift monitoring: reference dataset (bins saved to DRIFT_REFERENCE_PATH),
+# quantile bins per continuous feature, the recent window as DRIFT_WINDOWS slots of
+# DRIFT_WINDOW_SECONDS, and the samples a feature needs before it is rated
+DRIFT_REFERENCE_CSV = os.getenv("DRIFT_REFERENCE_CSV", "../flood_risk_dataset_india.csv")
+DRIFT_REFERENCE_PATH = os.getenv("DRIFT_REFERENCE_PATH", "drift_reference.json")
+DRIFT_BINS = int(os.getenv("DRIFT_BINS", "20"))
+DRIFT_WINDOW_SECONDS = float(os.getenv("DRIFT_WINDOW_SECONDS", "300"))
+DRIFT_WINDOWS = int(os.getenv("DRIFT_WINDOWS", "12"))
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+
+# Prediction cache (PREDICTION_CACHE_SIZE=0 disables it)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+PREDICTION_CACHE_PRECISION = int(os.getenv("PREDICTION_CACHE_PRECISION", "4"))
+PREDICTION_CACHE_SHARED_PATH = os.getenv("PREDICTION_CACHE_SHARED_PATH")
+PREDICTION_CACHE_SHARED_MAX_ROWS = int(os.getenv("PREDICTION_CACHE_SHARED_MAX_ROWS", "100000"))
+
+# Background scoring jobs (/jobs): store directory, jobs running at once across all
+# workers, pending-job limit and the CPU niceness of job processes
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "1"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+JOB_NICE = int(os.getenv("JOB_NICE", "10"))
+
+# Expose /debug/profiler/* to start and stop the sampling profiler at runtime
+PROFILER_ENDPOINTS = os.getenv("PROFILER_ENDPOINTS", "0") == "1"
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+metrics = MetricsRegistry()
+REQUESTS_TOTAL = metrics.counter(
+    "flood_api_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+REQUEST_ERRORS_TOTAL = metrics.counter(
+    "flood_api_request_errors_total", "HTTP requests answered with a 4xx/5xx status", ["route", "status"]
+)
+REQUEST_SECONDS = metrics.histogram(
+    "flood_api_request_seconds", "Route handler latency", ["route"]
+)
+# validation: body read, JSON parse and pydantic; endpoint: handler body;
+# serialization: response_model validation and JSON encoding
+REQUEST_STAGE_SECONDS = metrics.histogram(
+    "flood_api_request_stage_seconds", "Route handler latency by stage", ["route", "stage"]
+)
+MODEL_STAGE_SECONDS = metrics.histogram(
+    "flood_api_model_stage_seconds",
+    "Prediction latency by stage (preprocess, cache_lookup, inference incl. batching wait, forward_pass)",
+    ["stage"]
+)
+
+profiler = SamplingProfiler()
+jobs = JobManager(JOBS_DIR, max_running=JOB_CONCURRENCY, max_queued=JOB_MAX_QUEUED, nice=JOB_NICE)
+
+def _timed_predict_fn(predict_fn):
+    """Record the duration of every forward pass (one per micro-batch)"""
+    def predict(features: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+        try:
+            return predict_fn(features)
+        finally:
+            MODEL_STAGE_SECONDS.observe(time.perf_counter() - start, "forward_pass")
+    return predict
 
 # =============================================================================
 # MODEL SERVICE
@@ -64,123 +319,342 @@ class FloodPredictionResponse(BaseModel):
 
 class ModelService:
     def __init__(self):
-        self.model = None
-        self.normalization_params = None
         self.model_loaded = False
+        self.loading_state = "pending"
+        self.pipeline = FeaturePipeline.identity()
+        self.registry = ModelRegistry(
+            project_root=Path(".."),
+            models_dir=Path("models"),
+            engine=INFERENCE_ENGINE,
+            weight_format=MODEL_WEIGHT_FORMAT,
+            default_model=DEFAULT_MODEL
+        )
+        # One micro-batching scheduler per loaded model version (or model combination)
+        self.schedulers: Dict[str, InferenceScheduler] = {}
+        self.comparison: Optional[ModelComparison] = None
+        if ENSEMBLE_MODELS or SHADOW_MODELS:
+            self.comparison = ModelComparison(
+                ensemble=ENSEMBLE_MODELS,
+                shadows=SHADOW_MODELS,
+                max_workers=COMPARISON_WORKERS,
+                log_path=SHADOW_LOG_PATH
+            )
+        self.cache: Optional[PredictionCache] = None
+        if PREDICTION_CACHE_SIZE > 0:
+            self.cache = PredictionCache(
+                max_entries=PREDICTION_CACHE_SIZE,
+                ttl_seconds=PREDICTION_CACHE_TTL,
+                precision=PREDICTION_CACHE_PRECISION,
+                shared_backend=SQLiteCacheBackend(
+                    PREDICTION_CACHE_SHARED_PATH, max_rows=PREDICTION_CACHE_SHARED_MAX_ROWS
+                ) if PREDICTION_CACHE_SHARED_PATH else None
+            )
         
-        # Feature mappings
-        self.land_cover_mapping = {
-            LandCoverType.WATER_BODY: 1,
-            LandCoverType.FOREST: 2,
-            LandCoverType.AGRICULTURAL: 3,
-            LandCoverType.DESERT: 4,
-            LandCoverType.URBAN: 5
-        }
-        
-        self.soil_type_mapping = {
-            SoilType.CLAY: 1,
-            SoilType.PEAT: 2,
-            SoilType.LOAM: 3,
-            SoilType.SANDY: 4,
-            SoilType.SILT: 5
-        }
+        self.grid = RiskGridEngine(tile_size=GRID_TILE_SIZE, cache_tiles=GRID_CACHE_TILES)
+        self.spatial_index: Optional[SpatialIndex] = None
+        # Live request features against the training data; idle until the reference loads
+        self.drift = DriftMonitor(
+            window_seconds=DRIFT_WINDOW_SECONDS,
+            windows=DRIFT_WINDOWS,
+            min_samples=DRIFT_MIN_SAMPLES
+        )
+        # Raw training means that /predict/explain attributes against
+        self.baseline: Optional[np.ndarray] = None
         
-        self.feature_order = [
-            'latitude', 'longitude', 'rainfall', 'temperature', 'humidity',
-            'river_discharge', 'water_level', 'elevation', 'land_cover',
-            'soil_type', 'population_density', 'infrastructure', 'historical_floods'
-        ]
+        self.feature_order = list(REQUEST_FIELDS)
+    
+    @property
+    def model(self):
+        """The default model (for callers that do not select one)"""
+        return self.registry.get().model
+    
+    @property
+    def engine(self) -> Optional[str]:
+        return self.registry.get().engine if self.registry.loaded else None
+    
+    def get_model(self, name: Optional[str] = None) -> ModelEntry:
+        """Resolve a model once per request so a reload cannot swap it mid-flight"""
+        return self.registry.get(name)
     
     async def load_model(self) -> bool:
-        """Load the trained model and normalization parameters"""
+        """Load the model in a worker thread so the event loop keeps serving"""
+        self.loading_state = "loading"
+        loop = asyncio.get_running_loop()
+        success = await loop.run_in_executor(None, self._load_model_blocking)
+        self.loading_state = "ready" if success else "failed"
+        return success
+    
+    def preload(self) -> bool:
+        """Load synchronously before forking workers (serve.py), so they share the weights"""
+        self.loading_state = "loading"
+        success = self._load_model_blocking()
+        self.loading_state = "ready" if success else "failed"
+        return success
+    
+    def _load_model_blocking(self) -> bool:
+        """Load the feature pipeline and every model variant"""
         try:
-            # Load normalization parameters
-            params_path = Path("Normalized_param.json")
-            if params_path.exists():
-                with open(params_path, 'r') as f:
-                    self.normalization_params = json.load(f)
-                logger.info("Normalization parameters loaded")
+            with startup_profiler.phase("compile feature pipeline"):
+                self._load_pipeline()
             
-            # Load neural network model with custom objects
-            model_paths = [
-                Path("models/best_model.keras"),
-                Path("../Neural Network Classifier0/Neural Network Classifier_v7/best_model.keras"),
-                Path("../Neural Network Classifier/best_model.keras")
-            ]
+            with startup_profiler.phase("load spatial index"):
+                self._load_spatial_index()
             
-            for model_path in model_paths:
-                if model_path.exists():
-                    try:
-                        # Try loading with custom objects to handle compatibility
-                        self.model = tf.keras.models.load_model(
-                            str(model_path), 
-                            custom_objects=None,
-                            compile=False
-                        )
-                        logger.info(f"Model loaded from: {model_path}")
-                        self.model_loaded = True
-                        return True
-                    except Exception as model_error:
-                        logger.warning(f"Failed to load model from {model_path}: {str(model_error)}")
-                        continue
+            with startup_profiler.phase("load drift reference"):
+                self._load_drift_reference()
             
-            logger.warning("Model not found or could not be loaded")
-            return False
+            with startup_profiler.phase("load model registry"):
+                summary = self.registry.reload()
+            
+            if not self.registry.loaded:
+                logger.warning("Model not found or could not be loaded")
+                return False
+            
+            logger.info(f"Models loaded: {', '.join(summary['models'])} (default: {self.registry.default_name})")
+            if self.cache is not None:
+                self.cache.set_model_version(self._cache_version())
+            self.model_loaded = True
+            return True
             
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             return False
     
+    def _load_pipeline(self):
+        """Compile the normalization and standardization into one pipeline"""
+        normalization_path = resolve_params_path(NORMALIZATION_PARAMS)
+        self.pipeline = FeaturePipeline.from_files(normalization_path, "Standardized_param.json")
+        logger.info(f"Feature pipeline compiled: {self.pipeline.metadata}")
+        self.baseline = training_baseline(normalization_path, "Standardized_param.json", EXPLAIN_BASELINE_DATASET)
+        if self.baseline is None:
+            logger.warning("No training means found; explanations are disabled")
+        if normalization_path and os.path.exists(normalization_path):
+            with open(normalization_path, 'r') as f:
+                self.grid.bounds = bounds_from_params(json.load(f))
+    
+    def _cache_version(self) -> str:
+        """Cached probabilities depend on both the models and the scaling parameters"""
+        metadata = self.pipeline.metadata
+        return f"{self.registry.version}|{metadata.get('normalization_path')}:{metadata.get('normalization_version')}"
+    
+    def _load_spatial_index(self):
+        """Build (or load the serialized) index of historical records; optional"""
+        if not os.path.exists(SPATIAL_INDEX_CSV):
+            logger.warning(f"Historical dataset {SPATIAL_INDEX_CSV} not found; context enrichment disabled")
+            return
+        try:
+            self.spatial_index = SpatialIndex.load_or_build(SPATIAL_INDEX_CSV, SPATIAL_INDEX_PATH)
+            logger.info(f"Spatial index ready: {len(self.spatial_index)} historical records")
+        except Exception as e:
+            logger.warning(f"Could not build spatial index: {str(e)}")
+    
+    def _load_drift_reference(self):
+        """Reference bins for drift monitoring, built from the training dataset; optional"""
+        if not os.path.exists(DRIFT_REFERENCE_CSV):
+            logger.warning(f"Training dataset {DRIFT_REFERENCE_CSV} not found; drift monitoring disabled")
+            return
+        try:
+            self.drift.set_reference(DriftReference.load_or_build(DRIFT_REFERENCE_CSV, DRIFT_REFERENCE_PATH, DRIFT_BINS))
+            logger.info(f"Drift reference ready: {self.drift.reference.rows} training rows")
+        except Exception as e:
+            logger.warning(f"Could not build drift reference: {str(e)}")
+    
+    def fill_context(self, request: FloodPredictionRequest) -> Tuple[FloodPredictionRequest, Optional[Dict[str, float]]]:
+        """Fill omitted context fields from the nearest historical records.
+        
+        Raises ValueError if a field is missing and cannot be estimated.
+        """
+        missing = [field for field in CONTEXT_COLUMNS if getattr(request, field) is None]
+        if not missing:
+            return request, None
+        if self.spatial_index is None:
+            raise ValueError(f"Missing {', '.join(missing)} and no historical records are loaded to fill them")
+        
+        filled = self.spatial_index.fill_context(
+            request.latitude, request.longitude, missing, k=CONTEXT_NEIGHBORS, max_km=CONTEXT_MAX_KM
+        )
+        return request.model_copy(update=filled), filled
+    
+    async def reload_models(self) -> Dict[str, Any]:
+        """Hot-reload changed models without blocking requests in flight"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._load_pipeline)
+        summary = await loop.run_in_executor(None, self.registry.reload)
+        if self.cache is not None:
+            await loop.run_in_executor(None, self.cache.set_model_version, self._cache_version())
+        self.grid.clear()
+        
+        # Retire schedulers of replaced models once their queues drain
+        current = {entry.version for entry in self.registry.entries()}
+        for key in [k for k in self.schedulers if not set(k.split("+")) - {"shadow"} <= current]:
+            scheduler = self.schedulers.pop(key)
+            asyncio.create_task(scheduler.stop(drain=True))
+        
+        self.model_loaded = self.registry.loaded
+        logger.info(f"Models reloaded: {summary}")
+        return summary
+    
     def _preprocess_data(self, request: FloodPredictionRequest) -> np.ndarray:
         """Preprocess input data for prediction"""
-        # Convert to dictionary
-        data_dict = request.dict()
-        
-        # Map categorical variables
-        data_dict['land_cover'] = self.land_cover_mapping[data_dict['land_cover']]
-        data_dict['soil_type'] = self.soil_type_mapping[data_dict['soil_type']]
-        
-        # Create feature array
-        features = np.array([data_dict[feature] for feature in self.feature_order])
-        
-        # Normalize if parameters available
-        if self.normalization_params:
-            normalized_features = np.zeros_like(features)
-            for i, feature in enumerate(self.feature_order):
-                if feature in self.normalization_params:
-                    min_val = self.normalization_params[feature]['min']
-                    max_val = self.normalization_params[feature]['max']
-                    if max_val - min_val != 0:
-                        normalized_features[i] = (features[i] - min_val) / (max_val - min_val)
-                    else:
-                        normalized_features[i] = 0.0
-                else:
-                    normalized_features[i] = features[i]
-            features = normalized_features
-        
-        return features.reshape(1, -1)
-    
-    async def predict(self, request: FloodPredictionRequest) -> Tuple[int, float, str]:
+        return self._preprocess_batch([request])
+    
+    def _preprocess_batch(self, requests: List[FloodPredictionRequest]) -> np.ndarray:
+        """Encode and scale many requests into one (N, 13) float32 matrix"""
+        return self.pipeline.transform_requests(requests)
+    
+    @staticmethod
+    def _confidence_label(probability: float) -> str:
+        """Map a flood probability to a Low/Medium/High confidence label"""
+        if probability > 0.8 or probability < 0.2:
+            return "High"
+        elif probability > 0.6 or probability < 0.4:
+            return "Medium"
+        return "Low"
+    
+    def _predict_matrix(self, features: np.ndarray, entry: Optional[ModelEntry] = None) -> np.ndarray:
+        """Run one blocking forward pass over an (N, 13) matrix"""
+        return (entry or self.registry.get()).predict(features)
+    
+    def _candidates(self, names: List[str], primary: ModelEntry) -> List[ModelEntry]:
+        entries = []
+        for name in names:
+            try:
+                entry = self.registry.get(name)
+            except KeyError:
+                continue
+            if entry.version != primary.version:
+                entries.append(entry)
+        return entries
+    
+    def _predictor_for(self, entry: ModelEntry, compare: bool = False):
+        """Key and blocking predict function for a model, plus its ensemble/shadow candidates"""
+        if not compare or self.comparison is None:
+            return entry.version, entry.predict
+        
+        ensemble = self._candidates(self.comparison.ensemble, entry)
+        shadows = self._candidates(self.comparison.shadows, entry)
+        if not ensemble and not shadows:
+            return entry.version, entry.predict
+        key = "+".join([entry.version] + [e.version for e in ensemble] + ["shadow"] + [e.version for e in shadows])
+        return key, self.comparison.predict_fn(entry, ensemble, shadows)
+    
+    def display_name(self, entry: ModelEntry, compare: bool = False) -> str:
+        """model_used label, naming the ensemble members when they are averaged in"""
+        if not compare or self.comparison is None:
+            return entry.display_name
+        ensemble = self._candidates(self.comparison.ensemble, entry)
+        if not ensemble:
+            return entry.display_name
+        return f"Ensemble of {entry.display_name}, " + ", ".join(e.display_name for e in ensemble)
+    
+    def _scheduler_for(self, entry: ModelEntry, compare: bool = False) -> InferenceScheduler:
+        """Micro-batching scheduler bound to one model version, started on first use"""
+        key, predict_fn = self._predictor_for(entry, compare)
+        scheduler = self.schedulers.get(key)
+        if scheduler is None:
+            scheduler = InferenceScheduler(
+                _timed_predict_fn(predict_fn),
+                max_batch_size=SCHEDULER_MAX_BATCH_SIZE,
+                max_wait_ms=SCHEDULER_MAX_WAIT_MS
+            )
+            scheduler.start()
+            self.schedulers[key] = scheduler
+        return scheduler
+    
+    def start_scheduler(self):
+        """Start micro-batching single predictions for the default model"""
+        self._scheduler_for(self.registry.get(), compare=True)
+    
+    async def stop_schedulers(self):
+        for scheduler in self.schedulers.values():
+            await scheduler.stop()
+        self.schedulers.clear()
+        if self.comparison is not None:
+            self.comparison.shutdown()
+        self.grid.shutdown()
+    
+    def scheduler_stats(self) -> Dict[str, Any]:
+        versions = {entry.version: entry.name for entry in self.registry.entries()}
+        return {
+            "+".join(versions.get(version, version) for version in key.split("+")): scheduler.stats()
+            for key, scheduler in self.schedulers.items()
+        }
+    
+    async def predict_batch(self, requests: List[FloodPredictionRequest],
+                            entry: Optional[ModelEntry] = None,
+                            compare: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Make flood predictions for many requests with a single forward pass"""
+        if not self.model_loaded:
+            raise RuntimeError("Model not loaded")
+        
+        try:
+            entry = entry or self.registry.get()
+            _, predict_fn = self._predictor_for(entry, compare)
+            start = time.perf_counter()
+            raw = self.pipeline.encode_requests(requests)
+            self.drift.observe(raw)
+            features = self.pipeline.transform(raw)
+            MODEL_STAGE_SECONDS.observe(time.perf_counter() - start, "preprocess")
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            probabilities = await loop.run_in_executor(None, _timed_predict_fn(predict_fn), features)
+            MODEL_STAGE_SECONDS.observe(time.perf_counter() - start, "inference")
+            predictions = (probabilities > 0.5).astype(np.int32)
+            return predictions, probabilities
+            
+        except Exception as e:
+            logger.error(f"Batch prediction error: {str(e)}")
+            raise RuntimeError(f"Batch prediction failed: {str(e)}")
+    
+    async def predict(self, request: FloodPredictionRequest,
+                      entry: Optional[ModelEntry] = None,
+                      compare: bool = False) -> Tuple[int, float, str]:
         """Make flood prediction"""
         if not self.model_loaded:
             raise RuntimeError("Model not loaded")
         
         try:
-            # Preprocess data
-            features = self._preprocess_data(request)
+            entry = entry or self.registry.get()
+            key, _ = self._predictor_for(entry, compare)
             
-            # Make prediction
-            prob = self.model.predict(features, verbose=0)[0][0]
-            prediction = 1 if prob > 0.5 else 0
-            probability = float(prob)
+            # Encode, then answer repeated payloads from the cache
+            start = time.perf_counter()
+            features = self.pipeline.encode_requests([request])
+            self.drift.observe(features)
+            preprocess_seconds = time.perf_counter() - start
+            cache_key = None
+            probability = None
+            if self.cache is not None:
+                start = time.perf_counter()
+                cache_key = key.encode() + b"|" + self.cache.make_key(features[0])
+                probability = self.cache.get_local(cache_key)
+                if probability is None and self.cache.shared_backend is not None:
+                    # The shared tier is a SQLite read; keep it off the event loop
+                    probability = await asyncio.get_running_loop().run_in_executor(
+                        None, self.cache.get_shared, cache_key
+                    )
+                MODEL_STAGE_SECONDS.observe(time.perf_counter() - start, "cache_lookup")
+                if probability is not None and compare and self.comparison is not None:
+                    # No model runs on a hit, so the candidates never see this request
+                    self.comparison.skipped_cache_hits += 1
+            
+            if probability is None:
+                start = time.perf_counter()
+                features = self.pipeline.transform(features)
+                preprocess_seconds += time.perf_counter() - start
+                
+                # Make prediction, batched with concurrent callers of the same model
+                start = time.perf_counter()
+                probability = await self._scheduler_for(entry, compare).submit(features[0])
+                MODEL_STAGE_SECONDS.observe(time.perf_counter() - start, "inference")
+                
+                if cache_key is not None:
+                    self.cache.put(cache_key, probability)
+            MODEL_STAGE_SECONDS.observe(preprocess_seconds, "preprocess")
+            prediction = 1 if probability > 0.5 else 0
             
             # Determine confidence
-            if probability > 0.8 or probability < 0.2:
-                confidence = "High"
-            elif probability > 0.6 or probability < 0.4:
-                confidence = "Medium"
-            else:
-                confidence = "Low"
+            confidence = self._confidence_label(probability)
             
             return prediction, probability, confidence
             
@@ -192,11 +666,74 @@ class ModelService:
 # FASTAPI APPLICATION
 # =============================================================================
 
+# Stage timestamps of the request being handled, set by TimedRoute
+_request_timings: contextvars.ContextVar = contextvars.ContextVar("request_timings")
+
+def _mark_endpoint(endpoint):
+    """Wrap an async endpoint so TimedRoute knows when the handler body starts and ends"""
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        timings = _request_timings.get(None)
+        if timings is not None:
+            timings["endpoint_start"] = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            if timings is not None:
+                timings["endpoint_end"] = time.perf_counter()
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """Route that records request counts and per-stage latency histograms"""
+    
+    def __init__(self, path: str, endpoint, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _mark_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = self.path
+        
+        async def timed_handler(request: Request) -> Response:
+            timings: Dict[str, float] = {}
+            token = _request_timings.set(timings)
+            status = 500
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except Exception as e:
+                # RequestValidationError and friends carry no status; FastAPI maps them to 422
+                status = 422 if type(e).__name__ == "RequestValidationError" else 500
+                raise
+            finally:
+                end = time.perf_counter()
+                _request_timings.reset(token)
+                REQUESTS_TOTAL.inc(request.method, route, str(status))
+                if status >= 400:
+                    REQUEST_ERRORS_TOTAL.inc(route, str(status))
+                REQUEST_SECONDS.observe(end - start, route)
+                if "endpoint_start" in timings:
+                    endpoint_end = timings.get("endpoint_end", end)
+                    REQUEST_STAGE_SECONDS.observe(timings["endpoint_start"] - start, route, "validation")
+                    REQUEST_STAGE_SECONDS.observe(endpoint_end - timings["endpoint_start"], route, "endpoint")
+                    REQUEST_STAGE_SECONDS.observe(end - endpoint_end, route, "serialization")
+                elif status == 422:
+                    REQUEST_STAGE_SECONDS.observe(end - start, route, "validation")
+        
+        return timed_handler
+
 app = FastAPI(
     title="River Flood Prediction API",
     description="Simple API for predicting river flood occurrences",
     version="1.0.0"
 )
+app.router.route_class = TimedRoute
 
 # Add CORS middleware
 app.add_middleware(
@@ -210,16 +747,57 @@ app.add_middleware(
 # Initialize model service
 model_service = ModelService()
 
+def _cache_counter(field: str):
+    return lambda: {(): model_service.cache.stats()[field]} if model_service.cache else {}
+
+metrics.gauge("flood_api_process_resident_memory_bytes", "Resident set size of this worker",
+              lambda: {(): process_rss_bytes()})
+metrics.gauge("flood_api_model_loaded", "1 once the models are loaded",
+              lambda: {(): int(model_service.model_loaded)})
+metrics.gauge("flood_api_model_memory_bytes", "Memory held by each loaded model's weights",
+              lambda: {(entry.name,): entry.nbytes for entry in model_service.registry.entries()}, ["model"])
+metrics.gauge("flood_api_scheduler_queue_depth", "Rows waiting for a micro-batch",
+              lambda: {(name,): stats["queue_depth"] for name, stats in model_service.scheduler_stats().items()},
+              ["scheduler"])
+metrics.gauge("flood_api_scheduler_mean_batch_size", "Mean rows per forward pass",
+              lambda: {(name,): stats["mean_batch_size"] for name, stats in model_service.scheduler_stats().items()},
+              ["scheduler"])
+metrics.gauge("flood_api_prediction_cache_hits_total", "Prediction cache hits (in-process and shared)",
+              lambda: {(): model_service.cache.hits + model_service.cache.shared_hits} if model_service.cache else {},
+              metric_type="counter")
+metrics.gauge("flood_api_prediction_cache_misses_total", "Prediction cache misses",
+              _cache_counter("misses"), metric_type="counter")
+metrics.gauge("flood_api_prediction_cache_evictions_total", "Prediction cache LRU evictions",
+              _cache_counter("evictions"), metric_type="counter")
+metrics.gauge("flood_api_prediction_cache_entries", "Entries in the in-process prediction cache",
+              _cache_counter("size"))
+metrics.gauge("flood_api_input_drift_psi", "PSI of each request feature against the training data (recent window, min samples reached)",
+              lambda: {(field,): psi for field, psi in model_service.drift.psi().items()}, ["feature"])
+
 @app.on_event("startup")
 async def startup_event():
-    """Load model on startup"""
+    """Start loading the model in the background so /health answers immediately"""
     logger.info("Starting River Flood Prediction API...")
-    success = await model_service.load_model()
+    app.state.model_loader = asyncio.create_task(_load_model_in_background())
+    jobs.start()
+
+async def _load_model_in_background():
+    # Workers forked by serve.py inherit models loaded by the master
+    success = model_service.model_loaded or await model_service.load_model()
     if success:
         logger.info("Model loaded successfully")
+        model_service.start_scheduler()
+        startup_profiler.mark_ready()
     else:
         logger.warning("Model loading failed - API will run with limited functionality")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the inference schedulers and the job dispatcher"""
+    await model_service.stop_schedulers()
+    await jobs.stop()
+    profiler.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -237,14 +815,112 @@ async def health_check():
     return {
         "status": "healthy" if model_service.model_loaded else "degraded",
         "model_loaded": model_service.model_loaded,
+        "loading_state": model_service.loading_state,
+        "inference_schedulers": model_service.scheduler_stats(),
+        "prediction_cache": model_service.cache.stats() if model_service.cache else None,
+        "risk_grid": model_service.grid.stats(),
+        "spatial_index": model_service.spatial_index.info() if model_service.spatial_index else None,
         "timestamp": time.time()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Counters, latency histograms and process memory in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _require_profiler_endpoints():
+    if not PROFILER_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Profiler endpoints are disabled (set PROFILER_ENDPOINTS=1)")
+
+@app.post("/debug/profiler/start")
+async def start_profiler(
+    interval_ms: float = Query(5.0, ge=0.5, le=1000),
+    duration_s: Optional[float] = Query(None, gt=0, le=3600, description="Stop automatically after this long")
+):
+    """Start the sampling profiler"""
+    _require_profiler_endpoints()
+    profiler.start(interval_ms, duration_s)
+    return profiler.status()
+
+@app.post("/debug/profiler/stop")
+async def stop_profiler():
+    """Stop the sampling profiler and keep its samples"""
+    _require_profiler_endpoints()
+    await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+    return profiler.status()
+
+@app.get("/debug/profiler")
+async def profiler_report(limit: int = Query(200, ge=1, le=100000)):
+    """Sampled stacks in collapsed format (feed to flamegraph.pl or speedscope)"""
+    _require_profiler_endpoints()
+    status = profiler.status()
+    header = f"# samples={status['samples']} interval_ms={status['interval_ms']} running={status['running']}\n"
+    return PlainTextResponse(header + profiler.collapsed(limit))
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the model can serve predictions, 503 before"""
+    if not model_service.model_loaded:
+        raise HTTPException(status_code=503, detail=f"Model {model_service.loading_state}")
+    return {"ready": True, "inference_engine": model_service.engine}
+
+@app.get("/health/startup")
+async def startup_report():
+    """Time spent per import and load phase during startup"""
+    return startup_profiler.report()
+
+@app.get("/health/models")
+async def models_info():
+    """Loaded model variants with their versions and memory use"""
+    return model_service.registry.info()
+
+@app.get("/health/models/comparison")
+async def model_comparison():
+    """Live disagreement between the default model and its ensemble/shadow candidates"""
+    if model_service.comparison is None:
+        return {"enabled": False}
+    primary = model_service.registry.default_name
+    return {"enabled": True, **model_service.comparison.report(primary)}
+
+@app.post("/health/models/comparison/reset")
+async def reset_model_comparison():
+    """Start a fresh disagreement window, e.g. after promoting a model"""
+    if model_service.comparison is not None:
+        model_service.comparison.reset()
+    return {"reset": model_service.comparison is not None}
+
+@app.get("/health/drift")
+async def input_drift(window: str = Query("recent", pattern="^(recent|lifetime)$")):
+    """PSI/KS of live request features against the training data, per feature"""
+    return model_service.drift.report(window)
+
+@app.post("/health/drift/reset")
+async def reset_input_drift():
+    """Clear the live counters, e.g. after retraining on newer data"""
+    model_service.drift.reset()
+    return {"reset": model_service.drift.reference is not None}
+
+@app.post("/health/models/reload")
+async def reload_models():
+    """Reload changed model files and swap them in without dropping requests"""
+    if model_service.loading_state == "loading":
+        raise HTTPException(status_code=409, detail="Models are still loading")
+    return await model_service.reload_models()
+
+def _resolve_model(name: Optional[str]) -> ModelEntry:
+    """Look up the requested model variant, or the default one"""
+    try:
+        return model_service.get_model(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+MODEL_QUERY = Query(None, description="Model variant (e.g. production, v7, v4.1); default model if omitted")
+
 @app.post("/predict", response_model=FloodPredictionResponse)
-async def predict_flood(request: FloodPredictionRequest):
+async def predict_flood(request: FloodPredictionRequest, model: Optional[str] = MODEL_QUERY):
     """Make flood prediction"""
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         if not model_service.model_loaded:
             raise HTTPException(
@@ -252,23 +928,747 @@ async def predict_flood(request: FloodPredictionRequest):
                 detail="Model not loaded. Please try again later."
             )
         
-        prediction, probability, confidence = await model_service.predict(request)
-        processing_time = time.time() - start_time
+        entry = _resolve_model(model)
+        try:
+            request, context_filled = model_service.fill_context(request)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        # Default-model traffic also feeds the configured ensemble/shadow candidates
+        compare = model is None
+        prediction, probability, confidence = await model_service.predict(request, entry, compare)
+        processing_time = time.perf_counter() - start_time
         
         return FloodPredictionResponse(
             prediction=prediction,
             probability=probability,
             confidence=confidence,
-            model_used="Neural Network Classifier v7",
-            processing_time=processing_time
+            model_used=model_service.display_name(entry, compare),
+            processing_time=processing_time,
+            context_filled=context_filled
+        )
+        
+    except HTTPException:
+        # Keep the 503 while the background loader is still running
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Condense a pydantic validation error into a single line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_flood_batch(request: BatchPredictionRequest, model: Optional[str] = MODEL_QUERY):
+    """Make flood predictions for many locations in one request"""
+    try:
+        start_time = time.perf_counter()
+        
+        if not model_service.model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded. Please try again later."
+            )
+        
+        if not request.predictions:
+            raise HTTPException(status_code=400, detail="No predictions supplied")
+        if len(request.predictions) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch too large: {len(request.predictions)} rows (max {MAX_BATCH_SIZE})"
+            )
+        entry = _resolve_model(model)
+        compare = model is None
+        
+        # Validate rows individually so invalid ones are reported, not fatal
+        results: List[BatchPredictionResult] = [None] * len(request.predictions)
+        valid_requests = []
+        valid_indices = []
+        filled_context = []
+        for i, row in enumerate(request.predictions):
+            try:
+                row_request, context_filled = model_service.fill_context(FloodPredictionRequest(**row))
+                valid_requests.append(row_request)
+                valid_indices.append(i)
+                filled_context.append(context_filled)
+            except ValidationError as e:
+                results[i] = BatchPredictionResult(index=i, error=_format_validation_error(e))
+            except ValueError as e:
+                results[i] = BatchPredictionResult(index=i, error=str(e))
+        
+        if valid_requests:
+            predictions, probabilities = await model_service.predict_batch(valid_requests, entry, compare)
+            for i, prediction, probability, context_filled in zip(
+                valid_indices, predictions.tolist(), probabilities.tolist(), filled_context
+            ):
+                results[i] = BatchPredictionResult(
+                    index=i,
+                    prediction=prediction,
+                    probability=probability,
+                    confidence=model_service._confidence_label(probability),
+                    context_filled=context_filled
+                )
+        
+        return BatchPredictionResponse(
+            predictions=results,
+            total_processed=len(valid_requests),
+            total_failed=len(request.predictions) - len(valid_requests),
+            model_used=model_service.display_name(entry, compare),
+            processing_time=time.perf_counter() - start_time
+        )
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/predict/bulk")
+async def predict_flood_bulk(
+    file: UploadFile = File(..., description="CSV or NDJSON shaped like flood_risk_dataset_india.csv"),
+    output_format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    chunk_size: int = Query(50000, ge=1, le=1000000),
+    model: Optional[str] = MODEL_QUERY
+):
+    """Score an uploaded dataset in chunks and stream the results back"""
+    if not model_service.model_loaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Please try again later."
+        )
+    
+    # pandas is only needed here, so it is not imported at startup
+    from bulk_scoring import stream_scores, detect_input_format
+    
+    # Keep using this model and pipeline for the whole upload
+    entry = _resolve_model(model)
+    pipeline = model_service.pipeline
+    stats: Dict[str, Any] = {}
+    
+    def blocks():
+        try:
+            yield from stream_scores(
+                file.file, pipeline, entry.predict,
+                input_format=detect_input_format(file.filename),
+                output_format=output_format,
+                chunk_size=chunk_size,
+                stats=stats,
+                summary=True
+            )
+        except Exception as e:
+            logger.error(f"Bulk scoring of {file.filename} failed: {str(e)}")
+            raise
+        logger.info(
+            f"Bulk scored {stats.get('rows', 0)} rows from {file.filename} "
+            f"at {stats.get('rows_per_second', 0.0):,.0f} rows/sec"
+        )
+    
+    media_type = "application/x-ndjson" if output_format == "ndjson" else "text/csv"
+    return StreamingResponse(blocks(), media_type=media_type)
+
+@app.post("/predict/uncertainty", response_model=UncertaintyResponse)
+async def predict_uncertainty(request: FloodPredictionRequest, options: UncertaintyOptions = Depends(),
+                              model: Optional[str] = MODEL_QUERY):
+    """Flood probability with Monte Carlo (dropout and sensor error) uncertainty"""
+    try:
+        start_time = time.perf_counter()
+        
+        if not model_service.model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded. Please try again later."
+            )
+        
+        samples = options.samples or UNCERTAINTY_SAMPLES
+        if samples > UNCERTAINTY_MAX_SAMPLES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many samples: {samples} (max {UNCERTAINTY_MAX_SAMPLES})"
+            )
+        entry = _resolve_model(model)
+        try:
+            request, context_filled = model_service.fill_context(request)
+            sensor_errors = parse_sensor_errors(UNCERTAINTY_SENSOR_ERRORS)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        for field in ("rainfall", "water_level", "river_discharge"):
+            override = getattr(options, f"{field}_error")
+            if override is not None:
+                sensor_errors[field] = override
+        mc_dropout = options.mc_dropout and getattr(entry.model, "dropout_layers", 1) > 0
+        
+        # All samples go through the pipeline and the model as one matrix
+        loop = asyncio.get_running_loop()
+        raw = model_service.pipeline.encode_requests([request])
+        try:
+            stats = await loop.run_in_executor(
+                None, functools.partial(
+                    monte_carlo, raw, model_service.pipeline, entry, samples, sensor_errors,
+                    mc_dropout, options.interval, options.seed
+                )
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        probability = float(stats["mean"][0])
+        return UncertaintyResponse(
+            prediction=1 if probability > 0.5 else 0,
+            probability=probability,
+            std=float(stats["std"][0]),
+            interval=options.interval,
+            interval_lower=float(stats["lower"][0]),
+            interval_upper=float(stats["upper"][0]),
+            flood_fraction=float(stats["exceedance"][0]),
+            deterministic_probability=float(stats["deterministic"][0]),
+            confidence=model_service._confidence_label(probability),
+            samples=samples,
+            mc_dropout=mc_dropout,
+            sensor_errors=sensor_errors,
+            model_used=entry.display_name,
+            processing_time=time.perf_counter() - start_time,
+            context_filled=context_filled
+        )
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+EXPLAIN_METHOD_QUERY = Query("ablation", pattern=f"^({'|'.join(ATTRIBUTION_METHODS)})$",
+                             description="ablation (one batched pass), gradient (gradient x input) or both")
+
+async def _explain_requests(requests: List[FloodPredictionRequest], entry: ModelEntry,
+                            method: str) -> Tuple[List[FeatureExplanation], Dict[str, Any]]:
+    """Attribute many requests with one stacked forward pass (and one backward pass for gradients)"""
+    if model_service.baseline is None:
+        raise HTTPException(status_code=503, detail="Training means are not loaded; explanations unavailable")
+    filled = []
+    for request in requests:
+        try:
+            filled.append(model_service.fill_context(request))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    
+    raw = model_service.pipeline.encode_requests([request for request, _ in filled])
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        None, explain, raw, model_service.baseline, model_service.pipeline, entry, method
+    )
+    
+    explanations = []
+    for i, (_, context_filled) in enumerate(filled):
+        probability = float(result["probability"][i])
+        ranked = result["ablation"][i] if "ablation" in result else result["gradient"][i]
+        explanations.append(FeatureExplanation(
+            prediction=1 if probability > 0.5 else 0,
+            probability=probability,
+            contributions=by_field(result["ablation"][i]) if "ablation" in result else None,
+            gradient_x_input=by_field(result["gradient"][i]) if "gradient" in result else None,
+            top_features=[REQUEST_FIELDS[j] for j in np.argsort(-np.abs(ranked), kind="stable")],
+            context_filled=context_filled
+        ))
+    summary = {
+        "baseline_probability": result["baseline_probability"],
+        "baseline": by_field(model_service.baseline, 4),
+        "method": method,
+        "model_used": entry.display_name
+    }
+    return explanations, summary
+
+@app.post("/predict/explain", response_model=ExplanationResponse)
+async def predict_explain(request: FloodPredictionRequest, method: str = EXPLAIN_METHOD_QUERY,
+                          model: Optional[str] = MODEL_QUERY):
+    """Flood prediction with per-feature contributions against the training means"""
+    try:
+        start_time = time.perf_counter()
+        
+        if not model_service.model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded. Please try again later."
+            )
+        
+        entry = _resolve_model(model)
+        explanations, summary = await _explain_requests([request], entry, method)
+        return ExplanationResponse(
+            **explanations[0].model_dump(),
+            **summary,
+            processing_time=time.perf_counter() - start_time
+        )
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/predict/explain/batch", response_model=BatchExplanationResponse)
+async def predict_explain_batch(requests: List[FloodPredictionRequest], method: str = EXPLAIN_METHOD_QUERY,
+                                model: Optional[str] = MODEL_QUERY):
+    """Explanations for many requests, all variants scored in one forward pass"""
+    try:
+        start_time = time.perf_counter()
+        
+        if not model_service.model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded. Please try again later."
+            )
+        
+        if not requests:
+            raise HTTPException(status_code=400, detail="No predictions supplied")
+        if len(requests) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch too large: {len(requests)} rows (max {MAX_BATCH_SIZE})"
+            )
+        entry = _resolve_model(model)
+        explanations, summary = await _explain_requests(requests, entry, method)
+        return BatchExplanationResponse(
+            explanations=explanations,
+            **summary,
+            processing_time=time.perf_counter() - start_time
+        )
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def _field_bounds(field: str) -> Tuple[Optional[float], Optional[float]]:
+    """ge/le constraints declared on a FloodPredictionRequest field"""
+    low = high = None
+    for constraint in FloodPredictionRequest.model_fields[field].metadata:
+        low = getattr(constraint, "ge", low)
+        high = getattr(constraint, "le", high)
+    return low, high
+
+def _sweep_axis_values(axis: SweepAxis) -> np.ndarray:
+    """Grid values of one axis, checked against the same bounds as a single prediction"""
+    if axis.feature not in SWEEPABLE_FIELDS:
+        raise ValueError(f"Feature {axis.feature!r} cannot be swept; choose from {', '.join(SWEEPABLE_FIELDS)}")
+    low, high = _field_bounds(axis.feature)
+    start = low if axis.start is None else axis.start
+    stop = high if axis.stop is None else axis.stop
+    for value in (start, stop):
+        if value < low or value > high:
+            raise ValueError(f"{axis.feature} must be between {low} and {high}, got {value}")
+    return axis_values(start, stop, axis.steps)
+
+@app.post("/predict/sweep")
+async def predict_sweep(request: SweepRequest, model: Optional[str] = MODEL_QUERY):
+    """Vary one or two features of a base request and find where the prediction flips"""
+    try:
+        start_time = time.perf_counter()
+        
+        if not model_service.model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded. Please try again later."
+            )
+        
+        points = int(np.prod([axis.steps for axis in request.axes]))
+        if points > SWEEP_MAX_POINTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Sweep too large: {points} points (max {SWEEP_MAX_POINTS}); use fewer steps"
+            )
+        entry = _resolve_model(model)
+        fields = [axis.feature for axis in request.axes]
+        try:
+            axes = [_sweep_axis_values(axis) for axis in request.axes]
+            base, context_filled = model_service.fill_context(request.base)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        # One forward pass over every variant; ensemble/shadow models are not consulted
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                None, sweep, base, fields, axes, model_service.pipeline,
+                _timed_predict_fn(entry.predict), request.threshold
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        # Plain lists of floats; skip jsonable_encoder, which dominates the latency of large sweeps
+        return JSONResponse({
+            "features": fields,
+            "values": {field: np.round(values, 6).tolist() for field, values in zip(fields, axes)},
+            "probabilities": np.round(result["probabilities"], 6).tolist(),
+            "threshold": request.threshold,
+            "crossings": result["crossings"],
+            "base_probability": result["base_probability"],
+            "points": points,
+            "model_used": entry.display_name,
+            "processing_time": time.perf_counter() - start_time,
+            "context_filled": context_filled
+        })
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@functools.lru_cache(maxsize=None)
+def _columnar_rules() -> Dict[str, Dict[str, Any]]:
+    """Column checks for binary payloads, taken from the FloodPredictionRequest fields"""
+    rules = {}
+    for field, info in FloodPredictionRequest.model_fields.items():
+        low, high = _field_bounds(field)
+        rules[field] = {"ge": low, "le": high, "optional": not info.is_required()}
+        if int in (info.annotation, *getattr(info.annotation, "__args__", ())):
+            rules[field]["integer"] = True
+    rules["land_cover"] = {"choices": sorted(LAND_COVER_CODES.values())}
+    rules["soil_type"] = {"choices": sorted(SOIL_TYPE_CODES.values())}
+    return rules
+
+async def _read_columnar_body(request: Request) -> bytearray:
+    """Buffer a columnar payload, rejecting it as soon as it is known to exceed COLUMNAR_MAX_ROWS"""
+    max_bytes = payload_size(COLUMNAR_MAX_ROWS)
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Payload too large: {content_length} bytes (max {max_bytes} for {COLUMNAR_MAX_ROWS} rows)"
         )
+    
+    body = bytearray()
+    rows = -1
+    async for chunk in request.stream():
+        body += chunk
+        if rows < 0:
+            rows = declared_rows(body)
+            if rows > COLUMNAR_MAX_ROWS:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Payload too large: {rows} rows (max {COLUMNAR_MAX_ROWS})"
+                )
+        if len(body) > max_bytes:
+            # More bytes than the header declares; decode reports the mismatch
+            break
+    return body
+
+@app.post("/predict/columnar")
+async def predict_columnar(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    output_format: str = Query("f32", pattern="^(json|f32)$"),
+    model: Optional[str] = MODEL_QUERY
+):
+    """Score a packed little-endian float32 column block (see wire_format.py) without per-row validation"""
+    try:
+        start_time = time.perf_counter()
+        
+        if not model_service.model_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded. Please try again later."
+            )
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if content_type not in (WIRE_MEDIA_TYPE, "application/octet-stream"):
+            raise HTTPException(status_code=415, detail=f"Expected Content-Type {WIRE_MEDIA_TYPE}")
+        
+        body = await _read_columnar_body(request)
+        try:
+            raw = decode_wire(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entry = _resolve_model(model)
+        
+        errors = validate_columns(raw, _columnar_rules())
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+        
+        # Omitted context values (NaN) are filled from the nearest records in one query
+        loop = asyncio.get_running_loop()
+        for field in CONTEXT_COLUMNS:
+            column = raw[:, REQUEST_FIELDS.index(field)]
+            missing = np.flatnonzero(np.isnan(column))
+            if not len(missing):
+                continue
+            if model_service.spatial_index is None:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Missing {field} in {len(missing)} rows and no historical records are loaded to fill them"
+                )
+            filled = await loop.run_in_executor(
+                None, functools.partial(
+                    model_service.spatial_index.fill_columns,
+                    raw[missing, REQUEST_FIELDS.index("latitude")], raw[missing, REQUEST_FIELDS.index("longitude")],
+                    [field], k=CONTEXT_NEIGHBORS, max_km=CONTEXT_MAX_KM
+                )
+            )
+            column[missing] = filled[field]
+            unfilled = missing[np.isnan(filled[field])]
+            if len(unfilled):
+                raise HTTPException(status_code=422, detail=[{
+                    "field": field,
+                    "count": int(len(unfilled)),
+                    "rows": unfilled[:MAX_REPORTED_ROWS].tolist(),
+                    "rule": {"context_max_km": CONTEXT_MAX_KM}
+                }])
+        
+        # Large blocks are binned for drift monitoring after the response is sent;
+        # the copy is needed because scoring scales raw in place
+        if model_service.drift.reference is not None:
+            background_tasks.add_task(model_service.drift.observe, raw.copy())
+        
+        pipeline = model_service.pipeline
+        predict_fn = _timed_predict_fn(entry.predict)
+        
+        def score() -> np.ndarray:
+            features = pipeline.transform(raw)
+            return np.concatenate([
+                predict_fn(features[i:i + COLUMNAR_CHUNK_ROWS])
+                for i in range(0, len(features), COLUMNAR_CHUNK_ROWS)
+            ]) if len(features) else np.empty(0, dtype=np.float32)
+        
+        probabilities = await loop.run_in_executor(None, score)
+        predictions = (probabilities > 0.5).astype(np.float32)
+        processing_time = time.perf_counter() - start_time
+        
+        if output_format == "f32":
+            return Response(
+                content=encode_wire([probabilities, predictions]),
+                media_type=WIRE_MEDIA_TYPE,
+                headers={"X-Model-Used": entry.display_name, "X-Processing-Time": f"{processing_time:.6f}"}
+            )
+        return JSONResponse({
+            "probabilities": np.round(probabilities.astype(np.float64), 6).tolist(),
+            "predictions": predictions.astype(np.int32).tolist(),
+            "total_processed": len(probabilities),
+            "model_used": entry.display_name,
+            "processing_time": processing_time
+        })
         
+    except HTTPException:
+        raise
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(..., description="CSV or NDJSON shaped like flood_risk_dataset_india.csv"),
+    output_format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    chunk_size: int = Query(50000, ge=1, le=1000000, description="Rows per chunk (and per checkpoint)"),
+    model: Optional[str] = MODEL_QUERY
+):
+    """Queue an uploaded dataset for background scoring; poll /jobs/{job_id} for progress"""
+    if not model_service.model_loaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Please try again later."
+        )
+    
+    from bulk_scoring import detect_input_format
+    
+    entry = _resolve_model(model)
+    metadata = model_service.pipeline.metadata
+    try:
+        loop = asyncio.get_running_loop()
+        job = await loop.run_in_executor(
+            None, functools.partial(
+                jobs.submit, file.file, file.filename, detect_input_format(file.filename), output_format,
+                chunk_size, entry.name, entry.path, entry.version,
+                metadata.get("normalization_path"), metadata.get("standardization_path")
+            )
+        )
+    except OverflowError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Job submission for {file.filename} failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    logger.info(f"Queued scoring job {job['id']} for {file.filename} with model '{entry.name}'")
+    return {
+        **job_progress(job),
+        "status_url": f"/jobs/{job['id']}",
+        "results_url": f"/jobs/{job['id']}/results"
+    }
+
+def _get_job(job_id: str) -> Dict[str, Any]:
+    job = jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job
+
+@app.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|completed|failed|cancelled)$"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Most recent scoring jobs, newest first"""
+    return {
+        "jobs": [job_progress(job) for job in jobs.store.list(limit, status)],
+        "stats": jobs.stats()
+    }
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Progress of one scoring job"""
+    return job_progress(_get_job(job_id))
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    """Scored rows of a completed job, streamed in row order"""
+    job = _get_job(job_id)
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; results are available once it completes")
+    media_type = "application/x-ndjson" if job["output_format"] == "ndjson" else "text/csv"
+    return StreamingResponse(jobs.results(job_id), media_type=media_type)
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job, or delete a finished one and its files"""
+    job = _get_job(job_id)
+    if jobs.store.cancel(job_id):
+        return job_progress(jobs.store.get(job_id))
+    jobs.delete(job_id)
+    return {"job_id": job_id, "deleted": True, "status": job["status"]}
+
+@app.get("/nearby")
+async def nearby_records(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=1000, description="Maximum number of records"),
+    radius_km: Optional[float] = Query(None, gt=0, le=2000, description="Only records within this distance")
+):
+    """Historical flood records nearest to a location"""
+    index = model_service.spatial_index
+    if index is None:
+        raise HTTPException(status_code=503, detail="Historical records are not loaded")
+    
+    start_time = time.perf_counter()
+    if radius_km is None:
+        rows, distances = index.nearest(latitude, longitude, k)
+    else:
+        rows, distances = index.within(latitude, longitude, radius_km, limit=k)
+    records = index.records(rows, distances)
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_km": radius_km,
+        "count": len(records),
+        "records": records,
+        "processing_time": time.perf_counter() - start_time
+    }
+
+def _grid_response(grid: np.ndarray, output_format: str, body: Dict[str, Any]):
+    """Grid as JSON (null outside the training region) or raw little-endian float32 bytes"""
+    if output_format == "f32":
+        return Response(
+            content=grid.astype("<f4").tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Grid-Shape": f"{grid.shape[0]},{grid.shape[1]}",
+                "X-Model-Used": body["model_used"],
+                "X-Scenario-Key": body["scenario_key"]
+            }
+        )
+    rounded = np.round(grid.astype(np.float64), 6)
+    body["probabilities"] = np.where(np.isnan(rounded), None, rounded).tolist()
+    return body
+
+@app.get("/grid/tiles/{z}/{x}/{y}")
+async def risk_grid_tile(
+    z: int, x: int, y: int,
+    scenario: GridScenario = Depends(),
+    output_format: str = Query("json", pattern="^(json|f32)$"),
+    model: Optional[str] = MODEL_QUERY
+):
+    """Flood-probability heatmap tile (XYZ / Web Mercator) for one scenario"""
+    if not model_service.model_loaded:
+        raise HTTPException(status_code=503, detail="Model not loaded. Please try again later.")
+    if not 0 <= z <= 22:
+        raise HTTPException(status_code=422, detail="Zoom level must be between 0 and 22")
+    
+    entry = _resolve_model(model)
+    values = scenario.model_dump()
+    try:
+        loop = asyncio.get_running_loop()
+        grid = await loop.run_in_executor(
+            None, model_service.grid.tile, z, x, y, values,
+            model_service.pipeline, entry.predict, entry.version
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Grid tile {z}/{x}/{y} failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    return _grid_response(grid, output_format, {
+        "z": z, "x": x, "y": y,
+        "size": model_service.grid.tile_size,
+        "model_used": entry.display_name,
+        "scenario_key": scenario_key(values)
+    })
+
+@app.get("/grid")
+async def risk_grid_bbox(
+    lat_min: float = Query(..., ge=-90, le=90),
+    lat_max: float = Query(..., ge=-90, le=90),
+    lon_min: float = Query(..., ge=-180, le=180),
+    lon_max: float = Query(..., ge=-180, le=180),
+    resolution: float = Query(0.1, gt=0, le=10, description="Cell size in degrees"),
+    scenario: GridScenario = Depends(),
+    output_format: str = Query("json", pattern="^(json|f32)$"),
+    model: Optional[str] = MODEL_QUERY
+):
+    """Flood-probability grid over a bounding box at a fixed resolution"""
+    if not model_service.model_loaded:
+        raise HTTPException(status_code=503, detail="Model not loaded. Please try again later.")
+    cells = ((lat_max - lat_min) / resolution) * ((lon_max - lon_min) / resolution)
+    if cells > GRID_MAX_CELLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Grid too large: ~{int(cells)} cells (max {GRID_MAX_CELLS}); use a coarser resolution"
+        )
+    
+    entry = _resolve_model(model)
+    values = scenario.model_dump()
+    try:
+        loop = asyncio.get_running_loop()
+        latitudes, longitudes, grid = await loop.run_in_executor(
+            None, model_service.grid.bbox, lat_min, lat_max, lon_min, lon_max, resolution, values,
+            model_service.pipeline, entry.predict, entry.version
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Grid over bbox failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    return _grid_response(grid, output_format, {
+        "latitudes": np.round(latitudes, 6).tolist(),
+        "longitudes": np.round(longitudes, 6).tolist(),
+        "resolution": resolution,
+        "model_used": entry.display_name,
+        "scenario_key": scenario_key(values)
+    })
+
 @app.get("/info")
 async def api_info():
     """Get API information"""
@@ -276,10 +1676,32 @@ async def api_info():
         "api_name": "River Flood Prediction API",
         "version": "1.0.0",
         "model_loaded": model_service.model_loaded,
+        "inference_engine": model_service.engine,
+        "default_model": model_service.registry.default_name,
+        "available_models": model_service.registry.names(),
+        "feature_pipeline": model_service.pipeline.metadata,
         "features": model_service.feature_order,
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
+            "predict_bulk": "/predict/bulk",
             "health": "/health",
+            "ready": "/health/ready",
+            "startup": "/health/startup",
+            "models": "/health/models",
+            "reload_models": "/health/models/reload",
+            "model_comparison": "/health/models/comparison",
+            "input_drift": "/health/drift",
+            "grid_tile": "/grid/tiles/{z}/{x}/{y}",
+            "grid": "/grid",
+            "sweep": "/predict/sweep",
+            "uncertainty": "/predict/uncertainty",
+            "explain": "/predict/explain",
+            "explain_batch": "/predict/explain/batch",
+            "predict_columnar": "/predict/columnar",
+            "jobs": "/jobs",
+            "nearby": "/nearby",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Load tests and microbenchmarks for the prediction API
+
+Runs the FastAPI app in-process through httpx's ASGI transport (default)
+or against a running server (``--url``), with payloads replayed from a
+dataset CSV, an NDJSON capture, or generated from Normalized_param.json.
+Results are written as JSON and can be compared against a stored baseline:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.15
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any
+import numpy as np
+
+from feature_pipeline import (
+    FEATURE_COLUMNS, REQUEST_FIELDS, LAND_COVER_CODES, SOIL_TYPE_CODES, CATEGORY_CODES
+)
+
+BENCHMARK_FORMAT_VERSION = 1
+
+# Metrics where a larger value is a regression (everything else: smaller is worse)
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "us_per_call", "us_per_row")
+
+
+# =============================================================================
+# PAYLOADS
+# =============================================================================
+
+def _payloads_from_frame(df, normalization_params: Optional[Dict[str, Dict[str, float]]]) -> List[Dict[str, Any]]:
+    """Dataset rows (raw, or min-max normalized like backend/data/sample_data.csv) as request payloads"""
+    df = df[[column for column in FEATURE_COLUMNS if column in df.columns]].copy()
+    missing = [column for column in FEATURE_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    normalized = all(np.issubdtype(df[column].dtype, np.number) and df[column].between(0, 1).all()
+                     for column in FEATURE_COLUMNS)
+    if normalized:
+        if not normalization_params:
+            raise ValueError("Normalized dataset needs Normalized_param.json to recover raw values")
+        for column in FEATURE_COLUMNS:
+            params = normalization_params[column]
+            df[column] = df[column] * (params["max"] - params["min"]) + params["min"]
+
+    for column, codes in CATEGORY_CODES.items():
+        if np.issubdtype(df[column].dtype, np.number):
+            names = {code: name for name, code in codes.items()}
+            df[column] = df[column].round().astype(int).map(names)
+
+    df.columns = [REQUEST_FIELDS[FEATURE_COLUMNS.index(column)] for column in df.columns]
+    for field in ("infrastructure", "historical_floods"):
+        df[field] = df[field].round().astype(int)
+    return df.to_dict(orient="records")
+
+
+def load_payloads(source: Optional[str], normalization_path: str = "Normalized_param.json",
+                  limit: int = 10000, seed: int = 0) -> List[Dict[str, Any]]:
+    """Request payloads from a CSV, an NDJSON capture, or generated within the training ranges"""
+    normalization_params = None
+    if Path(normalization_path).exists():
+        with open(normalization_path, "r") as f:
+            normalization_params = json.load(f)
+
+    if source is None:
+        return generate_payloads(normalization_params, limit, seed)
+
+    path = Path(source)
+    if path.suffix.lower() in (".ndjson", ".jsonl"):
+        payloads = []
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                # Captured traffic may wrap the body, e.g. {"body": {...}}
+                record = record.get("body", record) if isinstance(record, dict) else record
+                if isinstance(record, dict) and all(field in record for field in REQUEST_FIELDS):
+                    payloads.append({field: record[field] for field in REQUEST_FIELDS})
+                if len(payloads) >= limit:
+                    break
+        if not payloads:
+            raise ValueError(f"No prediction payloads found in {path}")
+        return payloads
+
+    import pandas as pd
+    return _payloads_from_frame(pd.read_csv(path, nrows=limit), normalization_params)
+
+
+def generate_payloads(normalization_params: Optional[Dict[str, Dict[str, float]]], n: int,
+                      seed: int = 0) -> List[Dict[str, Any]]:
+    """Uniform random payloads inside the training ranges"""
+    rng = random.Random(seed)
+    land_covers, soil_types = list(LAND_COVER_CODES), list(SOIL_TYPE_CODES)
+    payloads = []
+    for _ in range(n):
+        payload = {}
+        for column, field in zip(FEATURE_COLUMNS, REQUEST_FIELDS):
+            if field == "land_cover":
+                payload[field] = rng.choice(land_covers)
+            elif field == "soil_type":
+                payload[field] = rng.choice(soil_types)
+            elif field in ("infrastructure", "historical_floods"):
+                payload[field] = rng.randint(0, 1)
+            else:
+                params = (normalization_params or {}).get(column, {"min": 0.0, "max": 1.0})
+                payload[field] = rng.uniform(params["min"], params["max"])
+        payloads.append(payload)
+    return payloads
+
+
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+def latency_summary(latencies: List[float], seconds: float, rows: int, errors: int = 0) -> Dict[str, Any]:
+    ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    return {
+        "requests": len(latencies),
+        "rows": rows,
+        "errors": errors,
+        "seconds": round(seconds, 6),
+        "requests_per_second": len(latencies) / seconds if seconds else 0.0,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+        "mean_ms": float(ms.mean()) if len(ms) else None,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else None,
+        "p95_ms": float(np.percentile(ms, 95)) if len(ms) else None,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else None,
+        "max_ms": float(ms.max()) if len(ms) else None,
+    }
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 5, min_seconds: float = 0.2) -> float:
+    """Best-of-``repeat`` seconds per call, with the loop count chosen to run ``min_seconds``"""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+# =============================================================================
+# HTTP SCENARIOS
+# =============================================================================
+
+async def _timed_post(client, url: str, body: Dict[str, Any], latencies: List[float]) -> bool:
+    start = time.perf_counter()
+    response = await client.post(url, json=body)
+    latencies.append(time.perf_counter() - start)
+    return response.status_code == 200
+
+
+async def scenario_single(client, payloads: List[Dict[str, Any]], n: int) -> Dict[str, Any]:
+    """Sequential /predict calls, one in flight at a time"""
+    latencies: List[float] = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(n):
+        if not await _timed_post(client, "/predict", payloads[i % len(payloads)], latencies):
+            errors += 1
+    return latency_summary(latencies, time.perf_counter() - start, n, errors)
+
+
+async def scenario_concurrent(client, payloads: List[Dict[str, Any]], n: int, concurrency: int) -> Dict[str, Any]:
+    """``concurrency`` clients issuing /predict calls back to back"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(n))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            if not await _timed_post(client, "/predict", payloads[i % len(payloads)], latencies):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latency_summary(latencies, time.perf_counter() - start, n, errors)
+
+
+async def scenario_batch(client, payloads: List[Dict[str, Any]], n: int, batch_size: int) -> Dict[str, Any]:
+    """Sequential /predict/batch calls of ``batch_size`` rows"""
+    latencies: List[float] = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(n):
+        offset = (i * batch_size) % len(payloads)
+        rows = (payloads[offset:] + payloads)[:batch_size]
+        if not await _timed_post(client, "/predict/batch", {"predictions": rows}, latencies):
+            errors += 1
+    return latency_summary(latencies, time.perf_counter() - start, n * batch_size, errors)
+
+
+async def run_http_scenarios(args, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    import httpx
+
+    app_module = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60.0)
+    else:
+        import app as app_module
+        await app_module.startup_event()
+        await app_module.app.state.model_loader
+        if not app_module.model_service.model_loaded:
+            raise RuntimeError("Model failed to load; run from backend/ with the models in place")
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://bench", timeout=60.0)
+
+    results = {}
+    try:
+        # Warm up connections, schedulers and caches before measuring
+        await scenario_concurrent(client, payloads, min(200, args.requests), min(16, args.concurrency))
+
+        results["http_single"] = await scenario_single(client, payloads, args.requests)
+        results[f"http_concurrent_{args.concurrency}"] = await scenario_concurrent(
+            client, payloads, args.requests, args.concurrency
+        )
+        results[f"http_batch_{args.batch_size}"] = await scenario_batch(
+            client, payloads, max(1, args.requests // 20), args.batch_size
+        )
+    finally:
+        await client.aclose()
+        if app_module is not None:
+            await app_module.shutdown_event()
+    return results
+
+
+# =============================================================================
+# MICROBENCHMARKS
+# =============================================================================
+
+def run_microbenchmarks(args, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Time _preprocess_data and the forward pass without HTTP or the event loop"""
+    import app as app_module
+
+    service = app_module.ModelService()
+    if not service._load_model_blocking():
+        raise RuntimeError("Model failed to load; run from backend/ with the models in place")
+    entry = service.registry.get(args.model)
+
+    requests = [app_module.FloodPredictionRequest(**payload) for payload in payloads[:max(args.batch_size, 1024)]]
+    results = {}
+
+    seconds = time_call(lambda: service._preprocess_data(requests[0]))
+    results["micro_preprocess_single"] = {"us_per_call": seconds * 1e6}
+
+    batch = requests[:args.batch_size]
+    seconds = time_call(lambda: service._preprocess_batch(batch))
+    results[f"micro_preprocess_batch_{len(batch)}"] = {
+        "us_per_call": seconds * 1e6, "us_per_row": seconds * 1e6 / len(batch)
+    }
+
+    seconds = time_call(lambda: app_module.FloodPredictionRequest(**payloads[0]))
+    results["micro_pydantic_validation"] = {"us_per_call": seconds * 1e6}
+
+    features = service._preprocess_batch(requests)
+    for size in (1, 64, 1024):
+        block = np.ascontiguousarray(np.resize(features, (size, features.shape[1])))
+        seconds = time_call(lambda: entry.predict(block))
+        results[f"micro_forward_{size}"] = {"us_per_call": seconds * 1e6, "us_per_row": seconds * 1e6 / size}
+    return results
+
+
+# =============================================================================
+# BASELINES
+# =============================================================================
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond ``tolerance`` (a fraction) relative to the baseline results"""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if value is None or old is None or not isinstance(value, (int, float)) or old == 0:
+                continue
+            if metric in LOWER_IS_BETTER:
+                change = value / old - 1.0
+            elif metric.endswith("_per_second"):
+                change = old / value - 1.0 if value else float("inf")
+            else:
+                continue
+            if change > tolerance:
+                regressions.append(f"{name}.{metric}: {old:.4g} -> {value:.4g} ({change:+.1%} worse)")
+    return regressions
+
+
+def environment_info() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the flood prediction API")
+    parser.add_argument("--payloads", help="CSV (raw or normalized) or NDJSON capture; default: generated")
+    parser.add_argument("--url", help="Benchmark a running server (e.g. http://localhost:8000) instead of in-process")
+    parser.add_argument("--scenarios", default="http,micro", help="Comma-separated: http, micro")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--model", default=None, help="Model variant for microbenchmarks (default model if omitted)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the in-process prediction cache on (off by default so every call runs the model)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression as a fraction")
+    args = parser.parse_args()
+
+    # Read by app.py at import time
+    if not args.cache:
+        os.environ["PREDICTION_CACHE_SIZE"] = "0"
+
+    # Keep the app's per-request logging out of the measurements
+    import logging
+    logging.disable(logging.INFO)
+
+    payloads = load_payloads(args.payloads, limit=max(args.requests, args.batch_size, 1024), seed=args.seed)
+    scenarios = {name.strip() for name in args.scenarios.split(",")}
+
+    results: Dict[str, Any] = {}
+    if "micro" in scenarios:
+        results.update(run_microbenchmarks(args, payloads))
+    if "http" in scenarios:
+        results.update(asyncio.run(run_http_scenarios(args, payloads)))
+
+    report = {
+        "format_version": BENCHMARK_FORMAT_VERSION,
+        "timestamp": time.time(),
+        "environment": environment_info(),
+        "config": {
+            "payloads": args.payloads or "generated",
+            "target": args.url or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "batch_size": args.batch_size,
+            "prediction_cache": args.cache,
+        },
+        "results": results,
+    }
+
+    for name, metrics in results.items():
+        summary = ", ".join(
+            f"{metric}={value:.4g}" for metric, value in metrics.items()
+            if isinstance(value, float) and metric not in ("seconds",)
+        )
+        print(f"{name}: {summary}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against '{args.baseline}'")
+
+
+if __name__ == "__main__":
+    main()
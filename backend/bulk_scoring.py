@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk scoring of flood datasets (CSV or NDJSON in, NDJSON or CSV out)
+
+Input is read in fixed-size chunks, each chunk is encoded with the shared
+FeaturePipeline and scored with a single forward pass, and results are
+yielded line by line, so memory stays constant regardless of file size.
+"""
+import io
+import sys
+import csv
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Any
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import (
+    FeaturePipeline, FEATURE_COLUMNS, REQUEST_FIELDS, CATEGORY_CODES, valid_rows
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# NDJSON input may use the API field names instead of the dataset column names
+FIELD_TO_COLUMN = dict(zip(REQUEST_FIELDS, FEATURE_COLUMNS))
+
+OUTPUT_COLUMNS = ["row", "prediction", "probability", "confidence", "error"]
+INVALID_ROW_ERROR = "invalid, missing or out-of-range feature values"
+
+
+def read_chunks(source, input_format: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks from a CSV or NDJSON path or file object"""
+    if input_format == "csv":
+        reader = pd.read_csv(source, chunksize=chunk_size)
+    elif input_format == "ndjson":
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size)
+    else:
+        raise ValueError(f"Unsupported input format: {input_format}")
+
+    for chunk in reader:
+        yield chunk.rename(columns=FIELD_TO_COLUMN)
+
+
+def encode_chunk(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode a raw chunk into (N, 13) codes plus a mask of usable rows.
+
+    Category strings are mapped the same way ModelCleaning.ipynb does
+    (``df[column].map(codes)``). Unknown categories, missing or non-numeric
+    values and values outside the API's bounds (FIELD_BOUNDS, category
+    codes) mark the row as invalid instead of failing the chunk.
+    """
+    missing = [column for column in FEATURE_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    columns = {}
+    for column in FEATURE_COLUMNS:
+        values = chunk[column]
+        if column in CATEGORY_CODES and not pd.api.types.is_numeric_dtype(values):
+            values = values.map(CATEGORY_CODES[column])
+        columns[column] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float32)
+
+    features = np.column_stack([columns[column] for column in FEATURE_COLUMNS])
+    return features, valid_rows(features)
+
+
+def confidence_labels(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized version of ModelService._confidence_label"""
+    return np.select(
+        [(probabilities > 0.8) | (probabilities < 0.2), (probabilities > 0.6) | (probabilities < 0.4)],
+        ["High", "Medium"],
+        "Low"
+    )
+
+
+def score_stream(chunks: Iterator[pd.DataFrame], pipeline: FeaturePipeline,
+                 predict_fn: Callable[[np.ndarray], np.ndarray],
+                 stats: Optional[Dict[str, Any]] = None, first_row: int = 0) -> Iterator[Dict[str, Any]]:
+    """Score chunks one batch at a time and yield one result dict per chunk.
+
+    Each yielded dict holds equal-length arrays: ``row``, ``valid``,
+    ``prediction``, ``probability`` and ``confidence``. Row numbers start at
+    ``first_row`` (when resuming part-way through a file).
+    ``stats`` is updated in place with row counts and timings.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(rows=0, failed=0, chunks=0, seconds=0.0)
+    start = time.perf_counter()
+    row_offset = first_row
+
+    for chunk in chunks:
+        features, valid = encode_chunk(chunk)
+        n_rows = len(features)
+
+        probabilities = np.full(n_rows, np.nan, dtype=np.float32)
+        if valid.any():
+            scaled = pipeline.transform(features[valid])
+            probabilities[valid] = np.asarray(predict_fn(scaled)).reshape(-1)
+
+        yield {
+            "row": np.arange(row_offset, row_offset + n_rows),
+            "valid": valid,
+            "probability": probabilities,
+            "prediction": (probabilities > 0.5).astype(np.int8),
+            "confidence": confidence_labels(probabilities),
+        }
+
+        row_offset += n_rows
+        stats["rows"] += n_rows
+        stats["failed"] += int(n_rows - valid.sum())
+        stats["chunks"] += 1
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+
+
+def format_ndjson(results: Iterator[Dict[str, Any]], stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Render scored chunks as NDJSON, ending with a summary line when stats are given"""
+    invalid_row = '{"row": %d, "error": "' + INVALID_ROW_ERROR + '"}\n'
+    for result in results:
+        lines = []
+        for row, valid, prediction, probability, confidence in zip(
+            result["row"].tolist(), result["valid"].tolist(), result["prediction"].tolist(),
+            result["probability"].tolist(), result["confidence"].tolist()
+        ):
+            if valid:
+                lines.append(
+                    f'{{"row": {row}, "prediction": {prediction}, '
+                    f'"probability": {probability:.6f}, "confidence": "{confidence}"}}\n'
+                )
+            else:
+                lines.append(invalid_row % row)
+        yield "".join(lines)
+
+    if stats is not None:
+        yield json.dumps({"summary": stats}) + "\n"
+
+
+def format_csv(results: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Render scored chunks as CSV with a header row"""
+    yield ",".join(OUTPUT_COLUMNS) + "\n"
+    for result in results:
+        # csv.writer quotes the error text, which contains commas
+        block = io.StringIO()
+        writer = csv.writer(block, lineterminator="\n")
+        writer.writerows(
+            (row, prediction, f"{probability:.6f}", confidence, "") if valid
+            else (row, "", "", "", INVALID_ROW_ERROR)
+            for row, valid, prediction, probability, confidence in zip(
+                result["row"].tolist(), result["valid"].tolist(), result["prediction"].tolist(),
+                result["probability"].tolist(), result["confidence"].tolist()
+            )
+        )
+        yield block.getvalue()
+
+
+def stream_scores(source, pipeline: FeaturePipeline, predict_fn: Callable[[np.ndarray], np.ndarray],
+                  input_format: str = "csv", output_format: str = "ndjson",
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, stats: Optional[Dict[str, Any]] = None,
+                  summary: bool = False) -> Iterator[str]:
+    """Read, score and format a dataset as a stream of text blocks.
+
+    With ``summary`` set, NDJSON output ends with a line holding the row
+    counts and rows/sec throughput.
+    """
+    if stats is None:
+        stats = {}
+    results = score_stream(read_chunks(source, input_format, chunk_size), pipeline, predict_fn, stats)
+    if output_format == "ndjson":
+        return format_ndjson(results, stats if summary else None)
+    elif output_format == "csv":
+        return format_csv(results)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
+
+def detect_input_format(filename: Optional[str]) -> str:
+    if filename and Path(filename).suffix.lower() in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a flood dataset file against a trained model")
+    parser.add_argument("input", help="CSV or NDJSON file shaped like flood_risk_dataset_india.csv")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="Output format")
+    parser.add_argument("--input-format", choices=["csv", "ndjson"], help="Input format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--model", default="models/best_model.npz", help="Exported .npz or .keras model")
+    parser.add_argument("--params", default="Normalized_param.json")
+    parser.add_argument("--standardization", default="Standardized_param.json")
+    args = parser.parse_args()
+
+    from numpy_engine import NumpyModel
+
+    model_path = Path(args.model)
+    model = NumpyModel.from_keras(model_path) if model_path.suffix == ".keras" else NumpyModel.load(model_path)
+    pipeline = FeaturePipeline.from_files(args.params, args.standardization)
+
+    # Throughput is reported on stderr so the output stays clean
+    stats: Dict[str, Any] = {}
+    blocks = stream_scores(
+        args.input, pipeline, model.predict_on_batch,
+        input_format=args.input_format or detect_input_format(args.input),
+        output_format=args.format, chunk_size=args.chunk_size, stats=stats
+    )
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        for block in blocks:
+            out.write(block)
+    finally:
+        if args.output:
+            out.close()
+
+    print(
+        f"Scored {stats.get('rows', 0)} rows ({stats.get('failed', 0)} invalid) in "
+        f"{stats.get('seconds', 0.0):.2f}s: {stats.get('rows_per_second', 0.0):,.0f} rows/sec",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
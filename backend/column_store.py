@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Columnar binary store for the flood datasets with memory-mapped column access
+
+Each dataset becomes a directory holding a small ``manifest.json``; the
+columns themselves are typed ``.npy`` arrays in a shared, content-addressed
+``columns/`` directory next to it. A column that is identical across
+datasets (``Flood Occurred``, or the numeric columns shared by the raw and
+mapped CSVs) is written to disk once. String categories are dictionary
+encoded as small integer codes, and 0/1 columns are stored as int8.
+
+Columns are opened with ``np.load(mmap_mode="r")``, so a feature view or a
+(feature, target) pair costs a page-cache mapping instead of a CSV parse,
+replacing the per-feature CSVs written by Data_Divider.ipynb.
+
+    python column_store.py convert ../flood_risk_dataset_india.csv ../mapped_dataset.csv \\
+        ../mapped_dataset_Normalized_version.csv --output ../column_store
+    python column_store.py info ../column_store/mapped_dataset_Normalized_version
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+import numpy as np
+
+STORE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+COLUMNS_DIR = "columns"
+
+
+def _narrow_dtype(values: np.ndarray, float_dtype) -> np.ndarray:
+    """Smallest dtype that holds the column exactly (floats use ``float_dtype``)"""
+    if values.dtype.kind == "b":
+        return values.astype(np.int8)
+    if values.dtype.kind in "iu" or (values.dtype.kind == "f" and np.all(np.mod(values, 1) == 0)):
+        if values.size == 0:
+            return values.astype(np.int8)
+        low, high = values.min(), values.max()
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return values.astype(dtype)
+    return values.astype(float_dtype)
+
+
+def _encode_column(values: np.ndarray, float_dtype) -> Tuple[np.ndarray, Optional[List[str]]]:
+    """Typed array plus the category list for dictionary-encoded string columns"""
+    if values.dtype.kind in "OUS":
+        categories, codes = np.unique(values.astype(str), return_inverse=True)
+        return _narrow_dtype(codes, float_dtype), categories.tolist()
+    return _narrow_dtype(values, float_dtype), None
+
+
+def _write_blob(columns_dir: Path, array: np.ndarray) -> Tuple[str, bool]:
+    """Write ``array`` under its content hash; returns the file name and whether it was new"""
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha1(array.dtype.str.encode() + repr(array.shape).encode() + array.tobytes()).hexdigest()
+    name = f"{digest[:20]}.npy"
+    path = columns_dir / name
+    if path.exists():
+        return name, False
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, array)
+    tmp.replace(path)
+    return name, True
+
+
+def convert(csv_path, output_dir, name: Optional[str] = None, float_dtype=np.float64) -> Path:
+    """Convert one CSV into ``output_dir/<name>/manifest.json`` plus shared column files"""
+    import pandas as pd
+
+    csv_path = Path(csv_path)
+    output_dir = Path(output_dir)
+    columns_dir = output_dir / COLUMNS_DIR
+    columns_dir.mkdir(parents=True, exist_ok=True)
+    dataset_dir = output_dir / (name or csv_path.stem)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+
+    df = pd.read_csv(csv_path)
+    entries = []
+    written = 0
+    for column in df.columns:
+        array, categories = _encode_column(df[column].to_numpy(), float_dtype)
+        blob, new = _write_blob(columns_dir, array)
+        written += array.nbytes if new else 0
+        entry = {"name": column, "file": f"../{COLUMNS_DIR}/{blob}", "dtype": array.dtype.str}
+        if categories is not None:
+            entry["categories"] = categories
+        entries.append(entry)
+
+    stat = csv_path.stat()
+    manifest = {
+        "format_version": STORE_FORMAT_VERSION,
+        "rows": int(len(df)),
+        "columns": entries,
+        "source": {
+            "path": os.path.relpath(csv_path, dataset_dir),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        },
+        "created_at": time.time(),
+    }
+    tmp = dataset_dir / (MANIFEST_NAME + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp.replace(dataset_dir / MANIFEST_NAME)
+    print(f"{csv_path} -> {dataset_dir}: {len(df)} rows, {len(entries)} columns, "
+          f"{written} new bytes (CSV {stat.st_size} bytes)")
+    return dataset_dir
+
+
+def is_store(path) -> bool:
+    return (Path(path) / MANIFEST_NAME).is_file()
+
+
+class ColumnStore:
+    """Read-only view of one converted dataset; columns are memory-mapped lazily"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_NAME) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported column store format in {self.path}: "
+                             f"{self.manifest.get('format_version')}")
+        self.rows = self.manifest["rows"]
+        self._entries = {entry["name"]: entry for entry in self.manifest["columns"]}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def categories(self, name: str) -> Optional[List[str]]:
+        return self._entries[name].get("categories")
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy, read-only memmap of the stored column (category codes for string columns)"""
+        array = self._arrays.get(name)
+        if array is None:
+            entry = self._entries[name]
+            array = np.load(self.path / entry["file"], mmap_mode="r")
+            if len(array) != self.rows:
+                raise ValueError(f"Column {name!r} has {len(array)} rows, manifest says {self.rows}")
+            self._arrays[name] = array
+        return array
+
+    def values(self, name: str) -> np.ndarray:
+        """Column with string categories decoded (a copy only for categorical columns)"""
+        categories = self.categories(name)
+        if categories is None:
+            return self.column(name)
+        return np.asarray(categories, dtype=object)[self.column(name)]
+
+    def pair(self, feature: str, target: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(feature, target) views, the replacement for Data_Divider's per-feature CSVs"""
+        return self.column(feature), self.column(target)
+
+    def matrix(self, names: List[str], dtype=np.float64) -> np.ndarray:
+        """(rows, len(names)) block; this is the only step that copies numeric data"""
+        out = np.empty((self.rows, len(names)), dtype=dtype)
+        for i, name in enumerate(names):
+            out[:, i] = self.column(name)
+        return out
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        """Same shape as ``feature_pipeline.load_dataset`` on the source CSV"""
+        return {name: self.values(name) for name in self.columns}
+
+    def nbytes(self) -> int:
+        return sum(self.column(name).nbytes for name in self.columns)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "rows": self.rows,
+            "columns": [
+                {"name": name, "dtype": entry["dtype"], "categories": entry.get("categories")}
+                for name, entry in self._entries.items()
+            ],
+            "source": self.manifest.get("source"),
+        }
+
+
+def _directory_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar dataset store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert CSV datasets into the store")
+    convert_parser.add_argument("csv", nargs="+")
+    convert_parser.add_argument("--output", default="../column_store")
+    convert_parser.add_argument("--float32", action="store_true",
+                                help="Store float columns as float32 (halves size, not bit-exact)")
+
+    info_parser = subparsers.add_parser("info", help="Show a dataset's manifest and time its loading")
+    info_parser.add_argument("dataset")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        float_dtype = np.float32 if args.float32 else np.float64
+        for csv in args.csv:
+            convert(csv, args.output, float_dtype=float_dtype)
+        csv_bytes = sum(Path(csv).stat().st_size for csv in args.csv)
+        store_bytes = _directory_bytes(Path(args.output))
+        print(f"Store {args.output}: {store_bytes} bytes on disk for {csv_bytes} bytes of CSV "
+              f"({csv_bytes / max(store_bytes, 1):.1f}x smaller)")
+    elif args.command == "info":
+        import pandas as pd
+
+        start = time.perf_counter()
+        store = ColumnStore(args.dataset)
+        columns = {name: store.column(name) for name in store.columns}
+        store_seconds = time.perf_counter() - start
+        info = store.info()
+        print(json.dumps(info, indent=2, ensure_ascii=False))
+
+        source = store.path / info["source"]["path"]
+        if source.exists():
+            start = time.perf_counter()
+            pd.read_csv(source)
+            csv_seconds = time.perf_counter() - start
+            print(f"Open {len(columns)} columns: {store_seconds * 1000:.2f} ms; "
+                  f"pd.read_csv: {csv_seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Input drift monitoring: live request features against the training data
+
+Every feature gets fixed bins, taken once from the reference dataset
+(flood_risk_dataset_india.csv): one bin per value for the categories and
+the 0/1 flags, otherwise the reference quantiles, so each bin holds an equal
+share of the training rows. Live traffic only increments bin counters, so
+memory is fixed by the number of bins, whatever the traffic volume:
+
+    lifetime   counts since start (or the last reset)
+    recent     a ring of ``windows`` slots of ``window_seconds`` each
+
+Request rows are copied into a small buffer and binned ``fold_rows`` at a
+time with one searchsorted per feature, so /predict only pays for a row copy.
+
+Each feature's live bin shares are compared with the reference shares:
+PSI (population stability index) for every feature and, for ordered
+features, the Kolmogorov-Smirnov distance at the bin edges (a lower bound
+on the exact KS statistic). Categories also report both frequency tables.
+
+    python drift_monitor.py ../flood_risk_dataset_india.csv --output drift_reference.json
+"""
+import json
+import time
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+import numpy as np
+
+from feature_pipeline import FEATURE_COLUMNS, REQUEST_FIELDS, CATEGORY_CODES, N_FEATURES, encode_categories
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_FORMAT_VERSION = 1
+
+DEFAULT_BINS = 20
+
+# Columns with at most this many distinct reference values get one bin per value
+DISCRETE_MAX_VALUES = 10
+
+# Request fields whose codes have no order (no KS distance)
+CATEGORICAL_FIELDS = {
+    field: CATEGORY_CODES[column]
+    for field, column in zip(REQUEST_FIELDS, FEATURE_COLUMNS) if column in CATEGORY_CODES
+}
+
+# Conventional PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Floor for empty bin shares, so PSI stays finite
+PSI_EPSILON = 1e-4
+
+# Extra counters kept per feature after its bins
+MISSING, BELOW, ABOVE = range(3)
+
+
+def encode_csv(path) -> np.ndarray:
+    """Raw (N, 13) float32 request features of a dataset CSV"""
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=FEATURE_COLUMNS)
+    return np.column_stack([
+        encode_categories(df[column].to_numpy(), CATEGORY_CODES[column]) if column in CATEGORY_CODES
+        else df[column].to_numpy(dtype=np.float32)
+        for column in FEATURE_COLUMNS
+    ]).astype(np.float32)
+
+
+class FeatureBins:
+    """Fixed bins of one feature and the reference counts in them"""
+
+    def __init__(self, field: str, kind: str, edges, counts, low: float, high: float,
+                 labels: Optional[List[str]] = None):
+        self.field = field
+        self.kind = kind
+        # Bin i holds edges[i - 1] <= x < edges[i]; the outer bins are open-ended
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.low = float(low)
+        self.high = float(high)
+        self.labels = labels
+
+    @property
+    def n_bins(self) -> int:
+        return len(self.edges) + 1
+
+    @classmethod
+    def from_values(cls, field: str, values: np.ndarray, bins: int) -> "FeatureBins":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            raise ValueError(f"No reference values for {field}")
+        labels = None
+        if field in CATEGORICAL_FIELDS:
+            kind = "categorical"
+            codes = CATEGORICAL_FIELDS[field]
+            points = np.array(sorted(codes.values()), dtype=np.float64)
+            names = {code: name for name, code in codes.items()}
+            labels = [names[code] for code in points.astype(int).tolist()]
+        else:
+            points = np.unique(values)
+            kind = "discrete" if len(points) <= DISCRETE_MAX_VALUES else "continuous"
+        if kind == "continuous":
+            edges = np.unique(np.quantile(values, np.linspace(0.0, 1.0, bins + 1)[1:-1]))
+        else:
+            edges = (points[:-1] + points[1:]) / 2.0
+            if labels is None:
+                labels = [f"{value:g}" for value in points.tolist()]
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        return cls(field, kind, edges, counts, values.min(), values.max(), labels)
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {
+            "kind": self.kind,
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist(),
+            "min": self.low,
+            "max": self.high,
+        }
+        if self.labels is not None:
+            entry["labels"] = self.labels
+        return entry
+
+
+class DriftReference:
+    """Reference bins for every request feature, in REQUEST_FIELDS order"""
+
+    def __init__(self, features: List[FeatureBins], rows: int, source: Optional[Dict[str, Any]] = None):
+        if [f.field for f in features] != REQUEST_FIELDS:
+            raise ValueError("Drift reference must cover every request field in order")
+        self.features = features
+        self.rows = rows
+        self.source = source or {}
+        # All bins of all features live in one flat counter vector, followed by
+        # the missing/below/above counters of each feature
+        self.offsets = np.cumsum([0] + [f.n_bins for f in features])
+        self.extra_offset = int(self.offsets[-1])
+        self.size = self.extra_offset + 3 * len(features)
+
+    @classmethod
+    def from_matrix(cls, raw: np.ndarray, bins: int = DEFAULT_BINS,
+                    source: Optional[Dict[str, Any]] = None) -> "DriftReference":
+        features = [FeatureBins.from_values(field, raw[:, j], bins) for j, field in enumerate(REQUEST_FIELDS)]
+        return cls(features, len(raw), source)
+
+    @classmethod
+    def from_csv(cls, csv_path, bins: int = DEFAULT_BINS) -> "DriftReference":
+        csv_path = Path(csv_path)
+        stat = csv_path.stat()
+        source = {"path": str(csv_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "bins": bins}
+        return cls.from_matrix(encode_csv(csv_path), bins, source)
+
+    def save(self, path):
+        document = {
+            "format_version": REFERENCE_FORMAT_VERSION,
+            "rows": self.rows,
+            "source": self.source,
+            "features": {f.field: f.to_dict() for f in self.features},
+        }
+        tmp = Path(path).with_name(Path(path).name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(document, f, indent=2)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path) -> "DriftReference":
+        with open(path) as f:
+            document = json.load(f)
+        if document.get("format_version") != REFERENCE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported drift reference format in {path}")
+        features = [
+            FeatureBins(field, entry["kind"], entry["edges"], entry["counts"], entry["min"], entry["max"],
+                        entry.get("labels"))
+            for field, entry in ((field, document["features"][field]) for field in REQUEST_FIELDS)
+        ]
+        return cls(features, document["rows"], document.get("source"))
+
+    @classmethod
+    def load_or_build(cls, csv_path, cache_path=None, bins: int = DEFAULT_BINS) -> "DriftReference":
+        """Load the saved reference if it matches the CSV and bin count, otherwise build (and save) it"""
+        csv_path = Path(csv_path)
+        if cache_path and Path(cache_path).exists():
+            try:
+                reference = cls.load(cache_path)
+                stat = csv_path.stat()
+                source = reference.source
+                if (source.get("size"), source.get("mtime_ns"), source.get("bins")) == (
+                        stat.st_size, stat.st_mtime_ns, bins):
+                    return reference
+                logger.info(f"Drift reference {cache_path} is stale; rebuilding from {csv_path}")
+            except Exception as e:
+                logger.warning(f"Could not load drift reference {cache_path}: {str(e)}")
+
+        reference = cls.from_csv(csv_path, bins)
+        if cache_path:
+            try:
+                reference.save(cache_path)
+            except OSError as e:
+                logger.warning(f"Could not save drift reference {cache_path}: {str(e)}")
+        return reference
+
+    # ------------------------------------------------------------------
+    # Binning and scores
+    # ------------------------------------------------------------------
+
+    def count(self, raw: np.ndarray) -> np.ndarray:
+        """Flat counter vector of a raw (N, 13) block"""
+        counts = np.zeros(self.size, dtype=np.int64)
+        if not len(raw):
+            return counts
+        for j, feature in enumerate(self.features):
+            column = raw[:, j]
+            start, end = self.offsets[j], self.offsets[j + 1]
+            extra = self.extra_offset + 3 * j
+            counts[start:end] = np.bincount(np.searchsorted(feature.edges, column, side="right"),
+                                            minlength=feature.n_bins)
+            # NaN sorts after every edge, into the last bin
+            missing = np.count_nonzero(np.isnan(column))
+            if missing:
+                counts[end - 1] -= missing
+                counts[extra + MISSING] = missing
+            counts[extra + BELOW] = np.count_nonzero(column < feature.low)
+            counts[extra + ABOVE] = np.count_nonzero(column > feature.high)
+        return counts
+
+    def scores(self, counts: np.ndarray, min_samples: int = 0) -> Dict[str, Any]:
+        """PSI/KS of a flat counter vector against the reference, per feature"""
+        features = {}
+        for j, feature in enumerate(self.features):
+            live = counts[self.offsets[j]:self.offsets[j + 1]]
+            extra = counts[self.extra_offset + 3 * j:self.extra_offset + 3 * j + 3]
+            samples = int(live.sum())
+            expected = feature.counts / max(int(feature.counts.sum()), 1)
+            entry = {
+                "kind": feature.kind,
+                "samples": samples,
+                "missing": int(extra[MISSING]),
+                "below_reference_min": int(extra[BELOW]),
+                "above_reference_max": int(extra[ABOVE]),
+                "psi": None,
+                "ks": None,
+                "status": "no data",
+            }
+            if samples:
+                actual = live / samples
+                p, q = np.maximum(actual, PSI_EPSILON), np.maximum(expected, PSI_EPSILON)
+                psi = float(np.sum((p - q) * np.log(p / q)))
+                entry["psi"] = round(psi, 6)
+                if feature.kind != "categorical":
+                    entry["ks"] = round(float(np.abs(np.cumsum(actual) - np.cumsum(expected)).max()), 6)
+                if samples < min_samples:
+                    entry["status"] = "insufficient data"
+                elif psi > PSI_SIGNIFICANT:
+                    entry["status"] = "significant"
+                elif psi > PSI_MODERATE:
+                    entry["status"] = "moderate"
+                else:
+                    entry["status"] = "stable"
+                if feature.labels is not None:
+                    entry["frequencies"] = {
+                        label: {"live": round(float(a), 6), "reference": round(float(e), 6)}
+                        for label, a, e in zip(feature.labels, actual.tolist(), expected.tolist())
+                    }
+            features[feature.field] = entry
+        return features
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "source": self.source,
+            "bins": {f.field: f.n_bins for f in self.features},
+        }
+
+
+class DriftMonitor:
+    """Fixed-size live counters against a DriftReference, lifetime and over a recent window"""
+
+    def __init__(self, reference: Optional[DriftReference] = None, window_seconds: float = 300.0,
+                 windows: int = 12, fold_rows: int = 256, min_samples: int = 100):
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.fold_rows = fold_rows
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._buffer = np.empty((fold_rows, N_FEATURES), dtype=np.float32)
+        self.set_reference(reference)
+
+    def set_reference(self, reference: Optional[DriftReference]):
+        with self._lock:
+            size = reference.size if reference is not None else 0
+            self._buffered = 0
+            self._lifetime = np.zeros(size, dtype=np.int64)
+            self._slots = np.zeros((self.windows, size), dtype=np.int64)
+            self._slot_epochs = np.full(self.windows, -1, dtype=np.int64)
+            self._started = time.time()
+            self.reference = reference
+
+    def observe(self, raw: np.ndarray):
+        """Record raw (N, 13) request features (before scaling); the rows are copied"""
+        reference = self.reference
+        if reference is None or not len(raw):
+            return
+        if len(raw) >= self.fold_rows:
+            # Bin large blocks outside the lock so concurrent single rows never wait on them
+            counts = reference.count(raw)
+            with self._lock:
+                self._add(reference, counts)
+            return
+        with self._lock:
+            if self._buffered + len(raw) > self.fold_rows:
+                self._fold()
+            self._buffer[self._buffered:self._buffered + len(raw)] = raw
+            self._buffered += len(raw)
+
+    def _fold(self):
+        # Caller holds the lock
+        if self._buffered and self.reference is not None:
+            self._add(self.reference, self.reference.count(self._buffer[:self._buffered]))
+        self._buffered = 0
+
+    def _add(self, reference: DriftReference, counts: np.ndarray):
+        # Caller holds the lock; counts binned against a replaced reference are dropped
+        if reference is not self.reference:
+            return
+        epoch = int(time.time() // self.window_seconds)
+        slot = epoch % self.windows
+        if self._slot_epochs[slot] != epoch:
+            self._slots[slot] = 0
+            self._slot_epochs[slot] = epoch
+        self._slots[slot] += counts
+        self._lifetime += counts
+
+    def counts(self, window: str = "recent") -> np.ndarray:
+        """Flat counter vector of the recent window or the lifetime"""
+        with self._lock:
+            self._fold()
+            if window == "lifetime":
+                return self._lifetime.copy()
+            epoch = int(time.time() // self.window_seconds)
+            current = self._slot_epochs > epoch - self.windows
+            return self._slots[current].sum(axis=0)
+
+    def report(self, window: str = "recent") -> Dict[str, Any]:
+        if self.reference is None:
+            return {"enabled": False}
+        counts = self.counts(window)
+        features = self.reference.scores(counts, self.min_samples)
+        scored = {field: entry["psi"] for field, entry in features.items() if entry["psi"] is not None}
+        return {
+            "enabled": True,
+            "window": window,
+            "window_seconds": self.window_seconds * self.windows if window == "recent"
+            else round(time.time() - self._started, 3),
+            "rows": max(entry["samples"] + entry["missing"] for entry in features.values()),
+            "max_psi": max(scored.values()) if scored else None,
+            "drifted": [field for field, entry in features.items() if entry["status"] == "significant"],
+            "thresholds": {"moderate": PSI_MODERATE, "significant": PSI_SIGNIFICANT,
+                           "min_samples": self.min_samples},
+            "features": features,
+            "reference": self.reference.info(),
+        }
+
+    def psi(self, window: str = "recent") -> Dict[str, float]:
+        """PSI per feature; features with fewer than ``min_samples`` samples are left out"""
+        if self.reference is None:
+            return {}
+        features = self.reference.scores(self.counts(window), self.min_samples)
+        return {
+            field: entry["psi"] for field, entry in features.items()
+            if entry["psi"] is not None and entry["samples"] >= self.min_samples
+        }
+
+    def reset(self):
+        self.set_reference(self.reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the drift reference bins from the training dataset")
+    parser.add_argument("csv", nargs="?", default="../flood_risk_dataset_india.csv")
+    parser.add_argument("--output", default="drift_reference.json")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Quantile bins per continuous feature")
+    parser.add_argument("--compare", default=None, help="Another dataset CSV to score against the reference")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    reference = DriftReference.from_csv(args.csv, args.bins)
+    reference.save(args.output)
+    elapsed = time.perf_counter() - start
+    print(f"Reference bins from {reference.rows} rows in {elapsed:.3f}s -> {args.output}")
+
+    if args.compare:
+        raw = encode_csv(args.compare)
+        start = time.perf_counter()
+        counts = reference.count(raw)
+        elapsed = time.perf_counter() - start
+        print(f"Binned {len(raw)} rows of {args.compare} in {elapsed * 1000:.1f} ms")
+        print(f"{'Feature':<20} {'kind':<12} {'PSI':>9} {'KS':>9}  status")
+        for field, entry in reference.scores(counts).items():
+            ks = f"{entry['ks']:>9.4f}" if entry["ks"] is not None else f"{'-':>9}"
+            print(f"{field:<20} {entry['kind']:<12} {entry['psi']:>9.4f} {ks}  {entry['status']}")
+
+
+if __name__ == "__main__":
+    main()
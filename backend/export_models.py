@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Export the trained Keras classifiers to compact NumPy (.npz) models
+"""
+import argparse
+import sys
+from pathlib import Path
+import numpy as np
+
+from numpy_engine import NumpyModel
+
+
+def discover_keras_models(project_root: Path):
+    """Find every best_model.keras shipped with the project"""
+    sources = sorted(project_root.glob("Neural Network Classifier*/**/best_model.keras"))
+    backend_model = project_root / "backend" / "models" / "best_model.keras"
+    if backend_model.exists():
+        sources.append(backend_model)
+    return sources
+
+
+def verify_against_keras(keras_path: Path, model: NumpyModel, samples: np.ndarray) -> float:
+    """Return the max absolute difference between Keras and NumPy outputs"""
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(str(keras_path), compile=False)
+    expected = keras_model.predict(samples, verbose=0)
+    actual = model.predict_on_batch(samples)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def export_models(project_root: Path, verify: bool = False, tolerance: float = 1e-5) -> bool:
+    """Write best_model.npz next to every best_model.keras"""
+    sources = discover_keras_models(project_root)
+    if not sources:
+        print("Warning: No .keras models found")
+        return False
+
+    samples = None
+    if verify:
+        dataset = project_root / "mapped_dataset_Normalized_version.csv"
+        samples = np.loadtxt(dataset, delimiter=",", skiprows=1, max_rows=2000,
+                             dtype=np.float32)[:, :-1]
+
+    ok = True
+    for source in sources:
+        dest = source.with_suffix(".npz")
+        try:
+            model = NumpyModel.from_keras(source)
+            model.save(dest)
+        except Exception as e:
+            print(f"Failed to export {source}: {e}")
+            ok = False
+            continue
+
+        size_kb = dest.stat().st_size / 1024
+        print(f"Exported {source} -> {dest} ({model.count_params()} params, {size_kb:.1f} KB)")
+
+        if verify:
+            try:
+                diff = verify_against_keras(source, model, samples)
+            except Exception as e:
+                # Archives saved by Keras 2 do not deserialize under Keras 3
+                print(f"   Parity vs Keras: skipped ({type(e).__name__}: {str(e).splitlines()[0][:80]})")
+                continue
+            status = "OK" if diff <= tolerance else "MISMATCH"
+            print(f"   Parity vs Keras: max |diff| = {diff:.2e} [{status}]")
+            ok = ok and diff <= tolerance
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--project-root", type=Path, default=Path(".."),
+                        help="Project root containing the model folders (default: ..)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Compare NumPy outputs against Keras (requires tensorflow)")
+    parser.add_argument("--tolerance", type=float, default=1e-5,
+                        help="Maximum allowed absolute difference when verifying")
+    args = parser.parse_args()
+
+    if not export_models(args.project_root, verify=args.verify, tolerance=args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Per-feature analysis of a flood dataset in one pass, spread over a process pool
+
+Replaces the per-file loop of the Linear_model / RandomForest notebooks over
+``new_csv_files/file_N.csv``. The dataset is loaded once (CSV or column_store
+directory) and every feature is analysed against ``Flood Occurred`` in its
+own task. Each task computes univariate statistics, the correlation with the
+target, the notebooks' linear regression and random forest fits on the same
+unstratified 80/20 split, and plot data (predicted vs actual, per-class
+histograms and the flood rate per quantile bin).
+
+Results are cached per feature under a hash of that feature's values, the
+target and the analysis settings, so a re-run only recomputes features whose
+data changed. Charts are rendered to SVG with matplotlib when it is installed.
+
+    python feature_analysis.py --dataset ../mapped_dataset_Normalized_version.csv --output analysis
+"""
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, Any
+import numpy as np
+
+from feature_pipeline import FEATURE_COLUMNS, TARGET_COLUMN, load_dataset
+
+ANALYSIS_VERSION = 1
+
+HISTOGRAM_BINS = 20
+RATE_BINS = 10
+SCATTER_POINTS = 500
+
+
+# =============================================================================
+# PER-FEATURE ANALYSIS
+# =============================================================================
+
+def _regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, Optional[float]]:
+    """Same metrics as the notebooks' all_model_performance.xlsx"""
+    from sklearn.metrics import (
+        r2_score, mean_absolute_error, mean_squared_error,
+        mean_absolute_percentage_error, mean_squared_log_error
+    )
+
+    mse = float(mean_squared_error(y_true, y_pred))
+    msle = None
+    if not ((y_true <= 0).any() or (y_pred <= 0).any()):
+        msle = float(mean_squared_log_error(y_true, y_pred))
+    return {
+        "r2": float(r2_score(y_true, y_pred)),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "mse": mse,
+        "rmse": float(np.sqrt(mse)),
+        "mape": float(mean_absolute_percentage_error(y_true, y_pred) * 100),
+        "msle": msle,
+    }
+
+
+def _univariate(values: np.ndarray) -> Dict[str, Any]:
+    finite = values[np.isfinite(values)]
+    quartiles = np.percentile(finite, [25, 50, 75]) if finite.size else [None] * 3
+    return {
+        "count": int(finite.size),
+        "missing": int(values.size - finite.size),
+        "unique": int(np.unique(finite).size),
+        "mean": float(finite.mean()) if finite.size else None,
+        "std": float(finite.std(ddof=1)) if finite.size > 1 else None,
+        "min": float(finite.min()) if finite.size else None,
+        "q1": float(quartiles[0]) if finite.size else None,
+        "median": float(quartiles[1]) if finite.size else None,
+        "q3": float(quartiles[2]) if finite.size else None,
+        "max": float(finite.max()) if finite.size else None,
+    }
+
+
+def _correlation(values: np.ndarray, target: np.ndarray) -> Dict[str, Optional[float]]:
+    from scipy import stats
+
+    if np.ptp(values) == 0 or np.ptp(target) == 0:
+        return {"pearson": None, "pearson_p": None, "spearman": None, "spearman_p": None}
+    pearson = stats.pearsonr(values, target)
+    spearman = stats.spearmanr(values, target)
+    return {
+        "pearson": float(pearson[0]), "pearson_p": float(pearson[1]),
+        "spearman": float(spearman[0]), "spearman_p": float(spearman[1]),
+    }
+
+
+def _plot_data(values: np.ndarray, target: np.ndarray, y_test: np.ndarray,
+               predictions: Dict[str, np.ndarray], seed: int) -> Dict[str, Any]:
+    edges = np.histogram_bin_edges(values, bins=HISTOGRAM_BINS)
+    histograms = {
+        str(int(label)): np.histogram(values[target == label], bins=edges)[0].tolist()
+        for label in np.unique(target)
+    }
+
+    # Flood rate per quantile bin (duplicate edges collapse for discrete features)
+    rate_edges = np.unique(np.quantile(values, np.linspace(0, 1, RATE_BINS + 1)))
+    bins = np.clip(np.searchsorted(rate_edges, values, side="right") - 1, 0, max(len(rate_edges) - 2, 0))
+    counts = np.bincount(bins, minlength=max(len(rate_edges) - 1, 1))
+    positives = np.bincount(bins, weights=target, minlength=len(counts))
+    rate = np.divide(positives, counts, out=np.full(len(counts), np.nan), where=counts > 0)
+
+    sample = np.random.default_rng(seed).permutation(len(y_test))[:SCATTER_POINTS]
+    return {
+        "histogram": {"edges": edges.tolist(), "counts_by_target": histograms},
+        "flood_rate": {
+            "edges": rate_edges.tolist(),
+            "counts": counts.tolist(),
+            "rate": [None if np.isnan(r) else float(r) for r in rate],
+        },
+        "predicted_vs_actual": {
+            "actual": y_test[sample].tolist(),
+            **{name: pred[sample].tolist() for name, pred in predictions.items()},
+        },
+    }
+
+
+def analyse_feature(feature: str, values: np.ndarray, target: np.ndarray,
+                    settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Statistics, correlation, notebook fits and plot data for one feature"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression
+    from sklearn.ensemble import RandomForestRegressor
+
+    start = time.perf_counter()
+    values = np.asarray(values, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+
+    # Same unstratified split as perform_linear_regression / perform_RandomForest
+    x_train, x_test, y_train, y_test = train_test_split(
+        values.reshape(-1, 1), target, test_size=0.2, random_state=settings["seed"]
+    )
+    models = {
+        "linear_regression": LinearRegression(),
+        "random_forest": RandomForestRegressor(
+            n_estimators=settings["trees"], random_state=settings["seed"], n_jobs=1
+        ),
+    }
+    predictions, fits = {}, {}
+    for name, model in models.items():
+        model.fit(x_train, y_train)
+        predictions[name] = model.predict(x_test)
+        fits[name] = _regression_metrics(y_test, predictions[name])
+    fits["linear_regression"]["coefficient"] = float(models["linear_regression"].coef_[0])
+    fits["linear_regression"]["intercept"] = float(models["linear_regression"].intercept_)
+
+    return {
+        "feature": feature,
+        "statistics": _univariate(values),
+        "correlation": _correlation(values, target),
+        "fits": fits,
+        "plot": _plot_data(values, target, y_test, predictions, settings["seed"]),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# =============================================================================
+# CACHE AND ENGINE
+# =============================================================================
+
+def feature_key(values: np.ndarray, target: np.ndarray, settings: Dict[str, Any]) -> str:
+    """Hash of one feature's data, the target and everything that affects its analysis"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps({"version": ANALYSIS_VERSION, **settings}, sort_keys=True).encode())
+    for array in (values, target):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class FeatureAnalysis:
+    """Runs ``analyse_feature`` for every feature in a process pool, reusing cached results"""
+
+    def __init__(self, cache_dir="analysis_cache", workers: int = 0, trees: int = 100, seed: int = 42):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.settings = {"trees": trees, "seed": seed}
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._cache_path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        path = self._cache_path(key)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        tmp.replace(path)
+
+    def run(self, columns: Dict[str, np.ndarray], features: List[str] = FEATURE_COLUMNS,
+            target_column: str = TARGET_COLUMN) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Analyse ``features``; returns ({feature: result}, run summary)"""
+        start = time.perf_counter()
+        target = np.asarray(columns[target_column], dtype=np.float64)
+        keys = {feature: feature_key(columns[feature], target, self.settings) for feature in features}
+
+        results: Dict[str, Any] = {}
+        pending = []
+        for feature in features:
+            cached = self._cached(keys[feature])
+            if cached is not None:
+                results[feature] = cached
+            else:
+                pending.append(feature)
+
+        if pending:
+            workers = min(self.workers, len(pending))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(analyse_feature, feature, np.asarray(columns[feature]), target, self.settings): feature
+                    for feature in pending
+                }
+                for future in as_completed(futures):
+                    feature = futures[future]
+                    result = future.result()
+                    self._store(keys[feature], result)
+                    results[feature] = result
+
+        dataset_hash = hashlib.sha1("".join(keys[f] for f in features).encode()).hexdigest()
+        summary = {
+            "dataset_hash": dataset_hash,
+            "rows": int(len(target)),
+            "features": len(features),
+            "computed": pending,
+            "cached": [f for f in features if f not in pending],
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        return {feature: results[feature] for feature in features}, summary
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def summary_rows(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for feature, result in results.items():
+        stats, corr, fits = result["statistics"], result["correlation"], result["fits"]
+        rows.append({
+            "feature": feature,
+            "mean": stats["mean"], "std": stats["std"], "min": stats["min"], "max": stats["max"],
+            "unique": stats["unique"],
+            "pearson": corr["pearson"], "spearman": corr["spearman"],
+            "linear_r2": fits["linear_regression"]["r2"], "linear_rmse": fits["linear_regression"]["rmse"],
+            "forest_r2": fits["random_forest"]["r2"], "forest_rmse": fits["random_forest"]["rmse"],
+        })
+    return rows
+
+
+def render_plots(results: Dict[str, Any], output_dir: Path) -> int:
+    """SVG charts like the notebooks' file_N_plot.svg; skipped without matplotlib"""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; plot data is in analysis.json only")
+        return 0
+
+    for i, (feature, result) in enumerate(results.items(), 1):
+        plot = result["plot"]
+        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+
+        scatter = plot["predicted_vs_actual"]
+        for name in ("linear_regression", "random_forest"):
+            axes[0].scatter(scatter["actual"], scatter[name], alpha=0.5, s=10, label=name)
+        axes[0].plot([0, 1], [0, 1], color="red", linestyle="--", linewidth=2)
+        axes[0].set(title=f"Predicted vs. Actual Values for {feature}", xlabel="Actual Values", ylabel="Predicted Values")
+        axes[0].legend()
+
+        edges = np.asarray(plot["histogram"]["edges"])
+        for label, counts in plot["histogram"]["counts_by_target"].items():
+            axes[1].stairs(counts, edges, label=f"{TARGET_COLUMN} = {label}")
+        axes[1].set(title="Distribution by class", xlabel=feature)
+        axes[1].legend()
+
+        rate = plot["flood_rate"]
+        centers = (np.asarray(rate["edges"][:-1]) + np.asarray(rate["edges"][1:])) / 2 if len(rate["edges"]) > 1 else [0]
+        axes[2].plot(centers, [np.nan if r is None else r for r in rate["rate"]], marker="o")
+        axes[2].set(title="Flood rate per quantile bin", xlabel=feature, ylabel="Rate")
+
+        for ax in axes:
+            ax.grid(True)
+        fig.tight_layout()
+        fig.savefig(output_dir / f"file_{i}_plot.svg", format="svg")
+        plt.close(fig)
+    return len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse every feature against the flood target in parallel")
+    parser.add_argument("--dataset", default="../mapped_dataset_Normalized_version.csv",
+                        help="CSV file or column_store dataset directory")
+    parser.add_argument("--output", default="analysis", help="Directory for analysis.json, summary.csv and plots")
+    parser.add_argument("--cache", default="analysis_cache", help="Per-feature result cache directory")
+    parser.add_argument("--features", nargs="+", default=None, help="Subset of feature columns (default: all 13)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: all cores)")
+    parser.add_argument("--trees", type=int, default=100, help="Random forest size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--plots", action="store_true", help="Render SVG charts (requires matplotlib)")
+    args = parser.parse_args()
+
+    columns = load_dataset(args.dataset)
+    features = args.features or FEATURE_COLUMNS
+    missing = [feature for feature in features + [TARGET_COLUMN] if feature not in columns]
+    if missing:
+        raise SystemExit(f"Columns not in {args.dataset}: {missing}")
+
+    engine = FeatureAnalysis(args.cache, workers=args.workers, trees=args.trees, seed=args.seed)
+    results, summary = engine.run(columns, features)
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "analysis.json", "w") as f:
+        json.dump({"summary": summary, "features": results}, f, indent=2, ensure_ascii=False)
+
+    rows = summary_rows(results)
+    with open(output_dir / "summary.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    if args.plots:
+        render_plots(results, output_dir)
+
+    print(f"{'Feature':<24} {'Pearson':>9} {'Linear R2':>10} {'Forest R2':>10}")
+    for row in rows:
+        pearson = "n/a" if row["pearson"] is None else f"{row['pearson']:.4f}"
+        print(f"{row['feature']:<24} {pearson:>9} {row['linear_r2']:>10.4f} {row['forest_r2']:>10.4f}")
+    print(f"\n{len(summary['computed'])} computed, {len(summary['cached'])} from cache "
+          f"in {summary['seconds']:.2f}s (dataset {summary['dataset_hash'][:12]}); results in {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Feature pipeline shared by training, evaluation and serving
+
+Compiles Normalized_param.json (min-max scaling, as written by
+ModelCleaning.ipynb) and, optionally, Standardized_param.json (the
+StandardScaler the training notebooks fit on the normalized training split)
+into one contiguous ``scale``/``offset`` pair, so a whole (N, 13) block is
+transformed with ``X * scale + offset`` and no per-feature dict lookups.
+"""
+import json
+import argparse
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Column names used by the datasets and Normalized_param.json, in model order
+FEATURE_COLUMNS = [
+    "Latitude", "Longitude", "Rainfall (mm)", "Temperature (°C)", "Humidity (%)",
+    "River Discharge (m³/s)", "Water Level (m)", "Elevation (m)", "Land Cover",
+    "Soil Type", "Population Density", "Infrastructure", "Historical Floods"
+]
+TARGET_COLUMN = "Flood Occurred"
+
+# Matching FloodPredictionRequest field names, in the same order
+REQUEST_FIELDS = [
+    'latitude', 'longitude', 'rainfall', 'temperature', 'humidity',
+    'river_discharge', 'water_level', 'elevation', 'land_cover',
+    'soil_type', 'population_density', 'infrastructure', 'historical_floods'
+]
+
+# Category codes, as mapped in ModelCleaning.ipynb
+LAND_COVER_CODES = {
+    'Water Body': 1,
+    'Forest': 2,
+    'Agricultural': 3,
+    'Desert': 4,
+    'Urban': 5
+}
+
+SOIL_TYPE_CODES = {
+    'Clay': 1,
+    'Peat': 2,
+    'Loam': 3,
+    'Sandy': 4,
+    'Silt': 5
+}
+
+CATEGORY_CODES = {
+    "Land Cover": LAND_COVER_CODES,
+    "Soil Type": SOIL_TYPE_CODES,
+}
+
+N_FEATURES = len(FEATURE_COLUMNS)
+
+# Valid request values; FloodPredictionRequest, /predict/columnar and bulk scoring all enforce these
+FIELD_BOUNDS = {
+    'latitude': {'ge': -90, 'le': 90},
+    'longitude': {'ge': -180, 'le': 180},
+    'elevation': {'ge': 0, 'le': 10000},
+    'rainfall': {'ge': 0, 'le': 1000},
+    'temperature': {'ge': -50, 'le': 60},
+    'humidity': {'ge': 0, 'le': 100},
+    'river_discharge': {'ge': 0, 'le': 10000},
+    'water_level': {'ge': 0, 'le': 50},
+    'population_density': {'ge': 0, 'le': 50000},
+    'infrastructure': {'ge': 0, 'le': 1},
+    'historical_floods': {'ge': 0, 'le': 1},
+}
+INTEGER_FIELDS = ('infrastructure', 'historical_floods')
+
+
+def _category_value(value) -> str:
+    return value.value if isinstance(value, Enum) else value
+
+
+def encode_categories(values: Sequence, codes: Mapping[str, int]) -> np.ndarray:
+    """Map category strings (or values already coded) to their numeric codes"""
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.float32)
+
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    try:
+        lookup = np.array([codes[u] for u in uniques], dtype=np.float32)
+    except KeyError as e:
+        raise ValueError(f"Unknown category {e.args[0]!r}; expected one of {list(codes)}")
+    return lookup[inverse]
+
+
+def valid_rows(features: np.ndarray) -> np.ndarray:
+    """Mask of raw (N, 13) rows with every value present, within FIELD_BOUNDS and a known category code"""
+    valid = ~np.isnan(features).any(axis=1)
+    for j, (field, column) in enumerate(zip(REQUEST_FIELDS, FEATURE_COLUMNS)):
+        values = features[:, j]
+        with np.errstate(invalid="ignore"):
+            if field in FIELD_BOUNDS:
+                valid &= (values >= FIELD_BOUNDS[field]['ge']) & (values <= FIELD_BOUNDS[field]['le'])
+            if field in INTEGER_FIELDS:
+                valid &= values == np.round(values)
+        if column in CATEGORY_CODES:
+            valid &= np.isin(values, list(CATEGORY_CODES[column].values()))
+    return valid
+
+
+def versioned_params(directory) -> List[Tuple[int, Path]]:
+    """``(version, path)`` of every ``Normalized_param.vN.json`` in ``directory``, oldest first"""
+    found = []
+    for path in Path(directory).glob("Normalized_param.v*.json"):
+        version = path.name[len("Normalized_param.v"):-len(".json")]
+        if version.isdigit():
+            found.append((int(version), path))
+    return sorted(found)
+
+
+def resolve_params_path(path):
+    """A parameter file as given, or the newest versioned file if ``path`` is a directory"""
+    if path and Path(path).is_dir():
+        found = versioned_params(path)
+        return found[-1][1] if found else None
+    return path
+
+
+class FeaturePipeline:
+    """Encode and scale flood features as one affine transform per column"""
+
+    def __init__(self, scale: np.ndarray, offset: np.ndarray, metadata: Optional[Dict[str, Any]] = None):
+        self.scale = np.ascontiguousarray(scale, dtype=np.float32)
+        self.offset = np.ascontiguousarray(offset, dtype=np.float32)
+        if self.scale.shape != (N_FEATURES,) or self.offset.shape != (N_FEATURES,):
+            raise ValueError(f"scale and offset must have shape ({N_FEATURES},)")
+        self.metadata = metadata or {}
+
+    @classmethod
+    def identity(cls) -> "FeaturePipeline":
+        return cls(np.ones(N_FEATURES), np.zeros(N_FEATURES), {"normalized": False, "standardized": False})
+
+    @classmethod
+    def compile(cls, normalization_params: Optional[Mapping[str, Mapping[str, float]]],
+                standardization_params: Optional[Mapping[str, Mapping[str, float]]] = None) -> "FeaturePipeline":
+        """Fold min-max scaling and optional standardization into scale/offset arrays"""
+        scale = np.ones(N_FEATURES, dtype=np.float64)
+        offset = np.zeros(N_FEATURES, dtype=np.float64)
+
+        for i, (column, field) in enumerate(zip(FEATURE_COLUMNS, REQUEST_FIELDS)):
+            if normalization_params:
+                params = normalization_params.get(column, normalization_params.get(field))
+                if params is None:
+                    logger.warning(f"No normalization parameters for '{column}'; passing it through")
+                else:
+                    span = params['max'] - params['min']
+                    # Constant columns normalize to 0.0, as in ModelCleaning.ipynb
+                    scale[i] = 1.0 / span if span != 0 else 0.0
+                    offset[i] = -params['min'] * scale[i]
+
+            if standardization_params:
+                params = standardization_params.get(column, standardization_params.get(field))
+                if params is None:
+                    logger.warning(f"No standardization parameters for '{column}'")
+                else:
+                    std = params['std'] if params['std'] != 0 else 1.0
+                    scale[i] /= std
+                    offset[i] = (offset[i] - params['mean']) / std
+
+        metadata = {
+            "normalized": bool(normalization_params),
+            "standardized": bool(standardization_params),
+        }
+        return cls(scale, offset, metadata)
+
+    @classmethod
+    def from_files(cls, normalization_path, standardization_path=None) -> "FeaturePipeline":
+        """Compile from Normalized_param.json and optionally Standardized_param.json.
+
+        ``normalization_path`` may also be a directory of versioned
+        ``Normalized_param.vN.json`` files, in which case the newest is used.
+        """
+        normalization_path = resolve_params_path(normalization_path)
+        normalization_params = None
+        standardization_params = None
+        if normalization_path and Path(normalization_path).exists():
+            with open(normalization_path, 'r') as f:
+                normalization_params = json.load(f)
+        if standardization_path and Path(standardization_path).exists():
+            with open(standardization_path, 'r') as f:
+                standardization_params = json.load(f)
+        pipeline = cls.compile(normalization_params, standardization_params)
+        pipeline.metadata["normalization_path"] = str(normalization_path) if normalization_params else None
+        pipeline.metadata["standardization_path"] = str(standardization_path) if standardization_params else None
+        pipeline.metadata["normalization_version"] = (normalization_params or {}).get("_meta", {}).get("version")
+        return pipeline
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def encode_requests(self, requests: Sequence[Any]) -> np.ndarray:
+        """Encode request objects (e.g. FloodPredictionRequest) into raw (N, 13) float32"""
+        features = np.empty((len(requests), N_FEATURES), dtype=np.float32)
+        for j, field in enumerate(REQUEST_FIELDS):
+            if field == 'land_cover':
+                features[:, j] = [LAND_COVER_CODES[_category_value(r.land_cover)] for r in requests]
+            elif field == 'soil_type':
+                features[:, j] = [SOIL_TYPE_CODES[_category_value(r.soil_type)] for r in requests]
+            else:
+                features[:, j] = [getattr(r, field) for r in requests]
+        return features
+
+    def encode_columns(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        """Encode dataset columns (keyed by FEATURE_COLUMNS names) into raw (N, 13) float32.
+
+        Works with a pandas DataFrame or a dict of arrays; ``Land Cover`` and
+        ``Soil Type`` may hold either category strings or their numeric codes.
+        """
+        n_rows = len(columns[FEATURE_COLUMNS[0]])
+        features = np.empty((n_rows, N_FEATURES), dtype=np.float32)
+        for j, column in enumerate(FEATURE_COLUMNS):
+            values = columns[column]
+            if column in CATEGORY_CODES:
+                features[:, j] = encode_categories(values, CATEGORY_CODES[column])
+            else:
+                features[:, j] = np.asarray(values, dtype=np.float32)
+        return features
+
+    # ------------------------------------------------------------------
+    # Scaling
+    # ------------------------------------------------------------------
+
+    def transform(self, features: np.ndarray, copy: bool = False) -> np.ndarray:
+        """Scale an encoded (N, 13) block, in place unless ``copy`` is set"""
+        if copy or features.dtype != np.float32 or not features.flags.c_contiguous:
+            features = np.array(features, dtype=np.float32, order="C")
+        features *= self.scale
+        features += self.offset
+        return features
+
+    def transform_requests(self, requests: Sequence[Any]) -> np.ndarray:
+        return self.transform(self.encode_requests(requests))
+
+    def transform_columns(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        return self.transform(self.encode_columns(columns))
+
+
+# =============================================================================
+# TRAINING HELPERS
+# =============================================================================
+
+def fit_standardization(features: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """Per-column mean/std, matching sklearn's StandardScaler (ddof=0)"""
+    features = np.asarray(features, dtype=np.float64)
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    return {
+        column: {'mean': float(m), 'std': float(s)}
+        for column, m, s in zip(FEATURE_COLUMNS, mean, std)
+    }
+
+
+def training_split(n_rows: int, target: np.ndarray, test_size: float = 0.2, random_state: int = 42):
+    """Train/test row indices, identical to the notebooks' stratified split"""
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(
+        np.arange(n_rows), test_size=test_size, random_state=random_state, stratify=target
+    )
+
+
+def load_dataset(csv_path) -> Dict[str, np.ndarray]:
+    """Read a flood dataset CSV, or a column_store dataset directory, into a dict of columns"""
+    from column_store import ColumnStore, is_store
+
+    if is_store(csv_path):
+        return ColumnStore(csv_path).to_dict()
+
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    return {column: df[column].to_numpy() for column in df.columns}
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def check_golden(raw_csv, normalized_csv, normalization_path, tolerance: float = 1e-5) -> float:
+    """Compare the pipeline's min-max output with the notebook-normalized dataset"""
+    pipeline = FeaturePipeline.from_files(normalization_path)
+    actual = pipeline.transform_columns(load_dataset(raw_csv))
+    golden = load_dataset(normalized_csv)
+    expected = np.column_stack([golden[column] for column in FEATURE_COLUMNS])
+    diff = float(np.max(np.abs(actual - expected)))
+    status = "OK" if diff <= tolerance else "MISMATCH"
+    print(f"{raw_csv} vs {normalized_csv}: max |diff| = {diff:.2e} [{status}]")
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature pipeline utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check = subparsers.add_parser("check", help="Check the pipeline against the normalized dataset")
+    check.add_argument("--raw", default="../flood_risk_dataset_india.csv")
+    check.add_argument("--normalized", default="../mapped_dataset_Normalized_version.csv")
+    check.add_argument("--params", default="Normalized_param.json")
+    check.add_argument("--tolerance", type=float, default=1e-5)
+
+    fit = subparsers.add_parser("fit-standardization",
+                                help="Write the StandardScaler statistics of the training split")
+    fit.add_argument("--normalized", default="../mapped_dataset_Normalized_version.csv")
+    fit.add_argument("--output", default="Standardized_param.json")
+
+    args = parser.parse_args()
+
+    if args.command == "check":
+        diff = check_golden(args.raw, args.normalized, args.params)
+        if diff > args.tolerance:
+            raise SystemExit(1)
+    elif args.command == "fit-standardization":
+        columns = load_dataset(args.normalized)
+        features = np.column_stack([columns[column] for column in FEATURE_COLUMNS])
+        train_idx, _ = training_split(len(features), columns[TARGET_COLUMN])
+        with open(args.output, 'w') as f:
+            json.dump(fit_standardization(features[train_idx]), f, indent=4)
+        print(f"Standardization parameters saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
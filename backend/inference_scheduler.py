@@ -0,0 +1,166 @@
+"""
+Dynamic micro-batching for concurrent single-row predictions
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceScheduler:
+    """Collect concurrent predict calls into batched forward passes.
+
+    Callers ``await submit(row)`` with one encoded feature row. A single
+    worker task drains the queue, waiting at most ``max_wait_ms`` (or until
+    ``max_batch_size`` rows are queued) before running ``predict_fn`` once on
+    the stacked rows in a worker thread, so the event loop is never blocked.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._busy = False
+        self._batch: List[Tuple[np.ndarray, asyncio.Future]] = []
+
+        # Metrics
+        self.requests_total = 0
+        self.batches_total = 0
+        self.batched_rows_total = 0
+        self.max_batch_seen = 0
+        self.max_queue_depth = 0
+        self.inference_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the batching worker on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            f"Inference scheduler started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    async def stop(self, drain: bool = False):
+        """Stop the worker; with ``drain`` queued requests are served first, otherwise failed"""
+        if self._worker is None:
+            return
+        if drain:
+            while self.running and (not self._queue.empty() or self._busy):
+                await asyncio.sleep(self.max_wait or 0.001)
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Fail the batch being collected when cancelled, then anything still queued
+        pending = [future for _, future in self._batch]
+        self._batch = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[1])
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Inference scheduler stopped"))
+
+    async def submit(self, row: np.ndarray) -> float:
+        """Queue one encoded feature row and wait for its probability"""
+        if not self.running:
+            raise RuntimeError("Inference scheduler is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        self.requests_total += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first request, then gather more until full or timed out"""
+        batch = self._batch = [await self._queue.get()]
+        # Busy from the first row on, so a draining stop() waits for this batch
+        self._busy = True
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without yielding
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if len(batch) >= self.max_batch_size:
+                break
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            try:
+                await self._run_batch(loop, batch)
+            finally:
+                self._busy = False
+            self._batch = []
+
+    async def _run_batch(self, loop, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        # Drop callers that gave up while waiting
+        batch = [(row, future) for row, future in batch if not future.done()]
+        if not batch:
+            return
+
+        features = np.stack([row for row, _ in batch])
+        start = time.perf_counter()
+        try:
+            probabilities = await loop.run_in_executor(None, self.predict_fn, features)
+        except Exception as e:
+            logger.error(f"Batched inference failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Prediction failed: {str(e)}"))
+            return
+        finally:
+            self.inference_seconds += time.perf_counter() - start
+
+        self.batches_total += 1
+        self.batched_rows_total += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        for (_, future), probability in zip(batch, np.asarray(probabilities).reshape(-1).tolist()):
+            if not future.done():
+                future.set_result(probability)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and batch size metrics"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "requests_total": self.requests_total,
+            "batches_total": self.batches_total,
+            "mean_batch_size": self.batched_rows_total / self.batches_total if self.batches_total else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "inference_seconds_total": self.inference_seconds,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
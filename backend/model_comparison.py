@@ -0,0 +1,195 @@
+"""
+Ensemble and shadow scoring of candidate models on live traffic
+"""
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
+import numpy as np
+
+from model_registry import ModelEntry
+
+logger = logging.getLogger(__name__)
+
+
+class DisagreementStats:
+    """Running agreement between one candidate and the primary model"""
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.disagreements = 0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+        self.primary_positive = 0
+        self.candidate_positive = 0
+        self.seconds = 0.0
+        self.errors = 0
+
+    def update(self, primary: np.ndarray, candidate: np.ndarray, seconds: float):
+        primary_labels = primary > 0.5
+        candidate_labels = candidate > 0.5
+        diff = np.abs(primary - candidate)
+        self.rows += len(primary)
+        self.batches += 1
+        self.disagreements += int(np.count_nonzero(primary_labels != candidate_labels))
+        self.abs_diff_sum += float(diff.sum())
+        self.max_abs_diff = max(self.max_abs_diff, float(diff.max(initial=0.0)))
+        self.primary_positive += int(np.count_nonzero(primary_labels))
+        self.candidate_positive += int(np.count_nonzero(candidate_labels))
+        self.seconds += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        rows = self.rows or 1
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "disagreements": self.disagreements,
+            "disagreement_rate": self.disagreements / rows if self.rows else 0.0,
+            "mean_abs_probability_diff": self.abs_diff_sum / rows if self.rows else 0.0,
+            "max_abs_probability_diff": self.max_abs_diff,
+            "primary_positive_rate": self.primary_positive / rows if self.rows else 0.0,
+            "candidate_positive_rate": self.candidate_positive / rows if self.rows else 0.0,
+            "mean_batch_seconds": self.seconds / self.batches if self.batches else 0.0,
+            "errors": self.errors,
+        }
+
+
+class ModelComparison:
+    """Score candidate models on the same preprocessed batch as the primary model.
+
+    Ensemble members run in parallel with the primary model on a thread pool
+    (NumPy releases the GIL inside the matrix products) and their
+    probabilities are averaged into the response. Shadow models are
+    submitted after the primary result is known, on a separate pool so a
+    shadow backlog never delays an ensemble member; their output is only
+    compared, counted and optionally appended to an NDJSON log.
+
+    Only scored batches are compared: /predict answers repeated payloads from
+    the prediction cache without running any model, so those requests are
+    counted in ``skipped_cache_hits`` instead of the disagreement stats.
+    """
+
+    def __init__(self, ensemble: Optional[List[str]] = None, shadows: Optional[List[str]] = None,
+                 max_workers: Optional[int] = None, max_pending: int = 64, log_path: Optional[str] = None):
+        self.ensemble = list(ensemble or [])
+        self.shadows = list(shadows or [])
+        self.max_pending = max_pending
+        self.log_path = log_path
+        self._ensemble_executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(len(self.ensemble), os.cpu_count() or 1) or 1,
+            thread_name_prefix="model-ensemble"
+        )
+        self._shadow_executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(len(self.shadows), os.cpu_count() or 1) or 1,
+            thread_name_prefix="model-shadow"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.dropped_batches = 0
+        self.skipped_cache_hits = 0
+        self.stats: Dict[str, DisagreementStats] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.ensemble or self.shadows)
+
+    def _stats_for(self, name: str) -> DisagreementStats:
+        # Callers hold self._lock
+        return self.stats.setdefault(name, DisagreementStats())
+
+    def _record(self, candidate: ModelEntry, primary: np.ndarray, probabilities: np.ndarray, seconds: float):
+        with self._lock:
+            self._stats_for(candidate.name).update(primary, probabilities, seconds)
+
+    def _timed_predict(self, entry: ModelEntry, features: np.ndarray):
+        start = time.perf_counter()
+        return entry.predict(features), time.perf_counter() - start
+
+    def _run_shadow(self, candidate: ModelEntry, features: np.ndarray, primary: np.ndarray):
+        try:
+            probabilities, seconds = self._timed_predict(candidate, features)
+            self._record(candidate, primary, probabilities, seconds)
+            if self.log_path:
+                record = {
+                    "time": time.time(),
+                    "model": candidate.name,
+                    "primary": np.round(primary, 6).tolist(),
+                    "candidate": np.round(probabilities, 6).tolist(),
+                }
+                with self._lock, open(self.log_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.warning(f"Shadow model '{candidate.name}' failed: {str(e)}")
+            with self._lock:
+                self._stats_for(candidate.name).errors += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _submit_shadows(self, shadows: List[ModelEntry], features: np.ndarray, primary: np.ndarray):
+        for candidate in shadows:
+            with self._lock:
+                # Shed shadow work rather than queue without bound behind a slow candidate
+                if self._pending >= self.max_pending:
+                    self.dropped_batches += 1
+                    continue
+                self._pending += 1
+            self._shadow_executor.submit(self._run_shadow, candidate, features, primary)
+
+    def predict_fn(self, primary: ModelEntry, ensemble: List[ModelEntry],
+                   shadows: List[ModelEntry]) -> Callable[[np.ndarray], np.ndarray]:
+        """Blocking predict function for the primary model plus its candidates"""
+
+        def predict(features: np.ndarray) -> np.ndarray:
+            futures = [(entry, self._ensemble_executor.submit(self._timed_predict, entry, features))
+                       for entry in ensemble]
+            primary_probabilities = primary.predict(features)
+
+            result = primary_probabilities
+            if futures:
+                members = [primary_probabilities]
+                for entry, future in futures:
+                    try:
+                        probabilities, seconds = future.result()
+                    except Exception as e:
+                        logger.warning(f"Ensemble model '{entry.name}' failed: {str(e)}")
+                        with self._lock:
+                            self._stats_for(entry.name).errors += 1
+                        continue
+                    self._record(entry, primary_probabilities, probabilities, seconds)
+                    members.append(probabilities)
+                result = np.mean(members, axis=0)
+
+            if shadows:
+                self._submit_shadows(shadows, features, primary_probabilities)
+            return result
+
+        return predict
+
+    def report(self, primary: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            candidates = {name: stats.to_dict() for name, stats in self.stats.items()}
+            pending = self._pending
+        return {
+            "primary_model": primary,
+            "ensemble_models": self.ensemble,
+            "shadow_models": self.shadows,
+            "pending_shadow_batches": pending,
+            "dropped_shadow_batches": self.dropped_batches,
+            "skipped_cache_hits": self.skipped_cache_hits,
+            "candidates": candidates,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.dropped_batches = 0
+            self.skipped_cache_hits = 0
+
+    def shutdown(self):
+        self._ensemble_executor.shutdown(wait=False, cancel_futures=True)
+        self._shadow_executor.shutdown(wait=False, cancel_futures=True)
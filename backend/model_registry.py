@@ -0,0 +1,268 @@
+"""
+Registry of every trained classifier variant with atomic hot reload
+"""
+import re
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+import numpy as np
+
+from numpy_engine import NumpyModel
+
+logger = logging.getLogger(__name__)
+
+
+def variant_label(name: str) -> str:
+    """Model name as reported in ``model_used``"""
+    return "Neural Network Classifier" if name == "base" else f"Neural Network Classifier {name}"
+
+
+class ModelEntry:
+    """One loaded model plus the metadata needed to serve and report it"""
+
+    def __init__(self, name: str, path: Path, model, engine: str, display_name: str, load_seconds: float,
+                 digest: str = ""):
+        self.name = name
+        self.path = path
+        self.model = model
+        self.engine = engine
+        self.display_name = display_name
+        self.load_seconds = load_seconds
+        self.digest = digest
+        self.loaded_at = time.time()
+        self.version = f"{path}:{path.stat().st_mtime_ns}"
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the weights"""
+        if hasattr(self.model, "nbytes"):
+            return int(self.model.nbytes)
+        return int(sum(np.asarray(w).nbytes for w in self.model.get_weights()))
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Run one blocking forward pass over an (N, 13) matrix"""
+        return np.asarray(self.model.predict_on_batch(features)).reshape(-1)
+
+    def sample(self, features: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Forward pass with dropout active (one MC-dropout draw per row)"""
+        if isinstance(self.model, NumpyModel):
+            return np.asarray(self.model.predict_on_batch(features, rng)).reshape(-1)
+        # Keras would also switch BatchNormalization to batch statistics in training mode
+        if any(type(layer).__name__ == "BatchNormalization" for layer in self.model.layers):
+            raise ValueError(f"MC dropout on '{self.name}' needs the numpy engine (BatchNormalization)")
+        return np.asarray(self.model(features, training=True)).reshape(-1)
+
+    def input_gradients(self, features: np.ndarray) -> np.ndarray:
+        """d probability / d input for every row of an (N, 13) matrix"""
+        if isinstance(self.model, NumpyModel):
+            return self.model.input_gradients(features)
+        import tensorflow as tf
+
+        x = tf.convert_to_tensor(features, dtype=tf.float32)
+        with tf.GradientTape() as tape:
+            tape.watch(x)
+            output = self.model(x, training=False)
+        return tape.gradient(output, x).numpy()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "display_name": self.display_name,
+            "path": str(self.path),
+            "engine": self.engine,
+            "weight_format": getattr(self.model, "metadata", {}).get("weight_format", "float32"),
+            "version": self.version,
+            "weights_sha1": self.digest,
+            "total_params": int(self.model.count_params()),
+            "memory_bytes": self.nbytes,
+            "load_seconds": round(self.load_seconds, 6),
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """Discover, load and hot-swap all ``best_model`` variants.
+
+    Loaded models live in one dict that is replaced wholesale on reload, so
+    a request that already resolved its ModelEntry keeps using that model
+    while new requests see the new set. Loading and warm-up happen before
+    the swap, off the serving path.
+    """
+
+    def __init__(self, project_root: Path = Path(".."), models_dir: Path = Path("models"),
+                 engine: str = "numpy", default_model: str = "production", weight_format: str = "float32"):
+        self.project_root = Path(project_root)
+        self.models_dir = Path(models_dir)
+        self.engine = engine
+        self.weight_format = weight_format
+        self.default_model = default_model
+        self.generation = 0
+        self._entries: Dict[str, ModelEntry] = {}
+        self._reload_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Discovery and loading
+    # ------------------------------------------------------------------
+
+    def _best_file(self, directory: Path) -> Optional[Path]:
+        suffixes = [".npz", ".keras"] if self.engine == "numpy" else [".keras"]
+        if self.engine == "numpy" and self.weight_format != "float32":
+            # Written by quantize_models.py only when the accuracy gate passed
+            suffixes.insert(0, f".{self.weight_format}.npz")
+        for suffix in suffixes:
+            path = directory / f"best_model{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def discover(self) -> Dict[str, Path]:
+        """Map variant names (production, base, v1 ... v7, v4.1) to model files"""
+        found = {}
+        production = self._best_file(self.models_dir)
+        if production:
+            found["production"] = production
+
+        base = self._best_file(self.project_root / "Neural Network Classifier")
+        if base:
+            found["base"] = base
+
+        for directory in sorted((self.project_root / "Neural Network Classifier0").glob("Neural Network Classifier_v*")):
+            path = self._best_file(directory)
+            match = re.search(r"_(v[\d.]+)$", directory.name)
+            if path and match:
+                found[match.group(1)] = path
+        return found
+
+    def _load_file(self, path: Path):
+        if path.suffix == ".npz":
+            return NumpyModel.load(path), "numpy"
+        if self.engine == "numpy":
+            # Read the .keras archive directly; no TensorFlow needed
+            return NumpyModel.from_keras(path), "numpy"
+
+        import tensorflow as tf
+        return tf.keras.models.load_model(str(path), compile=False), "keras"
+
+    @staticmethod
+    def _weights_digest(model) -> str:
+        """Hash of the weight arrays, independent of file format and metadata"""
+        if isinstance(model, NumpyModel):
+            weights = [layer[key] for layer in model.layers for key in sorted(layer)
+                       if isinstance(layer[key], np.ndarray)]
+        else:
+            weights = model.get_weights()
+
+        digest = hashlib.sha1()
+        for w in weights:
+            digest.update(np.ascontiguousarray(w, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _label_production(entries: Dict[str, ModelEntry]):
+        """Label the production copy with the variant whose weights it matches"""
+        production = entries.get("production")
+        if production is None:
+            return
+        for name, entry in entries.items():
+            if name != "production" and entry.digest == production.digest:
+                production.display_name = variant_label(name)
+                return
+        production.display_name = variant_label("production")
+
+    def _build(self, previous: Dict[str, ModelEntry]) -> Dict[str, ModelEntry]:
+        paths = self.discover()
+        entries = {}
+        for name, path in paths.items():
+            old = previous.get(name)
+            if old is not None and old.version == f"{path}:{path.stat().st_mtime_ns}":
+                entries[name] = old
+                continue
+
+            try:
+                start = time.perf_counter()
+                model, engine = self._load_file(path)
+                # Warm up before the swap so the first live request is not slow
+                model.predict_on_batch(np.zeros((1, 13), dtype=np.float32))
+                entries[name] = ModelEntry(name, path, model, engine, variant_label(name),
+                                           time.perf_counter() - start, self._weights_digest(model))
+                logger.info(f"Loaded model '{name}' from {path} ({engine})")
+            except Exception as e:
+                logger.warning(f"Failed to load model '{name}' from {path}: {str(e)}")
+                if old is not None:
+                    entries[name] = old
+
+        self._label_production(entries)
+        return entries
+
+    def reload(self) -> Dict[str, Any]:
+        """Load changed models and atomically swap in the new set"""
+        with self._reload_lock:
+            start = time.perf_counter()
+            previous = self._entries
+            entries = self._build(previous)
+
+            # Single reference assignment: readers see the old or the new set, never a mix
+            self._entries = entries
+            self.generation += 1
+
+            reloaded = [name for name, entry in entries.items() if previous.get(name) is not entry]
+            removed = [name for name in previous if name not in entries]
+            return {
+                "generation": self.generation,
+                "models": sorted(entries),
+                "reloaded": sorted(reloaded),
+                "removed": sorted(removed),
+                "seconds": round(time.perf_counter() - start, 6),
+            }
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._entries)
+
+    @property
+    def default_name(self) -> Optional[str]:
+        entries = self._entries
+        if self.default_model in entries:
+            return self.default_model
+        return next(iter(entries), None)
+
+    @property
+    def version(self) -> str:
+        """Identifies the whole loaded set, for cache invalidation.
+
+        Built from the entry versions only (not ``generation``), so a reload
+        that changes no file keeps cached predictions.
+        """
+        return ",".join(entry.version for entry in self._entries.values())
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def entries(self) -> List[ModelEntry]:
+        return list(self._entries.values())
+
+    def get(self, name: Optional[str] = None) -> ModelEntry:
+        """Resolve a model by name, or the default model; raises KeyError if unknown"""
+        entries = self._entries
+        if name is None:
+            name = self.default_model if self.default_model in entries else next(iter(entries), None)
+        if name is None or name not in entries:
+            raise KeyError(f"Unknown model '{name}'. Available: {', '.join(entries) or 'none'}")
+        return entries[name]
+
+    def info(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "default_model": self.default_name,
+            "generation": self.generation,
+            "total_models": len(entries),
+            "total_memory_bytes": sum(entry.nbytes for entry in entries),
+            "models": [entry.info() for entry in entries],
+        }
@@ -0,0 +1,334 @@
+"""
+TensorFlow-free NumPy inference engine for the trained Keras classifiers
+"""
+import io
+import re
+import json
+import zipfile
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NPZ_FORMAT_VERSION = 2
+SUPPORTED_NPZ_VERSIONS = {1, 2}
+
+# Storage formats for weights; loading always restores the compute dtype
+WEIGHT_FORMATS = ("float32", "float16", "int8")
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # Numerically stable for large negative inputs
+    return np.exp(-np.logaddexp(0, -x, out=x), out=x)
+
+
+def _tanh(x: np.ndarray) -> np.ndarray:
+    return np.tanh(x, out=x)
+
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+ACTIVATIONS = {
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": _tanh,
+    "linear": _linear,
+    None: _linear,
+}
+
+# Activation derivatives, expressed in terms of the activation's output
+ACTIVATION_GRADIENTS = {
+    "relu": lambda a: (a > 0).astype(a.dtype),
+    "sigmoid": lambda a: a * (1 - a),
+    "tanh": lambda a: 1 - a * a,
+    "linear": np.ones_like,
+    None: np.ones_like,
+}
+
+
+class NumpyModel:
+    """Feed-forward Dense/BatchNormalization/Dropout network evaluated with NumPy.
+
+    Each layer is a dict with a ``type`` of ``dense``, ``affine`` (an inference-time
+    BatchNormalization folded into a per-unit scale and shift) or ``dropout``.
+    Dropout is a no-op at inference unless a random generator is passed, in
+    which case it samples inverted-dropout masks as in training (MC dropout).
+    """
+
+    def __init__(self, layers: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                 dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.metadata = metadata or {}
+        self.layers = []
+        for layer in layers:
+            layer = dict(layer)
+            for key in ("kernel", "bias", "scale", "shift"):
+                if key in layer:
+                    layer[key] = np.ascontiguousarray(layer[key], dtype=self.dtype)
+            if layer["type"] == "dense" and layer.get("activation") not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {layer.get('activation')}")
+            self.layers.append(layer)
+
+    @property
+    def input_dim(self) -> int:
+        return next(layer["kernel"].shape[0] for layer in self.layers if layer["type"] == "dense")
+
+    @property
+    def output_dim(self) -> int:
+        return [layer["kernel"].shape[1] for layer in self.layers if layer["type"] == "dense"][-1]
+
+    @property
+    def dropout_layers(self) -> int:
+        return sum(layer["type"] == "dropout" and layer["rate"] > 0 for layer in self.layers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            layer[key].nbytes
+            for layer in self.layers
+            for key in ("kernel", "bias", "scale", "shift")
+            if key in layer
+        )
+
+    def count_params(self) -> int:
+        return sum(
+            layer[key].size
+            for layer in self.layers
+            for key in ("kernel", "bias", "scale", "shift")
+            if key in layer
+        )
+
+    def predict_on_batch(self, x: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Run one forward pass over an (N, input_dim) matrix.
+
+        With ``rng``, every row gets its own dropout mask, so repeating an input
+        S times draws S Monte Carlo dropout samples in the same pass.
+        """
+        h = np.asarray(x, dtype=self.dtype)
+        if h.ndim == 1:
+            h = h.reshape(1, -1)
+        for layer in self.layers:
+            kind = layer["type"]
+            if kind == "dense":
+                h = h @ layer["kernel"]
+                h += layer["bias"]
+                h = ACTIVATIONS[layer.get("activation")](h)
+            elif kind == "affine":
+                h = h * layer["scale"]
+                h += layer["shift"]
+            elif kind == "dropout" and rng is not None and layer["rate"] > 0:
+                keep = rng.random(h.shape, dtype=np.float32) >= layer["rate"]
+                h = h * keep
+                h *= self.dtype.type(1.0 / (1.0 - layer["rate"]))
+        return h
+
+    def input_gradients(self, x: np.ndarray) -> np.ndarray:
+        """Gradient of the output with respect to each input, (N, input_dim).
+
+        Exact backpropagation through the inference graph (dropout inactive);
+        for several output units it is the gradient of their sum.
+        """
+        h = np.asarray(x, dtype=self.dtype)
+        if h.ndim == 1:
+            h = h.reshape(1, -1)
+        outputs = []
+        for layer in self.layers:
+            if layer["type"] == "dense":
+                h = ACTIVATIONS[layer.get("activation")](h @ layer["kernel"] + layer["bias"])
+                outputs.append(h)
+            elif layer["type"] == "affine":
+                h = h * layer["scale"] + layer["shift"]
+        grad = np.ones_like(h)
+        dense = iter(reversed(outputs))
+        for layer in reversed(self.layers):
+            if layer["type"] == "dense":
+                grad = grad * ACTIVATION_GRADIENTS[layer.get("activation")](next(dense))
+                grad = grad @ layer["kernel"].T
+            elif layer["type"] == "affine":
+                grad = grad * layer["scale"]
+        return grad
+
+    def predict(self, x: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        """Keras-compatible predict, optionally chunked to bound memory"""
+        x = np.asarray(x, dtype=self.dtype)
+        if not batch_size or len(x) <= batch_size:
+            return self.predict_on_batch(x)
+        return np.concatenate([
+            self.predict_on_batch(x[i:i + batch_size]) for i in range(0, len(x), batch_size)
+        ])
+
+    def __call__(self, x: np.ndarray, training: bool = False) -> np.ndarray:
+        return self.predict_on_batch(x, np.random.default_rng() if training else None)
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def save(self, path, weight_format: str = "float32") -> Path:
+        """Write the model to a compact .npz file.
+
+        ``float16`` halves the file; ``int8`` stores Dense kernels as symmetric
+        per-output-unit int8 with a float32 scale (biases and BatchNorm
+        vectors stay float32), about a quarter of the size.
+        """
+        if weight_format not in WEIGHT_FORMATS:
+            raise ValueError(f"Unknown weight format {weight_format!r}; expected one of {WEIGHT_FORMATS}")
+        path = Path(path)
+        arrays = {}
+        spec = []
+        for i, layer in enumerate(self.layers):
+            entry = {key: value for key, value in layer.items() if not isinstance(value, np.ndarray)}
+            for key, value in layer.items():
+                if not isinstance(value, np.ndarray):
+                    continue
+                if weight_format == "int8" and key == "kernel":
+                    quantized, scale = quantize_int8(value)
+                    arrays[f"layer{i}_kernel_q"] = quantized
+                    arrays[f"layer{i}_kernel_scale"] = scale
+                elif weight_format == "float16":
+                    arrays[f"layer{i}_{key}"] = value.astype(np.float16)
+                else:
+                    arrays[f"layer{i}_{key}"] = value.astype(np.float32)
+            spec.append(entry)
+
+        header = {
+            "format_version": NPZ_FORMAT_VERSION,
+            "weight_format": weight_format,
+            "layers": spec,
+            "metadata": self.metadata,
+        }
+        arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path, dtype=np.float32) -> "NumpyModel":
+        """Load a model written by ``save``"""
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            if header.get("format_version") not in SUPPORTED_NPZ_VERSIONS:
+                raise ValueError(f"Unsupported model format version: {header.get('format_version')}")
+            layers = []
+            for i, entry in enumerate(header["layers"]):
+                layer = dict(entry)
+                for key in ("kernel", "bias", "scale", "shift"):
+                    name = f"layer{i}_{key}"
+                    if name in data.files:
+                        layer[key] = data[name]
+                if f"layer{i}_kernel_q" in data.files:
+                    # Dequantize once at load; NumPy has no int8 matmul to keep them packed for
+                    layer["kernel"] = data[f"layer{i}_kernel_q"].astype(np.float32) * data[f"layer{i}_kernel_scale"]
+                layers.append(layer)
+        metadata = header.get("metadata", {})
+        metadata.setdefault("source", str(path))
+        metadata["weight_format"] = header.get("weight_format", "float32")
+        return cls(layers, metadata=metadata, dtype=dtype)
+
+    @classmethod
+    def from_keras(cls, path, dtype=np.float32) -> "NumpyModel":
+        """Read Dense weights straight from a Keras v3 ``.keras`` archive"""
+        return cls(*read_keras_archive(path), dtype=dtype)
+
+
+def quantize_int8(kernel: np.ndarray):
+    """Symmetric per-output-unit int8 quantization; returns (int8 kernel, float32 scale per column)"""
+    kernel = np.asarray(kernel, dtype=np.float32)
+    scale = np.abs(kernel).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    quantized = np.clip(np.rint(kernel / scale), -127, 127).astype(np.int8)
+    return quantized, scale.astype(np.float32)
+
+
+# =============================================================================
+# KERAS ARCHIVE READER
+# =============================================================================
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _layer_vars(weights, name: str) -> List[np.ndarray]:
+    """Return the ordered variables of a layer from model.weights.h5"""
+    # Archives saved on Windows store "layers\\dense" as a single top-level key
+    group = weights.get(f"layers/{name}/vars")
+    if group is None:
+        group = weights.get(f"layers\\{name}/vars")
+    if group is None:
+        raise ValueError(f"Weights for layer '{name}' not found in archive")
+    return [np.array(group[key]) for key in sorted(group.keys(), key=int)]
+
+
+def read_keras_archive(path):
+    """Parse a Sequential ``.keras`` archive into NumpyModel layers and metadata.
+
+    Only needs h5py, not TensorFlow.
+    """
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("h5py is required to read .keras archives (pip install h5py)")
+
+    with zipfile.ZipFile(path) as archive:
+        config = json.loads(archive.read("config.json"))
+        names = archive.namelist()
+        keras_metadata = json.loads(archive.read("metadata.json")) if "metadata.json" in names else {}
+        weights_blob = archive.read("model.weights.h5")
+
+    if config.get("class_name") != "Sequential":
+        raise ValueError(f"Only Sequential models are supported, got {config.get('class_name')}")
+
+    layers = []
+    counters: Dict[str, int] = {}
+    with h5py.File(io.BytesIO(weights_blob), "r") as weights:
+        for layer_config in config["config"]["layers"]:
+            class_name = layer_config["class_name"]
+            cfg = layer_config["config"]
+            if class_name == "InputLayer":
+                continue
+
+            # Weights are stored under auto-generated names: dense, dense_1, ...
+            base = _snake_case(class_name)
+            index = counters.get(base, 0)
+            counters[base] = index + 1
+            weights_name = base if index == 0 else f"{base}_{index}"
+
+            if class_name == "Dense":
+                variables = _layer_vars(weights, weights_name)
+                kernel = variables[0]
+                bias = variables[1] if cfg.get("use_bias", True) else np.zeros(kernel.shape[1])
+                layers.append({
+                    "type": "dense",
+                    "activation": cfg.get("activation", "linear"),
+                    "kernel": kernel,
+                    "bias": bias,
+                })
+            elif class_name == "BatchNormalization":
+                variables = _layer_vars(weights, weights_name)
+                gamma = variables.pop(0) if cfg.get("scale", True) else 1.0
+                beta = variables.pop(0) if cfg.get("center", True) else 0.0
+                moving_mean, moving_variance = variables
+                scale = gamma / np.sqrt(moving_variance + cfg.get("epsilon", 1e-3))
+                layers.append({
+                    "type": "affine",
+                    "scale": scale,
+                    "shift": beta - moving_mean * scale,
+                })
+            elif class_name == "Dropout":
+                layers.append({"type": "dropout", "rate": float(cfg.get("rate", 0.0))})
+            else:
+                raise ValueError(f"Unsupported layer type: {class_name}")
+
+    metadata = {
+        "source": str(path),
+        "keras_version": keras_metadata.get("keras_version"),
+    }
+    return layers, metadata
@@ -0,0 +1,244 @@
+"""
+Bounded LRU/TTL cache for flood predictions keyed on quantized feature vectors
+"""
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCacheBackend:
+    """Shared cache tier in a local SQLite file, so several workers reuse hits.
+
+    Reads block, so async callers run them in an executor. Writes are queued
+    and committed in batches by a background thread (dropped if the queue is
+    full), which also deletes expired rows and keeps the table at most
+    ``max_rows`` rows, evicting the rows that expire soonest.
+    """
+
+    def __init__(self, path, max_rows: int = 100000, purge_interval: float = 60.0, max_queued: int = 10000):
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self.purge_interval = purge_interval
+        self.max_queued = max_queued
+        self.dropped_writes = 0
+        self._local = threading.local()
+        self._start_writer_state()
+        # A forked worker (serve.py) must not reuse the parent's connections or writer thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key BLOB PRIMARY KEY, model_version TEXT, probability REAL, expires_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS predictions_expiry ON predictions (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _start_writer_state(self):
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=self.max_queued)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._last_purge = time.time()
+
+    def _after_fork(self):
+        self._local = threading.local()
+        self._start_writer_state()
+
+    def get(self, key: bytes, model_version: str, now: float) -> Optional[float]:
+        row = self._connect().execute(
+            "SELECT probability FROM predictions WHERE key = ? AND model_version = ? AND expires_at > ?",
+            (key, model_version, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: bytes, model_version: str, probability: float, expires_at: float):
+        """Queue a write for the background writer; never blocks"""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="prediction-cache-writer",
+                                                    daemon=True)
+                    self._writer.start()
+        try:
+            self._queue.put_nowait((key, model_version, probability, expires_at))
+        except queue.Full:
+            self.dropped_writes += 1
+
+    def _write_loop(self):
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < 1000:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._connect() as conn:
+                    conn.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)", rows)
+                now = time.time()
+                if now - self._last_purge >= self.purge_interval:
+                    self._last_purge = now
+                    self.purge_expired(now)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared prediction cache write failed: {str(e)}")
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until queued writes are committed (for tests and benchmarks)"""
+        deadline = time.time() + timeout
+        while not self._queue.empty() and time.time() < deadline:
+            time.sleep(0.01)
+
+    def purge_expired(self, now: float):
+        """Drop expired rows, then the soonest-expiring rows above ``max_rows``"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (now,))
+            excess = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_rows
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM predictions WHERE key IN "
+                    "(SELECT key FROM predictions ORDER BY expires_at LIMIT ?)", (excess,)
+                )
+
+    def rows(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+class PredictionCache:
+    """In-process LRU cache with TTL expiry and model-version invalidation.
+
+    Keys are the encoded (unscaled) feature vector rounded to ``precision``
+    decimals, so near-identical payloads from polling clients share an entry.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0, precision: int = 4,
+                 shared_backend: Optional[SQLiteCacheBackend] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self.shared_backend = shared_backend
+        self.model_version: Optional[str] = None
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, features: np.ndarray) -> bytes:
+        """Quantize one encoded feature row into a hashable key"""
+        return np.round(np.asarray(features, dtype=np.float64), self.precision).tobytes()
+
+    def set_model_version(self, model_version: str):
+        """Invalidate in-process entries when the served model changes"""
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self.model_version = model_version
+            self._entries.clear()
+        if self.shared_backend is not None:
+            # Only expired rows: during a rolling reload other workers still serve
+            # the previous version, and lookups are filtered by version anyway
+            try:
+                self.shared_backend.purge_expired(time.time())
+            except sqlite3.Error as e:
+                logger.warning(f"Shared prediction cache purge failed: {str(e)}")
+        logger.info(f"Prediction cache reset for model version {model_version}")
+
+    def get(self, key: bytes) -> Optional[float]:
+        """Look up both tiers; blocks on the shared tier, so async code uses get_local/get_shared"""
+        probability = self.get_local(key)
+        if probability is None and self.shared_backend is not None:
+            probability = self.get_shared(key)
+        return probability
+
+    def get_local(self, key: bytes) -> Optional[float]:
+        """In-process tier only; never blocks on I/O"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, probability = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return probability
+                del self._entries[key]
+                self.expirations += 1
+            if self.shared_backend is None:
+                self.misses += 1
+        return None
+
+    def get_shared(self, key: bytes) -> Optional[float]:
+        """Shared tier lookup after a local miss (blocking SQLite read)"""
+        now = time.time()
+        if self.shared_backend is not None:
+            try:
+                probability = self.shared_backend.get(key, self.model_version, now)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared prediction cache read failed: {str(e)}")
+                probability = None
+            if probability is not None:
+                self._store(key, probability, now + self.ttl_seconds)
+                with self._lock:
+                    self.shared_hits += 1
+                return probability
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: bytes, probability: float):
+        expires_at = time.time() + self.ttl_seconds
+        self._store(key, probability, expires_at)
+        if self.shared_backend is not None:
+            self.shared_backend.put(key, self.model_version, probability, expires_at)
+
+    def _store(self, key: bytes, probability: float, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, probability)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "precision": self.precision,
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            "shared_backend": str(self.shared_backend.path) if self.shared_backend else None,
+            "shared_dropped_writes": self.shared_backend.dropped_writes if self.shared_backend else 0,
+        }
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Export the trained classifiers with float16 or int8 weights, gated on held-out accuracy
+
+Each best_model.keras is quantized to best_model.float16.npz and/or
+best_model.int8.npz. A quantized model is only written if its accuracy and
+ROC AUC on the notebooks' held-out split of mapped_dataset_Normalized_version.csv
+stay within --tolerance of the metrics reported in nn_performance_metrics.xlsx
+(or of the float32 model where the report does not match the checkpoint), and
+no held-out probability moves by more than --max-prob-diff from the float32
+model (accuracy and AUC alone barely move on this dataset).
+Serve them with MODEL_WEIGHT_FORMAT=float16|int8.
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, Optional, Any
+import numpy as np
+
+from numpy_engine import NumpyModel
+from export_models import discover_keras_models
+from train_sweep import prepare_data
+
+QUANTIZED_FORMATS = ("float16", "int8")
+
+
+def reported_metrics(directory: Path) -> Optional[Dict[str, float]]:
+    """Accuracy and ROC AUC written by the training notebook, if readable"""
+    path = directory / "nn_performance_metrics.xlsx"
+    if not path.exists():
+        return None
+    try:
+        import pandas as pd
+
+        values = pd.read_excel(path).set_index("Metric")["Value"]
+        return {"accuracy": float(values["Accuracy"]), "roc_auc": float(values["ROC AUC"])}
+    except Exception as e:
+        print(f"   Could not read {path}: {e}")
+        return None
+
+
+def evaluate(model: NumpyModel, x: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    start = time.perf_counter()
+    probabilities = model.predict(x).reshape(-1)
+    seconds = time.perf_counter() - start
+    return {
+        "accuracy": float(accuracy_score(y, probabilities > 0.5)),
+        "roc_auc": float(roc_auc_score(y, probabilities)),
+        "probabilities": probabilities,
+        "rows_per_second": len(x) / seconds if seconds > 0 else None,
+    }
+
+
+def quantize_model(source: Path, formats, x_test: np.ndarray, y_test: np.ndarray,
+                   tolerance: float, max_prob_diff: float = 0.02, dry_run: bool = False) -> Dict[str, Any]:
+    """Quantize one model to each format and keep the ones that pass the gate"""
+    model = NumpyModel.from_keras(source)
+    baseline = evaluate(model, x_test, y_test)
+    reported = reported_metrics(source.parent)
+
+    reference = {"accuracy": baseline["accuracy"], "roc_auc": baseline["roc_auc"]}
+    reference_source = "float32"
+    if reported:
+        if all(abs(reported[m] - baseline[m]) <= tolerance for m in reference):
+            reference, reference_source = reported, "reported"
+        else:
+            print(f"   Reported metrics {reported} do not match this checkpoint "
+                  f"(float32: accuracy {baseline['accuracy']:.4f}, AUC {baseline['roc_auc']:.4f}); "
+                  f"gating against float32")
+
+    result = {
+        "source": str(source),
+        "reference": {**reference, "source": reference_source},
+        "float32": {"accuracy": baseline["accuracy"], "roc_auc": baseline["roc_auc"],
+                    "bytes": source.with_suffix(".npz").stat().st_size if source.with_suffix(".npz").exists() else None},
+        "formats": {},
+    }
+    for weight_format in formats:
+        dest = source.with_name(f"best_model.{weight_format}.npz")
+        tmp = dest.with_name(dest.name + ".tmp.npz")
+        model.save(tmp, weight_format=weight_format)
+        quantized = NumpyModel.load(tmp)
+        metrics = evaluate(quantized, x_test, y_test)
+
+        drift = {m: abs(metrics[m] - reference[m]) for m in ("accuracy", "roc_auc")}
+        probability_diff = np.abs(metrics["probabilities"] - baseline["probabilities"])
+        passed = all(d <= tolerance for d in drift.values()) and probability_diff.max() <= max_prob_diff
+        entry = {
+            "accuracy": metrics["accuracy"],
+            "roc_auc": metrics["roc_auc"],
+            "max_probability_diff": float(probability_diff.max()),
+            "mean_probability_diff": float(probability_diff.mean()),
+            "bytes": tmp.stat().st_size,
+            "passed": passed,
+            "path": str(dest) if passed and not dry_run else None,
+        }
+        if passed and not dry_run:
+            tmp.replace(dest)
+        else:
+            tmp.unlink()
+            if not passed and dest.exists():
+                # A stale artifact from an earlier run must not be served
+                dest.unlink()
+        result["formats"][weight_format] = entry
+
+        status = "OK" if passed else "REJECTED"
+        print(f"   {weight_format:<8} accuracy {metrics['accuracy']:.4f} (drift {drift['accuracy']:.4f})  "
+              f"AUC {metrics['roc_auc']:.4f} (drift {drift['roc_auc']:.4f})  "
+              f"max |dp| {entry['max_probability_diff']:.2e}  {entry['bytes'] / 1024:.1f} KB [{status}]")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("models", nargs="*", type=Path,
+                        help="best_model.keras files (default: every model in the project)")
+    parser.add_argument("--project-root", type=Path, default=Path(".."))
+    parser.add_argument("--dataset", default="../mapped_dataset_Normalized_version.csv")
+    parser.add_argument("--formats", nargs="+", choices=QUANTIZED_FORMATS, default=list(QUANTIZED_FORMATS))
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="Maximum absolute change in accuracy and in ROC AUC")
+    parser.add_argument("--max-prob-diff", type=float, default=0.02,
+                        help="Maximum absolute change of any held-out probability versus float32")
+    parser.add_argument("--report", type=Path, default=None, help="Write the full results as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate only; write no artifacts")
+    args = parser.parse_args()
+
+    sources = args.models or discover_keras_models(args.project_root)
+    if not sources:
+        print("Warning: No .keras models found")
+        sys.exit(1)
+
+    arrays, _ = prepare_data(args.dataset)
+    x_test, y_test = arrays["x_test"], arrays["y_test"]
+    print(f"Held-out split: {len(x_test)} rows; tolerance {args.tolerance}, max |dp| {args.max_prob_diff}")
+
+    results = []
+    rejected = 0
+    for source in sources:
+        print(f"{source}")
+        try:
+            result = quantize_model(
+                Path(source), args.formats, x_test, y_test, args.tolerance, args.max_prob_diff, args.dry_run
+            )
+        except Exception as e:
+            print(f"   Failed: {e}")
+            rejected += 1
+            continue
+        rejected += sum(not entry["passed"] for entry in result["formats"].values())
+        results.append(result)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report saved to '{args.report}'")
+    if rejected:
+        print(f"{rejected} quantized model(s) rejected by the accuracy/probability gate")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
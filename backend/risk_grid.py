@@ -0,0 +1,215 @@
+"""
+Flood-probability grids over latitude/longitude for map heatmaps
+
+A grid holds one scenario (every feature except latitude and longitude is
+fixed) scored over a lat/lon mesh. Meshes are scored in fixed-size chunks
+spread over a thread pool, since the NumPy forward pass releases the GIL.
+Finished tiles are kept in an LRU cache keyed on model version, scenario
+and tile address, so a changed model or scenario never reuses a tile.
+"""
+import os
+import math
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Mapping, Optional, Tuple, Any
+import numpy as np
+
+from feature_pipeline import FeaturePipeline, REQUEST_FIELDS, N_FEATURES, LAND_COVER_CODES, SOIL_TYPE_CODES
+
+logger = logging.getLogger(__name__)
+
+# Region covered by the training data (Normalized_param.json)
+DEFAULT_BOUNDS = (8.0, 37.0, 68.0, 97.0)  # (lat_min, lat_max, lon_min, lon_max)
+
+DEFAULT_TILE_SIZE = 64
+DEFAULT_CHUNK_ROWS = 16384
+
+LATITUDE_INDEX = REQUEST_FIELDS.index("latitude")
+LONGITUDE_INDEX = REQUEST_FIELDS.index("longitude")
+
+
+def bounds_from_params(normalization_params: Optional[Mapping[str, Mapping[str, float]]]) -> Tuple[float, float, float, float]:
+    """Lat/lon extent of the training data, from Normalized_param.json"""
+    if not normalization_params or "Latitude" not in normalization_params or "Longitude" not in normalization_params:
+        return DEFAULT_BOUNDS
+    lat, lon = normalization_params["Latitude"], normalization_params["Longitude"]
+    return (lat["min"], lat["max"], lon["min"], lon["max"])
+
+
+def tile_centers(z: int, x: int, y: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitudes (north to south) and longitudes (west to east) of the cell centres of an XYZ tile"""
+    n = 2 ** z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile {z}/{x}/{y} is outside the zoom level")
+    offsets = (np.arange(size) + 0.5) / size
+    longitudes = (x + offsets) / n * 360.0 - 180.0
+    mercator_y = math.pi * (1 - 2 * (y + offsets) / n)
+    latitudes = np.degrees(np.arctan(np.sinh(mercator_y)))
+    return latitudes, longitudes
+
+
+def bbox_centers(lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                 resolution: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Cell centres of a regular grid with ``resolution`` degree cells, north to south"""
+    if lat_max <= lat_min or lon_max <= lon_min:
+        raise ValueError("Bounding box must have lat_min < lat_max and lon_min < lon_max")
+    rows = max(1, int(math.ceil((lat_max - lat_min) / resolution)))
+    cols = max(1, int(math.ceil((lon_max - lon_min) / resolution)))
+    latitudes = lat_max - (np.arange(rows) + 0.5) * resolution
+    longitudes = lon_min + (np.arange(cols) + 0.5) * resolution
+    return latitudes, longitudes
+
+
+def scenario_key(scenario: Mapping[str, Any]) -> str:
+    """Stable digest of the fixed (non-spatial) feature values"""
+    values = {field: scenario[field] for field in REQUEST_FIELDS if field in scenario}
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class RiskGridEngine:
+    """Score lat/lon meshes for a scenario and cache the results as tiles"""
+
+    def __init__(self, bounds: Tuple[float, float, float, float] = DEFAULT_BOUNDS,
+                 tile_size: int = DEFAULT_TILE_SIZE, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 cache_tiles: int = 2048, max_workers: Optional[int] = None):
+        self.bounds = bounds
+        self.tile_size = tile_size
+        self.chunk_rows = chunk_rows
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                                            thread_name_prefix="risk-grid")
+        self._tiles: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._cached_bytes = 0
+        # bbox grids vary in size, so the cache is bounded in bytes, not entries
+        self.max_cached_bytes = cache_tiles * tile_size * tile_size * 4
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.cells_scored = 0
+        self.seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def encode_scenario(self, scenario: Mapping[str, Any]) -> np.ndarray:
+        """One encoded (13,) row with the scenario values and lat/lon left at zero"""
+        row = np.zeros(N_FEATURES, dtype=np.float32)
+        for j, field in enumerate(REQUEST_FIELDS):
+            if j in (LATITUDE_INDEX, LONGITUDE_INDEX):
+                continue
+            value = scenario[field]
+            value = getattr(value, "value", value)
+            if field == "land_cover":
+                value = LAND_COVER_CODES[value]
+            elif field == "soil_type":
+                value = SOIL_TYPE_CODES[value]
+            row[j] = value
+        return row
+
+    def score(self, latitudes: np.ndarray, longitudes: np.ndarray, scenario: Mapping[str, Any],
+              pipeline: FeaturePipeline, predict_fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Probabilities on the (len(latitudes), len(longitudes)) mesh.
+
+        Cells outside the training region are NaN rather than extrapolated.
+        """
+        start = time.perf_counter()
+        lat_grid, lon_grid = np.meshgrid(latitudes.astype(np.float32), longitudes.astype(np.float32), indexing="ij")
+        lat_flat, lon_flat = lat_grid.ravel(), lon_grid.ravel()
+
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        inside = (lat_flat >= lat_min) & (lat_flat <= lat_max) & (lon_flat >= lon_min) & (lon_flat <= lon_max)
+        probabilities = np.full(lat_flat.shape, np.nan, dtype=np.float32)
+        index = np.flatnonzero(inside)
+
+        if len(index):
+            template = self.encode_scenario(scenario)
+
+            def score_chunk(chunk: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                features = np.repeat(template[None, :], len(chunk), axis=0)
+                features[:, LATITUDE_INDEX] = lat_flat[chunk]
+                features[:, LONGITUDE_INDEX] = lon_flat[chunk]
+                return chunk, np.asarray(predict_fn(pipeline.transform(features))).reshape(-1)
+
+            chunks = [index[i:i + self.chunk_rows] for i in range(0, len(index), self.chunk_rows)]
+            if len(chunks) == 1:
+                results = [score_chunk(chunks[0])]
+            else:
+                results = self._executor.map(score_chunk, chunks)
+            for chunk, values in results:
+                probabilities[chunk] = values
+
+        with self._lock:
+            self.cells_scored += len(index)
+            self.seconds += time.perf_counter() - start
+        return probabilities.reshape(lat_grid.shape)
+
+    # ------------------------------------------------------------------
+    # Tiles
+    # ------------------------------------------------------------------
+
+    def _cached(self, key: tuple, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+            self.misses += 1
+
+        tile = compute()
+        if tile.nbytes > self.max_cached_bytes:
+            return tile
+        with self._lock:
+            if key not in self._tiles:
+                self._tiles[key] = tile
+                self._cached_bytes += tile.nbytes
+            while self._cached_bytes > self.max_cached_bytes:
+                _, evicted = self._tiles.popitem(last=False)
+                self._cached_bytes -= evicted.nbytes
+        return tile
+
+    def tile(self, z: int, x: int, y: int, scenario: Mapping[str, Any], pipeline: FeaturePipeline,
+             predict_fn: Callable[[np.ndarray], np.ndarray], model_version: str) -> np.ndarray:
+        """(tile_size, tile_size) probabilities for XYZ (Web Mercator) tile z/x/y"""
+        key = ("xyz", model_version, scenario_key(scenario), z, x, y, self.tile_size)
+        latitudes, longitudes = tile_centers(z, x, y, self.tile_size)
+        return self._cached(key, lambda: self.score(latitudes, longitudes, scenario, pipeline, predict_fn))
+
+    def bbox(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float, resolution: float,
+             scenario: Mapping[str, Any], pipeline: FeaturePipeline,
+             predict_fn: Callable[[np.ndarray], np.ndarray], model_version: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Latitudes, longitudes and probabilities of a regular grid over a bounding box"""
+        latitudes, longitudes = bbox_centers(lat_min, lat_max, lon_min, lon_max, resolution)
+        key = ("bbox", model_version, scenario_key(scenario), lat_min, lat_max, lon_min, lon_max, resolution)
+        grid = self._cached(key, lambda: self.score(latitudes, longitudes, scenario, pipeline, predict_fn))
+        return latitudes, longitudes, grid
+
+    def clear(self):
+        """Drop every cached tile, e.g. after a model reload"""
+        with self._lock:
+            self._tiles.clear()
+            self._cached_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "bounds": self.bounds,
+            "tile_size": self.tile_size,
+            "cached_tiles": len(self._tiles),
+            "cached_bytes": self._cached_bytes,
+            "max_cached_bytes": self.max_cached_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cells_scored": self.cells_scored,
+            "cells_per_second": self.cells_scored / self.seconds if self.seconds else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,552 @@
+"""
+Persistent background jobs for scoring datasets too large for one HTTP request
+
+A job is an uploaded CSV/NDJSON file plus the model and scaling parameters
+to score it with. Jobs live in a SQLite database next to their files:
+
+    jobs/jobs.sqlite          job records and per-chunk checkpoints
+    jobs/<id>/input.csv       the uploaded dataset
+    jobs/<id>/part-00000.csv  scored results, one file per chunk
+
+Each API process runs a dispatcher that claims queued jobs while fewer than
+``max_running`` are running across all processes. The claim is a single
+SQLite transaction, so pre-forked workers (serve.py) never run the same job
+twice. Claimed jobs are scored in a small process pool at lowered CPU
+priority, so interactive /predict traffic keeps its latency.
+
+The worker scores the file chunk by chunk with bulk_scoring. It writes each
+chunk's results atomically and then records the chunk as a checkpoint. If
+the API restarts, or a worker dies, the job is queued again and resumes
+after its last checkpointed chunk. A job whose claim was taken over, or that
+was cancelled, stops at the next chunk boundary.
+"""
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import logging
+import functools
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+ACTIVE_STATES = ("queued", "running")
+
+# A job that kills its worker this many times is failed instead of retried
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    input_path TEXT NOT NULL,
+    input_format TEXT NOT NULL,
+    output_format TEXT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    model_path TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    normalization_path TEXT,
+    standardization_path TEXT,
+    total_rows INTEGER,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    claim TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (job_id, chunk)
+);
+"""
+
+
+def _process_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the API process that claimed a job still runs (unknown hosts count as alive)"""
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class JobStore:
+    """Job records and chunk checkpoints in a SQLite file shared by every process"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / "jobs.sqlite"
+        self._local = threading.local()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.directory / job_id
+
+    def create(self, job_id: str, **fields) -> Dict[str, Any]:
+        now = time.time()
+        record = {"id": job_id, "status": "queued", "created_at": now, "updated_at": now, **fields}
+        columns = ", ".join(record)
+        self._connect().execute(
+            f"INSERT INTO jobs ({columns}) VALUES ({', '.join('?' * len(record))})", tuple(record.values())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit: int = 100, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        if status:
+            rows = self._connect().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+            )
+        else:
+            rows = self._connect().execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def count(self, *statuses: str) -> int:
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM jobs WHERE status IN ({', '.join('?' * len(statuses))})", statuses
+        ).fetchone()[0]
+
+    def delete(self, job_id: str):
+        conn = self._connect()
+        conn.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    # ------------------------------------------------------------------
+    # Claims
+    # ------------------------------------------------------------------
+
+    def claim_next(self, owner: str, max_running: int) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to running, unless ``max_running`` are running"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+            row = None
+            if running < max_running:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, claim = ?, attempts = attempts + 1, "
+                "started_at = COALESCE(started_at, ?), updated_at = ? WHERE id = ?",
+                (owner, uuid.uuid4().hex, now, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def requeue_orphans(self) -> int:
+        """Queue running jobs whose API process has died again; they resume from their checkpoints"""
+        conn = self._connect()
+        orphans = [
+            row["id"] for row in conn.execute("SELECT id, owner FROM jobs WHERE status = 'running'")
+            if not _owner_alive(row["owner"])
+        ]
+        for job_id in orphans:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, claim = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'running'", (time.time(), job_id)
+            )
+        return len(orphans)
+
+    def release(self, job_id: str, claim: str, error: str):
+        """Give a job back after its worker died: queue it again, or fail it after MAX_ATTEMPTS"""
+        self._connect().execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, owner = NULL, claim = NULL, updated_at = ? WHERE id = ? AND claim = ?",
+            (MAX_ATTEMPTS, error, time.time(), job_id, claim)
+        )
+
+    def hand_back(self, job_id: str):
+        """Queue a running job again on shutdown; unlike a crash this does not count as an attempt"""
+        self._connect().execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL, claim = NULL, attempts = attempts - 1, "
+            "updated_at = ? WHERE id = ? AND status = 'running'", (time.time(), job_id)
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ?, updated_at = ? "
+            "WHERE id = ? AND status IN ('queued', 'running')", (time.time(), time.time(), job_id)
+        )
+        return cursor.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def set_total_rows(self, job_id: str, claim: str, total_rows: int):
+        self._connect().execute(
+            "UPDATE jobs SET total_rows = ? WHERE id = ? AND claim = ?", (total_rows, job_id, claim)
+        )
+
+    def checkpoint(self, job_id: str, claim: str, chunk: int, rows: int, failed: int, seconds: float) -> bool:
+        """Record a finished chunk; False if the job was cancelled or claimed by someone else"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET rows_done = rows_done + ?, failed_rows = failed_rows + ?, chunks_done = ?, "
+                "updated_at = ? WHERE id = ? AND claim = ? AND status = 'running' AND chunks_done = ?",
+                (rows, failed, chunk + 1, time.time(), job_id, claim, chunk)
+            )
+            if cursor.rowcount:
+                conn.execute("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)",
+                             (job_id, chunk, rows, failed, seconds))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount > 0
+
+    def finish(self, job_id: str, claim: str, status: str, error: Optional[str] = None):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ?, owner = NULL "
+            "WHERE id = ? AND claim = ? AND status = 'running'",
+            (status, error, now, now, job_id, claim)
+        )
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+_models: Dict[str, Any] = {}
+
+
+def _init_worker(nice: int):
+    """Pool initializer: lower the CPU priority of job workers below the API's"""
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+    threading.Thread(target=_exit_with_parent, args=(os.getppid(),), daemon=True).start()
+
+
+def _exit_with_parent(parent: int):
+    # An idle worker blocks on the pool queue forever if the API is killed
+    while os.getppid() == parent:
+        time.sleep(1.0)
+    os._exit(0)
+
+
+def _load_model(path: str):
+    """NumPy model for a .npz or .keras file, cached per worker process"""
+    from numpy_engine import NumpyModel
+
+    if path not in _models:
+        _models[path] = NumpyModel.from_keras(path) if path.endswith(".keras") else NumpyModel.load(path)
+    return _models[path]
+
+
+def count_rows(path, input_format: str) -> int:
+    """Data rows in a CSV (minus the header) or NDJSON file, counted in 1 MB blocks"""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0) if input_format == "csv" else lines
+
+
+def read_chunks_from(path, input_format: str, chunk_size: int, first_chunk: int) -> Iterator[Any]:
+    """bulk_scoring.read_chunks, starting at chunk ``first_chunk``"""
+    import pandas as pd
+    from bulk_scoring import read_chunks, FIELD_TO_COLUMN
+
+    if input_format == "csv" and first_chunk:
+        # Skipped lines are not parsed
+        reader = pd.read_csv(path, chunksize=chunk_size, skiprows=range(1, first_chunk * chunk_size + 1))
+        for chunk in reader:
+            yield chunk.rename(columns=FIELD_TO_COLUMN)
+        return
+    for i, chunk in enumerate(read_chunks(path, input_format, chunk_size)):
+        if i >= first_chunk:
+            yield chunk
+
+
+def run_job(directory: str, job_id: str, claim: str) -> str:
+    """Score a claimed job from its last checkpoint; runs in a pool process"""
+    from feature_pipeline import FeaturePipeline
+    from bulk_scoring import score_stream, format_ndjson, format_csv
+
+    store = JobStore(directory)
+    job = store.get(job_id)
+    parent = os.getppid()
+    try:
+        model_path = Path(job["model_path"])
+        if f"{model_path}:{model_path.stat().st_mtime_ns}" != job["model_version"]:
+            raise RuntimeError(f"Model file {model_path} changed since the job was submitted; resubmit it")
+        model = _load_model(str(model_path))
+        pipeline = FeaturePipeline.from_files(job["normalization_path"], job["standardization_path"])
+        if job["total_rows"] is None:
+            store.set_total_rows(job_id, claim, count_rows(job["input_path"], job["input_format"]))
+
+        first_chunk = job["chunks_done"]
+        chunk_size = job["chunk_size"]
+        output = store.job_dir(job_id)
+        chunks = read_chunks_from(job["input_path"], job["input_format"], chunk_size, first_chunk)
+        stats: Dict[str, Any] = {}
+        started = time.perf_counter()
+        for index, result in enumerate(
+            score_stream(chunks, pipeline, model.predict_on_batch, stats, first_row=first_chunk * chunk_size),
+            start=first_chunk
+        ):
+            if job["output_format"] == "csv":
+                text = "".join(list(format_csv([result]))[1:])
+            else:
+                text = "".join(format_ndjson([result]))
+            part = output / f"part-{index:05d}.{job['output_format']}"
+            tmp = part.with_name(part.name + ".tmp")
+            tmp.write_text(text)
+            tmp.replace(part)
+
+            rows = len(result["row"])
+            failed = int(rows - result["valid"].sum())
+            if not store.checkpoint(job_id, claim, index, rows, failed, time.perf_counter() - started):
+                return "stopped"
+            started = time.perf_counter()
+            # The API process that owns this job is gone; whoever requeues it resumes from here
+            if os.getppid() != parent:
+                return "orphaned"
+
+        store.finish(job_id, claim, "completed")
+        return "completed"
+    except Exception as e:
+        store.finish(job_id, claim, "failed", f"{type(e).__name__}: {e}")
+        return "failed"
+
+
+# =============================================================================
+# DISPATCHER (API side)
+# =============================================================================
+
+class JobManager:
+    """Claim queued jobs and run them on a process pool, within the concurrency limit"""
+
+    def __init__(self, directory, max_running: int = 1, max_queued: int = 100,
+                 nice: int = 10, poll_seconds: float = 2.0):
+        self.directory = Path(directory)
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.nice = nice
+        self.poll_seconds = poll_seconds
+        self._store: Optional[JobStore] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._running: Dict[str, Any] = {}
+
+    @property
+    def store(self) -> JobStore:
+        # Opened lazily so a pre-fork master never holds the database
+        if self._store is None:
+            self._store = JobStore(self.directory)
+        return self._store
+
+    def start(self):
+        requeued = self.store.requeue_orphans()
+        if requeued:
+            logger.info(f"Resuming {requeued} interrupted scoring job(s)")
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._pool is not None:
+            # Running jobs are handed back: their workers stop at the next chunk
+            # boundary and the next process resumes them from the checkpoint
+            for job_id in list(self._running):
+                self.store.hand_back(job_id)
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(pool.shutdown, wait=True, cancel_futures=True)
+            )
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def submit(self, source, filename: Optional[str], input_format: str, output_format: str,
+               chunk_size: int, model: str, model_path: Path, model_version: str,
+               normalization_path: Optional[str], standardization_path: Optional[str]) -> Dict[str, Any]:
+        """Copy an uploaded file object into the job store and queue it (blocking)"""
+        import shutil
+
+        if self.store.count(*ACTIVE_STATES) >= self.max_queued:
+            raise OverflowError(f"Too many pending jobs (max {self.max_queued})")
+        job_id = uuid.uuid4().hex[:16]
+        job_dir = self.store.job_dir(job_id)
+        job_dir.mkdir(parents=True)
+        input_path = job_dir / f"input.{input_format}"
+        with open(input_path, "wb") as f:
+            shutil.copyfileobj(source, f, 1 << 20)
+        job = self.store.create(
+            job_id, filename=filename, input_path=str(input_path), input_format=input_format,
+            output_format=output_format, chunk_size=chunk_size, model=model, model_path=str(model_path),
+            model_version=model_version, normalization_path=normalization_path,
+            standardization_path=standardization_path
+        )
+        self.wake()
+        return job
+
+    def results(self, job_id: str) -> Iterator[bytes]:
+        """Concatenated result parts of a job, in row order"""
+        job = self.store.get(job_id)
+        if job["output_format"] == "csv":
+            from bulk_scoring import OUTPUT_COLUMNS
+
+            yield (",".join(OUTPUT_COLUMNS) + "\n").encode()
+        for index in range(job["chunks_done"]):
+            with open(self.store.job_dir(job_id) / f"part-{index:05d}.{job['output_format']}", "rb") as f:
+                yield from iter(lambda: f.read(1 << 20), b"")
+
+    def delete(self, job_id: str):
+        import shutil
+
+        self.store.delete(job_id)
+        shutil.rmtree(self.store.job_dir(job_id), ignore_errors=True)
+
+    def _pool_for(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: the API process may hold threads (schedulers) or TensorFlow state
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_running, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(self.nice,)
+            )
+        return self._pool
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        owner = _process_owner()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.store.requeue_orphans)
+                while len(self._running) < self.max_running:
+                    job = await loop.run_in_executor(None, self.store.claim_next, owner, self.max_running)
+                    if job is None:
+                        break
+                    self._launch(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job dispatcher error: {str(e)}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _launch(self, job: Dict[str, Any]):
+        logger.info(f"Scoring job {job['id']} started (attempt {job['attempts']}, from chunk {job['chunks_done']})")
+        future = self._pool_for().submit(run_job, str(self.directory), job["id"], job["claim"])
+        self._running[job["id"]] = future
+        loop = asyncio.get_running_loop()
+
+        def done(f):
+            self._running.pop(job["id"], None)
+            try:
+                outcome = f.result()
+                logger.info(f"Scoring job {job['id']} {outcome}")
+            except Exception as e:
+                # The worker process died (or the pool broke); retry from the last checkpoint
+                logger.error(f"Scoring job {job['id']} worker failed: {type(e).__name__}: {e}")
+                self.store.release(job["id"], job["claim"], f"{type(e).__name__}: {e}")
+                if self._pool is not None and getattr(self._pool, "_broken", False):
+                    self._pool.shutdown(wait=False)
+                    self._pool = None
+            loop.call_soon_threadsafe(self.wake)
+
+        future.add_done_callback(done)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_running": self.max_running,
+            "running_here": len(self._running),
+            **{state: self.store.count(state) for state in JOB_STATES},
+        }
+
+
+def progress(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job record as returned by the API"""
+    total = job["total_rows"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "filename": job["filename"],
+        "model": job["model"],
+        "output_format": job["output_format"],
+        "chunk_size": job["chunk_size"],
+        "total_rows": total,
+        "rows_done": job["rows_done"],
+        "failed_rows": job["failed_rows"],
+        "chunks_done": job["chunks_done"],
+        "progress": round(job["rows_done"] / total, 4) if total else (1.0 if job["status"] == "completed" else 0.0),
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
@@ -0,0 +1,108 @@
+"""
+What-if sensitivity sweeps of one or two features around a base request
+
+The base request is encoded once and repeated into a matrix holding every
+grid variant (steps, or steps_a * steps_b rows); only the swept columns
+differ between rows. The whole matrix goes through the feature pipeline and
+the model in a single batched forward pass, and the points where the
+probability crosses the decision threshold are found by linear
+interpolation between neighbouring grid values.
+"""
+from typing import Callable, Dict, List, Sequence, Any
+import numpy as np
+
+from feature_pipeline import FeaturePipeline, REQUEST_FIELDS
+
+# Continuous request fields; the 0/1 flags and the categories are not swept
+SWEEPABLE_FIELDS = (
+    "latitude", "longitude", "elevation", "rainfall", "temperature", "humidity",
+    "river_discharge", "water_level", "population_density",
+)
+
+
+def axis_values(start: float, stop: float, steps: int) -> np.ndarray:
+    """``steps`` evenly spaced values from ``start`` to ``stop`` inclusive"""
+    if steps < 2:
+        raise ValueError("A sweep axis needs at least 2 steps")
+    if start == stop:
+        raise ValueError("A sweep axis needs start != stop")
+    return np.linspace(start, stop, steps, dtype=np.float64)
+
+
+def build_matrix(base: np.ndarray, fields: Sequence[str], axes: Sequence[np.ndarray]) -> np.ndarray:
+    """Raw (len(a) * len(b), 13) matrix of the base row with the swept columns overwritten.
+
+    Rows are ordered with the last axis varying fastest, so the result of a
+    2-D sweep reshapes to (len(a), len(b)).
+    """
+    if len(fields) != len(axes) or not 1 <= len(fields) <= 2:
+        raise ValueError("Sweep one or two features")
+    if len(set(fields)) != len(fields):
+        raise ValueError("Sweep features must be distinct")
+    for field in fields:
+        if field not in SWEEPABLE_FIELDS:
+            raise ValueError(f"Feature {field!r} cannot be swept; choose from {', '.join(SWEEPABLE_FIELDS)}")
+
+    shape = tuple(len(values) for values in axes)
+    matrix = np.repeat(base.reshape(1, -1).astype(np.float32), int(np.prod(shape)), axis=0)
+    mesh = np.meshgrid(*axes, indexing="ij")
+    for field, values in zip(fields, mesh):
+        matrix[:, REQUEST_FIELDS.index(field)] = values.ravel()
+    return matrix
+
+
+def crossings(values: np.ndarray, probabilities: np.ndarray, threshold: float = 0.5) -> List[Dict[str, Any]]:
+    """Interpolated positions along ``values`` where ``probabilities`` crosses ``threshold``"""
+    above = probabilities >= threshold
+    index = np.flatnonzero(above[1:] != above[:-1])
+    p0, p1 = probabilities[index], probabilities[index + 1]
+    x0, x1 = values[index], values[index + 1]
+    positions = x0 + (threshold - p0) * (x1 - x0) / (p1 - p0)
+    return [
+        {"value": float(x), "direction": "rising" if b > a else "falling"}
+        for x, a, b in zip(positions, p0, p1)
+    ]
+
+
+def contour(fields: Sequence[str], axes: Sequence[np.ndarray], surface: np.ndarray,
+            threshold: float = 0.5) -> List[Dict[str, float]]:
+    """Points of the ``threshold`` contour of a 2-D surface, interpolated along both axes"""
+    (field_a, field_b), (values_a, values_b) = fields, axes
+    points = []
+    for i, a in enumerate(values_a):
+        for crossing in crossings(values_b, surface[i], threshold):
+            points.append({field_a: float(a), field_b: crossing["value"]})
+    for j, b in enumerate(values_b):
+        for crossing in crossings(values_a, surface[:, j], threshold):
+            points.append({field_a: crossing["value"], field_b: float(b)})
+    # Trace along the first axis so the points can be drawn as a polyline
+    points.sort(key=lambda point: (point[field_a], point[field_b]))
+    return points
+
+
+def sweep(base: Any, fields: Sequence[str], axes: Sequence[np.ndarray], pipeline: FeaturePipeline,
+          predict_fn: Callable[[np.ndarray], np.ndarray], threshold: float = 0.5) -> Dict[str, Any]:
+    """Score every variant of ``base`` in one forward pass.
+
+    The base request itself is scored in the same pass (as the last row), so
+    the response can show where it sits on the curve.
+    """
+    base_row = pipeline.encode_requests([base])[0]
+    matrix = build_matrix(base_row, fields, axes)
+    matrix = np.concatenate([matrix, base_row[None, :]])
+    probabilities = np.asarray(predict_fn(pipeline.transform(matrix)), dtype=np.float64).reshape(-1)
+
+    base_probability = float(probabilities[-1])
+    surface = probabilities[:-1].reshape(tuple(len(values) for values in axes))
+    result: Dict[str, Any] = {
+        "base_probability": base_probability,
+        "probabilities": surface,
+    }
+    if len(fields) == 1:
+        result["crossings"] = [
+            {fields[0]: c["value"], "direction": c["direction"]}
+            for c in crossings(axes[0], surface, threshold)
+        ]
+    else:
+        result["crossings"] = contour(fields, axes, surface, threshold)
+    return result
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Production server: pre-fork uvicorn workers that share preloaded models
+
+The master process imports the app, loads the feature pipeline, spatial index
+and every model variant once, freezes the heap (``gc.freeze``) and binds the
+listening socket, then forks the workers. The NumPy weight arrays are never
+written after loading, so every worker maps the same physical pages
+copy-on-write instead of holding its own copy.
+
+Each worker is pinned to its own slice of the CPUs, and the BLAS/OpenMP/
+TensorFlow thread pools are sized to that slice (the variables are set before
+NumPy is imported). SIGTERM or SIGINT drains the workers: they stop
+accepting, finish in-flight requests and exit, and are SIGKILLed after
+``--graceful-timeout``. A worker that dies unexpectedly is replaced, with
+exponential backoff if it keeps crashing right after start.
+
+    python serve.py --workers 4 --port 8001
+
+Fork requires Linux or macOS; elsewhere this falls back to uvicorn's own
+multi-process mode without preloading.
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import logging
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS", "TF_NUM_INTRAOP_THREADS",
+)
+
+# A worker that exits sooner than this after starting counts as a crash loop
+MIN_UPTIME_SECONDS = 10.0
+MAX_BACKOFF_SECONDS = 30.0
+
+logger = logging.getLogger("serve")
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_slices(cpus, workers: int):
+    """Disjoint CPU sets per worker when there are enough cores, else round-robin single cores"""
+    if workers <= len(cpus):
+        size = len(cpus) // workers
+        return [cpus[i * size:(i + 1) * size] for i in range(workers)]
+    return [[cpus[i % len(cpus)]] for i in range(workers)]
+
+
+def limit_threads(threads: int):
+    """Must run before NumPy/TensorFlow are imported to take effect"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Master:
+    def __init__(self, application, sock: socket.socket, workers: int, cpus, pin: bool,
+                 graceful_timeout: float, log_level: str):
+        self.application = application
+        self.sock = sock
+        self.slices = cpu_slices(cpus, workers)
+        self.pin = pin
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        # pid -> (worker index, start time)
+        self.workers = {}
+        self.failures = [0] * workers
+        self.stopping = False
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = (index, time.monotonic())
+            return
+        # Child: never return into the master's loop
+        status = 1
+        try:
+            self._run_worker(index)
+            status = 0
+        except BaseException:
+            logger.exception(f"Worker {index} failed")
+        finally:
+            os._exit(status)
+
+    def _run_worker(self, index: int):
+        import uvicorn
+
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+            signal.signal(signum, signal.SIG_DFL)
+        if self.pin and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.slices[index])
+        config = uvicorn.Config(
+            self.application,
+            log_level=self.log_level,
+            timeout_graceful_shutdown=self.graceful_timeout,
+        )
+        logger.info(f"Worker {index} (pid {os.getpid()}) serving on CPUs {self.slices[index] if self.pin else 'any'}")
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Received {signal.Signals(signum).name}; draining {len(self.workers)} workers")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        signal.alarm(max(1, int(self.graceful_timeout + 5)))
+
+    def kill_remaining(self, signum, frame):
+        for pid in list(self.workers):
+            logger.warning(f"Worker pid {pid} did not drain in time; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGALRM, self.kill_remaining)
+        for index in range(len(self.slices)):
+            self.spawn(index)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index, started = self.workers.pop(pid, (None, 0.0))
+            if index is None or self.stopping:
+                continue
+
+            uptime = time.monotonic() - started
+            code = os.waitstatus_to_exitcode(status)
+            self.failures[index] = self.failures[index] + 1 if uptime < MIN_UPTIME_SECONDS else 0
+            delay = min(2 ** self.failures[index] - 1, MAX_BACKOFF_SECONDS) if self.failures[index] else 0
+            logger.warning(f"Worker {index} (pid {pid}) exited with {code} after {uptime:.1f}s; "
+                           f"restarting in {delay:.0f}s")
+            if delay:
+                time.sleep(delay)
+            if not self.stopping:
+                self.spawn(index)
+
+        signal.alarm(0)
+        self.sock.close()
+        logger.info("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked, CPU-pinned workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+                        help="Worker processes (default: one per available CPU)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Math library threads per worker (default: CPUs / workers)")
+    parser.add_argument("--no-pin", action="store_true", help="Do not pin workers to CPUs")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Load models in each worker instead of once in the master")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds a worker may spend draining before it is killed")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    workers = args.workers or len(cpus)
+    threads = args.threads or max(1, len(cpus) // workers)
+    limit_threads(threads)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+
+    if not hasattr(os, "fork"):
+        import uvicorn
+
+        logger.warning("os.fork is unavailable; using uvicorn workers without preloading or pinning")
+        uvicorn.run("app:app", host=args.host, port=args.port, workers=workers, log_level=args.log_level,
+                    timeout_graceful_shutdown=args.graceful_timeout)
+        return
+
+    import gc
+    import app
+
+    if not args.no_preload:
+        start = time.perf_counter()
+        if app.model_service.preload():
+            logger.info(f"Models preloaded in {time.perf_counter() - start:.2f}s; forking {workers} workers")
+        else:
+            logger.warning("Model preload failed; workers will load the models themselves")
+        if "tensorflow" in sys.modules:
+            logger.warning("TensorFlow was imported before fork (Keras engine); "
+                           "use --no-preload if workers misbehave")
+    # Objects created so far are shared; keep the collector from touching (and copying) their pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+    logger.info(f"Listening on {args.host}:{args.port} with {workers} workers x {threads} threads")
+    Master(app.app, sock, workers, cpus, not args.no_pin, args.graceful_timeout, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,10 @@ def setup_models():
             dest = models_dir / "best_model.keras"
             shutil.copy2(source, dest)
             print(f"Copied model: {source} -> {dest}")
+            # Copy the exported NumPy model alongside it (see export_models.py)
+            if source.with_suffix(".npz").exists():
+                shutil.copy2(source.with_suffix(".npz"), dest.with_suffix(".npz"))
+                print(f"Copied NumPy model: {source.with_suffix('.npz')} -> {dest.with_suffix('.npz')}")
             model_copied = True
             break
     
@@ -45,6 +49,15 @@ def setup_models():
     else:
         print("Warning: Normalization parameters not found")
     
+    # Copy standardization parameters (StandardScaler fitted during training)
+    std_params_source = project_root / "Standardized_param.json"
+    if std_params_source.exists():
+        dest = backend_dir / "Standardized_param.json"
+        shutil.copy2(std_params_source, dest)
+        print(f"Copied standardization parameters: {std_params_source} -> {dest}")
+    else:
+        print("Warning: Standardization parameters not found")
+    
     print("\nModel setup completed!")
     print(f"Models directory: {models_dir}")
 
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Spatial index over historical flood records for k-nearest and radius lookups
+
+Latitude/longitude points are embedded as unit vectors on the sphere and
+indexed with scipy's cKDTree, so straight-line (chord) distance orders
+points exactly like great-circle distance and a query costs O(log n)
+instead of a pandas scan over every record.
+"""
+import math
+import time
+import pickle
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+INDEX_FORMAT_VERSION = 1
+
+# Request fields that can be filled from nearby records, with their dataset columns
+CONTEXT_COLUMNS = {
+    "population_density": "Population Density",
+    "historical_floods": "Historical Floods",
+}
+
+# Fields that are 0/1 flags; filled by weighted vote instead of weighted mean
+BINARY_FIELDS = {"historical_floods"}
+
+
+def to_unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """(N, 3) points on the unit sphere"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def _unit_vector(latitude: float, longitude: float) -> np.ndarray:
+    # Scalar version of to_unit_vectors; avoids array overhead on the hot query path
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return np.array((cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)))
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2.0 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+class SpatialIndex:
+    """Historical records plus a KD-tree on their locations"""
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, columns: Dict[str, np.ndarray],
+                 source: Optional[Dict[str, Any]] = None):
+        from scipy.spatial import cKDTree
+
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.columns = columns
+        self.source = source or {}
+        start = time.perf_counter()
+        self.tree = cKDTree(to_unit_vectors(self.latitudes, self.longitudes))
+        self.build_seconds = time.perf_counter() - start
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @classmethod
+    def from_csv(cls, csv_path) -> "SpatialIndex":
+        """Index every record of a flood dataset CSV (e.g. flood_risk_dataset_india.csv)"""
+        import pandas as pd
+
+        csv_path = Path(csv_path)
+        df = pd.read_csv(csv_path)
+        columns = {
+            column: df[column].to_numpy()
+            for column in df.columns if column not in ("Latitude", "Longitude")
+        }
+        stat = csv_path.stat()
+        source = {"path": str(csv_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return cls(df["Latitude"].to_numpy(), df["Longitude"].to_numpy(), columns, source)
+
+    def save(self, path):
+        """Serialize records and tree so the next start skips reading the CSV"""
+        with open(path, "wb") as f:
+            pickle.dump({"format_version": INDEX_FORMAT_VERSION, "index": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path) -> "SpatialIndex":
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported spatial index format in {path}")
+        return payload["index"]
+
+    @classmethod
+    def load_or_build(cls, csv_path, cache_path=None) -> "SpatialIndex":
+        """Load the serialized index if it matches the CSV, otherwise build (and save) it"""
+        csv_path = Path(csv_path)
+        if cache_path and Path(cache_path).exists():
+            try:
+                index = cls.load(cache_path)
+                stat = csv_path.stat()
+                if index.source.get("size") == stat.st_size and index.source.get("mtime_ns") == stat.st_mtime_ns:
+                    return index
+                logger.info(f"Spatial index {cache_path} is stale; rebuilding from {csv_path}")
+            except Exception as e:
+                logger.warning(f"Could not load spatial index {cache_path}: {str(e)}")
+
+        index = cls.from_csv(csv_path)
+        if cache_path:
+            try:
+                index.save(cache_path)
+            except OSError as e:
+                logger.warning(f"Could not save spatial index {cache_path}: {str(e)}")
+        return index
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5,
+                max_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances (km) of the k nearest records, nearest first"""
+        k = min(k, len(self))
+        bound = km_to_chord(max_km) if max_km is not None else np.inf
+        chord, index = self.tree.query(_unit_vector(latitude, longitude), k=k, distance_upper_bound=bound)
+        chord, index = np.atleast_1d(chord), np.atleast_1d(index)
+        found = np.isfinite(chord)
+        return index[found], chord_to_km(chord[found])
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances (km) of every record within ``radius_km``, nearest first"""
+        point = _unit_vector(latitude, longitude)
+        index = np.asarray(self.tree.query_ball_point(point, km_to_chord(radius_km)), dtype=np.intp)
+        if not len(index):
+            return index, np.empty(0)
+        distances = chord_to_km(np.linalg.norm(self.tree.data[index] - point, axis=1))
+        order = np.argsort(distances, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return index[order], distances[order]
+
+    def records(self, index: np.ndarray, distances: np.ndarray) -> List[Dict[str, Any]]:
+        """Records as JSON-ready dicts with their distance"""
+        rows = []
+        for i, distance in zip(index.tolist(), distances.tolist()):
+            row = {"latitude": float(self.latitudes[i]), "longitude": float(self.longitudes[i]),
+                   "distance_km": round(distance, 4)}
+            for column, values in self.columns.items():
+                value = values[i]
+                row[column] = value.item() if hasattr(value, "item") else value
+            rows.append(row)
+        return rows
+
+    def fill_context(self, latitude: float, longitude: float, fields: List[str], k: int = 5,
+                     max_km: Optional[float] = None) -> Dict[str, Any]:
+        """Estimate context fields from the k nearest records, weighted by inverse distance.
+
+        Raises ValueError if no record lies within ``max_km``.
+        """
+        index, distances = self.nearest(latitude, longitude, k, max_km)
+        if not len(index):
+            raise ValueError(f"No historical records within {max_km} km to fill {', '.join(fields)}")
+
+        # 1 km floor so an exact match does not get an infinite weight
+        weights = 1.0 / np.maximum(distances, 1.0)
+        weights /= weights.sum()
+
+        filled = {}
+        for field in fields:
+            values = np.asarray(self.columns[CONTEXT_COLUMNS[field]][index], dtype=np.float64)
+            value = float(np.dot(weights, values))
+            filled[field] = int(value >= 0.5) if field in BINARY_FIELDS else value
+        return filled
+
+    def fill_columns(self, latitudes: np.ndarray, longitudes: np.ndarray, fields: List[str], k: int = 5,
+                     max_km: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """``fill_context`` for many locations in one tree query; NaN where no record is within ``max_km``"""
+        k = min(k, len(self))
+        bound = km_to_chord(max_km) if max_km is not None else np.inf
+        chord, index = self.tree.query(to_unit_vectors(latitudes, longitudes), k=k, distance_upper_bound=bound)
+        chord, index = chord.reshape(len(chord), k), index.reshape(len(index), k)
+        found = np.isfinite(chord)
+
+        weights = np.where(found, 1.0 / np.maximum(chord_to_km(np.where(found, chord, 0.0)), 1.0), 0.0)
+        total = weights.sum(axis=1)
+        weights /= np.where(total > 0, total, 1.0)[:, None]
+        index = np.where(found, index, 0)
+
+        filled = {}
+        for field in fields:
+            values = np.asarray(self.columns[CONTEXT_COLUMNS[field]], dtype=np.float64)[index]
+            value = (weights * values).sum(axis=1)
+            if field in BINARY_FIELDS:
+                value = (value >= 0.5).astype(np.float64)
+            value[total == 0] = np.nan
+            filled[field] = value
+        return filled
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "records": len(self),
+            "source": self.source,
+            "build_seconds": round(self.build_seconds, 6),
+            "context_fields": list(CONTEXT_COLUMNS),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the spatial index over historical flood records")
+    parser.add_argument("--csv", default="../flood_risk_dataset_india.csv")
+    parser.add_argument("--output", default="spatial_index.pkl")
+    parser.add_argument("--benchmark", type=int, default=10000, help="Number of random k-nearest queries to time")
+    args = parser.parse_args()
+
+    index = SpatialIndex.from_csv(args.csv)
+    index.save(args.output)
+    print(f"Indexed {len(index)} records in {index.build_seconds:.3f}s -> {args.output}")
+
+    if args.benchmark:
+        rng = np.random.default_rng(0)
+        latitudes = rng.uniform(index.latitudes.min(), index.latitudes.max(), args.benchmark)
+        longitudes = rng.uniform(index.longitudes.min(), index.longitudes.max(), args.benchmark)
+        start = time.perf_counter()
+        for latitude, longitude in zip(latitudes, longitudes):
+            index.nearest(latitude, longitude, k=5)
+        elapsed = time.perf_counter() - start
+        print(f"k=5 nearest: {elapsed / args.benchmark * 1e6:.1f} us/query over {args.benchmark} queries")
+
+
+if __name__ == "__main__":
+    main()
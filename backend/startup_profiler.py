@@ -0,0 +1,65 @@
+"""
+Startup-time budget report for the API process
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Record how long each import and load phase takes during startup.
+
+    Phases are timed with ``time.perf_counter`` relative to the moment the
+    profiler was created, which should be as early as possible in app.py.
+    """
+
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self.phases: List[Dict[str, Any]] = []
+        self.ready_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            entry = {
+                "name": name,
+                "start_offset": round(start - self.created_at, 6),
+                "seconds": round(end - start, 6),
+                "thread": threading.current_thread().name,
+            }
+            if error:
+                entry["error"] = error
+            with self._lock:
+                self.phases.append(entry)
+
+    def mark_ready(self):
+        """Record the moment the service became ready to predict"""
+        self.ready_at = time.perf_counter()
+        logger.info(f"Service ready {self.ready_at - self.created_at:.3f}s after startup")
+        for entry in self.phases:
+            logger.info(f"   {entry['name']}: {entry['seconds'] * 1000:.1f} ms")
+
+    def report(self) -> Dict[str, Any]:
+        """Per-phase timings and time to readiness"""
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "ready": self.ready_at is not None,
+            "seconds_to_ready": round(self.ready_at - self.created_at, 6) if self.ready_at else None,
+            "uptime_seconds": round(time.perf_counter() - self.created_at, 6),
+            "phases": phases,
+        }
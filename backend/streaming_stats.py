@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Out-of-core normalization parameters from chunked, sharded inputs
+
+``normalize_and_save_params`` in ModelCleaning.ipynb loads the whole dataset
+into pandas and takes ``min()``/``max()`` per column. Here every input (CSV
+files, or column_store dataset directories) is cut into shards (CSV byte
+ranges aligned to line starts, or row ranges of the memmapped columns) and
+each shard is read in bounded chunks by a worker process. Workers keep
+mergeable running count/min/max/mean/M2 per column (Chan et al.'s parallel
+variance update), so the partial results combine exactly regardless of how
+the data was split. Memory use is bounded by the chunk size, not the data.
+
+The result is written as a versioned ``Normalized_param.vN.json``: the same
+``{column: {min, max}}`` layout the API compiles, plus mean/std/count and a
+``_meta`` block. Point ``NORMALIZATION_PARAMS`` at the output directory and
+the API loads the newest version on start or reload.
+
+    python streaming_stats.py ../mapped_dataset.csv --output params/
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple, Any
+import numpy as np
+
+from feature_pipeline import CATEGORY_CODES, versioned_params
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+PARAMS_PREFIX = "Normalized_param"
+
+
+class RunningStats:
+    """Mergeable count/min/max/mean/variance for a fixed list of columns"""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k, dtype=np.float64)
+        self.m2 = np.zeros(k, dtype=np.float64)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def update(self, block: np.ndarray):
+        """Fold an (n, k) float64 block in; NaN marks a missing value"""
+        if block.size == 0:
+            return
+        valid = ~np.isnan(block)
+        count = valid.sum(axis=0)
+        total = np.where(valid, block, 0.0).sum(axis=0)
+        mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        m2 = np.where(valid, (block - mean) ** 2, 0.0).sum(axis=0)
+        with np.errstate(invalid="ignore"):
+            low = np.where(valid, block, np.inf).min(axis=0)
+            high = np.where(valid, block, -np.inf).max(axis=0)
+        self._combine(count, mean, m2, low, high)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge statistics over different columns")
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def _combine(self, count, mean, m2, low, high):
+        total = self.count + count
+        delta = mean - self.mean
+        safe = np.maximum(total, 1)
+        self.mean = self.mean + delta * count / safe
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe
+        self.count = total
+        self.min = np.minimum(self.min, low)
+        self.max = np.maximum(self.max, high)
+
+    def to_params(self) -> Dict[str, Dict[str, float]]:
+        """Normalized_param.json entries; std is the population std like StandardScaler"""
+        params = {}
+        for i, column in enumerate(self.columns):
+            n = int(self.count[i])
+            if n == 0:
+                continue
+            variance = self.m2[i] / n
+            params[column] = {
+                "min": float(self.min[i]),
+                "max": float(self.max[i]),
+                "mean": float(self.mean[i]),
+                "std": float(np.sqrt(variance)),
+                "count": n,
+            }
+        return params
+
+
+# =============================================================================
+# SHARDS
+# =============================================================================
+
+def _csv_header(path: Path) -> Tuple[List[str], int]:
+    """Column names and the byte offset of the first data row"""
+    import pandas as pd
+
+    with open(path, "rb") as f:
+        first_line = f.readline()
+    columns = list(pd.read_csv(io.BytesIO(first_line), nrows=0).columns)
+    return columns, len(first_line)
+
+
+def _align(f, offset: int) -> int:
+    """First line start at or after ``offset`` (rows are assumed to hold no quoted newlines)"""
+    if offset == 0:
+        return 0
+    f.seek(offset - 1)
+    if f.read(1) == b"\n":
+        return offset
+    f.readline()
+    return f.tell()
+
+
+def plan_shards(path, shards_per_file: int) -> List[Dict[str, Any]]:
+    """Split one input into roughly equal, line-aligned CSV byte ranges or store row ranges"""
+    from column_store import ColumnStore, is_store
+
+    path = Path(path)
+    if is_store(path):
+        rows = ColumnStore(path).rows
+        bounds = np.linspace(0, rows, shards_per_file + 1).astype(int)
+        return [{"kind": "store", "path": str(path), "start": int(a), "end": int(b)}
+                for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    _, data_start = _csv_header(path)
+    size = path.stat().st_size
+    step = max((size - data_start) // shards_per_file, 1)
+    shards = []
+    with open(path, "rb") as f:
+        start = data_start
+        while start < size:
+            end = size if size - start <= step else _align(f, start + step)
+            shards.append({"kind": "csv", "path": str(path), "start": start, "end": end})
+            start = end
+    return shards
+
+
+def _encode_frame(df, columns: List[str]) -> np.ndarray:
+    """Numeric (n, k) block: category names mapped to their codes, anything else coerced"""
+    import pandas as pd
+
+    block = np.empty((len(df), len(columns)), dtype=np.float64)
+    for j, column in enumerate(columns):
+        values = df[column]
+        if column in CATEGORY_CODES and not pd.api.types.is_numeric_dtype(values):
+            # Missing or unknown categories become NaN (skipped), like unparseable numbers
+            block[:, j] = pd.to_numeric(values.map(CATEGORY_CODES[column]), errors="coerce").to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+        else:
+            block[:, j] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return block
+
+
+def shard_stats(shard: Dict[str, Any], chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> RunningStats:
+    """Statistics of one shard, read ``chunk_bytes`` (CSV) or ``chunk_rows`` (store) at a time"""
+    import pandas as pd
+
+    if shard["kind"] == "store":
+        from column_store import ColumnStore
+
+        store = ColumnStore(shard["path"])
+        columns = [c for c in store.columns if store.categories(c) is None or c in CATEGORY_CODES]
+        stats = RunningStats(columns)
+        for start in range(shard["start"], shard["end"], chunk_rows):
+            end = min(start + chunk_rows, shard["end"])
+            frame = pd.DataFrame({
+                c: store.column(c)[start:end] if store.categories(c) is None
+                else np.asarray(store.categories(c), dtype=object)[store.column(c)[start:end]]
+                for c in columns
+            })
+            stats.update(_encode_frame(frame, columns))
+        return stats
+
+    columns, _ = _csv_header(Path(shard["path"]))
+    stats = RunningStats(columns)
+    with open(shard["path"], "rb") as f:
+        position = shard["start"]
+        f.seek(position)
+        while position < shard["end"]:
+            data = f.read(min(chunk_bytes, shard["end"] - position))
+            if not data:
+                break
+            position += len(data)
+            # Finish the chunk at a line end; the partial line is re-read next time
+            if position < shard["end"] and not data.endswith(b"\n"):
+                cut = data.rfind(b"\n") + 1
+                if cut > 0:
+                    position -= len(data) - cut
+                    data = data[:cut]
+                    f.seek(position)
+                else:
+                    data += f.readline()
+                    position = f.tell()
+            frame = pd.read_csv(io.BytesIO(data), header=None, names=columns)
+            stats.update(_encode_frame(frame, columns))
+    return stats
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+def compute(inputs: Sequence, workers: int = 0, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+            chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[RunningStats, List[Dict[str, Any]]]:
+    """Shard every input over ``workers`` processes and merge the partial statistics in shard order"""
+    workers = workers or os.cpu_count() or 1
+    shards = [shard for path in inputs for shard in plan_shards(path, workers)]
+    if not shards:
+        raise ValueError("No data rows in the inputs")
+
+    if workers == 1:
+        partials = [shard_stats(shard, chunk_bytes, chunk_rows) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(shard_stats, shards, [chunk_bytes] * len(shards), [chunk_rows] * len(shards)))
+
+    # Inputs may not share every column; merge per column name
+    columns = list(dict.fromkeys(c for partial in partials for c in partial.columns))
+    total = RunningStats(columns)
+    for partial in partials:
+        aligned = RunningStats(columns)
+        index = [columns.index(c) for c in partial.columns]
+        for attribute in ("count", "mean", "m2", "min", "max"):
+            getattr(aligned, attribute)[index] = getattr(partial, attribute)
+        total.merge(aligned)
+    return total, shards
+
+
+def write_params(params: Dict[str, Any], output: Path, meta: Dict[str, Any]) -> Path:
+    """Write ``output`` if it is a .json path, else the next ``Normalized_param.vN.json`` in that directory"""
+    if output.suffix == ".json":
+        path = output
+        version = meta.get("version")
+    else:
+        output.mkdir(parents=True, exist_ok=True)
+        existing = versioned_params(output)
+        version = (existing[-1][0] + 1) if existing else 1
+        path = output / f"{PARAMS_PREFIX}.v{version}.json"
+
+    document = dict(params)
+    document["_meta"] = {
+        **meta,
+        "version": version,
+        "params_sha1": hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest(),
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(document, f, indent=4)
+    tmp.replace(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute normalization parameters out of core, in parallel")
+    parser.add_argument("inputs", nargs="+", help="CSV files and/or column_store dataset directories")
+    parser.add_argument("--output", default="params",
+                        help="Directory for a new Normalized_param.vN.json, or an explicit .json path")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / 2 ** 20,
+                        help="CSV bytes parsed at a time per worker")
+    parser.add_argument("--compare", default=None, help="Existing parameter file to diff the result against")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats, shards = compute(args.inputs, args.workers, int(args.chunk_mb * 2 ** 20))
+    params = stats.to_params()
+    elapsed = time.perf_counter() - start
+
+    meta = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "sources": [str(p) for p in args.inputs],
+        "rows": int(stats.count.max()) if len(stats.count) else 0,
+        "shards": len(shards),
+    }
+    path = write_params(params, Path(args.output), meta)
+
+    print(f"{meta['rows']} rows from {len(args.inputs)} input(s) in {len(shards)} shards: {elapsed:.2f}s")
+    print(f"{'Column':<24} {'min':>14} {'max':>14} {'mean':>14} {'std':>14}")
+    for column, p in params.items():
+        print(f"{column:<24} {p['min']:>14.6g} {p['max']:>14.6g} {p['mean']:>14.6g} {p['std']:>14.6g}")
+    print(f"Parameters saved to '{path}'")
+
+    if args.compare:
+        with open(args.compare) as f:
+            reference = json.load(f)
+        diffs = [
+            abs(params[c][k] - reference[c][k])
+            for c in reference if c in params and not c.startswith("_")
+            for k in ("min", "max") if k in reference[c]
+        ]
+        print(f"Max |diff| vs {args.compare}: {max(diffs) if diffs else float('nan'):.3e} over {len(diffs)} values")
+
+
+if __name__ == "__main__":
+    main()
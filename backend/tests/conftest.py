@@ -0,0 +1,44 @@
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+PROJECT_ROOT = BACKEND_DIR.parent
+
+# Backend modules import each other as top-level siblings (run from backend/)
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    """Run ``scenario(client)`` against the app started from backend/, with jobs kept in tmp_path"""
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.chdir(BACKEND_DIR)
+    import app
+    from scoring_jobs import JobManager
+
+    monkeypatch.setattr(app, "jobs", JobManager(tmp_path / "jobs", poll_seconds=0.1))
+
+    async def run(scenario):
+        await app.startup_event()
+        try:
+            await app.app.state.model_loader
+            transport = httpx.ASGITransport(app=app.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+        finally:
+            await app.shutdown_event()
+
+    return lambda scenario: asyncio.run(run(scenario))
+
+
+@pytest.fixture
+def upload_with_invalid_row() -> bytes:
+    """First two dataset rows as CSV, the second with a negative rainfall reading"""
+    import pandas as pd
+
+    rows = pd.read_csv(PROJECT_ROOT / "flood_risk_dataset_india.csv", nrows=2)
+    rows.loc[1, "Rainfall (mm)"] = -5
+    return rows.to_csv(index=False).encode()
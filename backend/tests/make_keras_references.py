@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Write Keras reference probabilities for the NumPy engine parity test
+
+Archives saved by Keras 3 load in the installed Keras; the ones saved by
+Keras 2.15 need a TensorFlow 2.15 environment. Run this once under each and
+commit the resulting tests/data/*_probs.npy files:
+
+    cd backend && python tests/make_keras_references.py
+"""
+import io
+import sys
+import shutil
+import zipfile
+import tempfile
+from pathlib import Path
+import numpy as np
+
+TESTS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TESTS_DIR.parents[1]
+DATA_DIR = TESTS_DIR / "data"
+
+# Leading rows of mapped_dataset_Normalized_version.csv scored for each model
+REFERENCE_ROWS = 1000
+
+
+def load_samples(rows: int = REFERENCE_ROWS) -> np.ndarray:
+    dataset = PROJECT_ROOT / "mapped_dataset_Normalized_version.csv"
+    return np.loadtxt(dataset, delimiter=",", skiprows=1, max_rows=rows, dtype=np.float32)[:, :-1]
+
+
+def reference_path(keras_path: Path) -> Path:
+    """tests/data/<model directory, slugged>_probs.npy for a best_model.keras"""
+    parts = Path(keras_path).resolve().parent.relative_to(PROJECT_ROOT).parts
+    slug = "_".join(parts).lower().replace(" ", "_")
+    return DATA_DIR / f"{slug}_probs.npy"
+
+
+def _repaired_archive(keras_path: Path, workdir: Path) -> Path:
+    """Copy of an archive saved on Windows, with "layers\\dense" weight groups nested as "layers/dense" """
+    import h5py
+
+    with zipfile.ZipFile(keras_path) as archive:
+        members = {name: archive.read(name) for name in archive.namelist()}
+    source = h5py.File(io.BytesIO(members["model.weights.h5"]), "r")
+    buffer = io.BytesIO()
+    with source, h5py.File(buffer, "w") as weights:
+        for key in source:
+            weights.copy(source[key], key.replace("\\", "/"))
+    members["model.weights.h5"] = buffer.getvalue()
+
+    repaired = workdir / keras_path.name
+    with zipfile.ZipFile(repaired, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return repaired
+
+
+def load_keras(keras_path: Path, workdir: Path):
+    import tensorflow as tf
+
+    try:
+        return tf.keras.models.load_model(str(keras_path), compile=False)
+    except ValueError:
+        return tf.keras.models.load_model(str(_repaired_archive(keras_path, workdir)), compile=False)
+
+
+def main():
+    sys.path.insert(0, str(TESTS_DIR.parent))
+    from export_models import discover_keras_models
+
+    samples = load_samples()
+    DATA_DIR.mkdir(exist_ok=True)
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        for keras_path in discover_keras_models(PROJECT_ROOT):
+            try:
+                model = load_keras(keras_path, workdir)
+            except Exception as e:
+                print(f"Skipped {keras_path}: {type(e).__name__}: {str(e).splitlines()[0][:80]}")
+                continue
+            dest = reference_path(keras_path)
+            np.save(dest, model.predict(samples, verbose=0).astype(np.float32))
+            print(f"Wrote {dest.relative_to(PROJECT_ROOT)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
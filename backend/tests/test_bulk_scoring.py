@@ -0,0 +1,25 @@
+"""
+CSV output of bulk scoring, with rejected rows next to scored ones
+"""
+import io
+
+import pandas as pd
+
+from bulk_scoring import OUTPUT_COLUMNS, INVALID_ROW_ERROR
+
+
+def test_bulk_csv_round_trips(api, upload_with_invalid_row):
+    async def scenario(client):
+        return await client.post(
+            "/predict/bulk", params={"output_format": "csv"},
+            files={"file": ("rows.csv", upload_with_invalid_row, "text/csv")}
+        )
+
+    response = api(scenario)
+    assert response.status_code == 200
+    results = pd.read_csv(io.StringIO(response.text))
+    assert list(results.columns) == OUTPUT_COLUMNS
+    assert results["row"].tolist() == [0, 1]
+    assert results["prediction"].notna().tolist() == [True, False]
+    assert results["error"].isna().tolist() == [True, False]
+    assert results.loc[1, "error"] == INVALID_ROW_ERROR
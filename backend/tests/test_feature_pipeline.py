@@ -0,0 +1,19 @@
+"""
+Golden check of the feature pipeline against the notebook-normalized dataset
+"""
+from pathlib import Path
+
+from feature_pipeline import check_golden
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+TOLERANCE = 1e-5
+
+
+def test_min_max_matches_normalized_dataset():
+    diff = check_golden(
+        PROJECT_ROOT / "flood_risk_dataset_india.csv",
+        PROJECT_ROOT / "mapped_dataset_Normalized_version.csv",
+        PROJECT_ROOT / "backend" / "Normalized_param.json",
+        TOLERANCE,
+    )
+    assert diff <= TOLERANCE
@@ -0,0 +1,50 @@
+"""
+Parity of the NumPy inference engine with the Keras models it was exported from
+"""
+import numpy as np
+import pytest
+
+from export_models import discover_keras_models
+from numpy_engine import NumpyModel
+from make_keras_references import PROJECT_ROOT, load_samples, load_keras, reference_path
+
+TOLERANCE = 1e-5
+
+KERAS_MODELS = pytest.mark.parametrize(
+    "keras_path", discover_keras_models(PROJECT_ROOT),
+    ids=lambda path: str(path.relative_to(PROJECT_ROOT)),
+)
+
+
+@pytest.fixture(scope="module")
+def samples():
+    return load_samples()
+
+
+@KERAS_MODELS
+def test_matches_keras_reference(keras_path, samples):
+    reference = reference_path(keras_path)
+    assert reference.exists(), f"No Keras reference for {keras_path}; run tests/make_keras_references.py"
+    expected = np.load(reference)
+
+    actual = NumpyModel.from_keras(keras_path).predict_on_batch(samples)
+    assert actual.shape == expected.shape
+    assert float(np.max(np.abs(actual - expected))) <= TOLERANCE
+
+    # The committed .npz is what the API serves, so it must be current too
+    served = NumpyModel.load(keras_path.with_suffix(".npz")).predict_on_batch(samples)
+    assert float(np.max(np.abs(served - expected))) <= TOLERANCE
+
+
+@KERAS_MODELS
+def test_matches_keras_predict(keras_path, samples, tmp_path):
+    pytest.importorskip("tensorflow")
+    try:
+        keras_model = load_keras(keras_path, tmp_path)
+    except (TypeError, ValueError) as e:
+        # Archives saved by Keras 2.15 only load there; the reference test covers them
+        pytest.skip(f"{keras_path} does not load under this Keras: {str(e).splitlines()[0][:80]}")
+    expected = keras_model.predict(samples, verbose=0)
+
+    actual = NumpyModel.from_keras(keras_path).predict_on_batch(samples)
+    assert float(np.max(np.abs(actual - expected))) <= TOLERANCE
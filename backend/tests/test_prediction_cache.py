@@ -0,0 +1,24 @@
+"""
+Shared prediction cache tier across workers
+"""
+import numpy as np
+
+from prediction_cache import PredictionCache, SQLiteCacheBackend
+
+
+def test_version_switch_keeps_other_workers_rows(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    old_worker = PredictionCache(shared_backend=backend)
+    new_worker = PredictionCache(shared_backend=backend)
+    old_worker.set_model_version("v1")
+    new_worker.set_model_version("v1")
+
+    key = old_worker.make_key(np.arange(13))
+    old_worker.put(key, 0.75)
+    backend.flush()
+
+    # Rolling reload: one worker switches while the other still serves v1
+    new_worker.set_model_version("v2")
+    assert new_worker.get_shared(key) is None
+    assert backend.rows() == 1
+    assert old_worker.get_shared(key) == 0.75
@@ -0,0 +1,34 @@
+"""
+Results of background scoring jobs
+"""
+import io
+import asyncio
+
+import pandas as pd
+
+from bulk_scoring import OUTPUT_COLUMNS, INVALID_ROW_ERROR
+
+
+def test_csv_job_results_round_trip(api, upload_with_invalid_row):
+    async def scenario(client):
+        submitted = await client.post(
+            "/jobs", params={"output_format": "csv", "chunk_size": 1},
+            files={"file": ("rows.csv", upload_with_invalid_row, "text/csv")}
+        )
+        assert submitted.status_code == 202
+        status_url = submitted.json()["status_url"]
+        for _ in range(600):
+            job = (await client.get(status_url)).json()
+            if job["status"] not in ("queued", "running"):
+                break
+            await asyncio.sleep(0.1)
+        assert job["status"] == "completed", job
+        return await client.get(submitted.json()["results_url"])
+
+    response = api(scenario)
+    assert response.status_code == 200
+    results = pd.read_csv(io.StringIO(response.text))
+    assert list(results.columns) == OUTPUT_COLUMNS
+    assert results["row"].tolist() == [0, 1]
+    assert results["prediction"].notna().tolist() == [True, False]
+    assert results.loc[1, "error"] == INVALID_ROW_ERROR
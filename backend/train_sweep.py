@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Parallel training and hyperparameter sweeps for the flood classifier
+
+Replaces the hand-edited ``Neural Network Classifier_v*`` notebooks with one
+command. The dataset is read and split once in the parent process (same
+stratified 80/20 split and StandardScaler as the notebooks), placed in
+shared memory, and every worker process maps it instead of re-reading the
+CSV. Each trial trains with early stopping on the notebooks' validation
+split (last 20% of the training rows) and exports ``best_model.keras`` and
+``best_model.npz``; all trials land in one leaderboard.
+
+    python train_sweep.py --layers 128,64 64,64,64 --dropout 0.3 0.4 \\
+        --learning-rate 1e-3 5e-4 --batch-size 32 64 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Tuple, Any
+import numpy as np
+
+from feature_pipeline import (
+    FeaturePipeline, FEATURE_COLUMNS, TARGET_COLUMN, fit_standardization, training_split, load_dataset
+)
+
+LEADERBOARD_COLUMNS = [
+    "rank", "trial", "layers", "dropout", "batch_norm", "learning_rate", "batch_size",
+    "val_auc", "val_accuracy", "test_auc", "test_accuracy", "test_loss",
+    "epochs_run", "best_epoch", "params", "seconds", "artifact"
+]
+
+# Shared dataset arrays, attached once per worker process
+_shared: Dict[str, Any] = {}
+
+
+# =============================================================================
+# SHARED DATASET
+# =============================================================================
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, Dict[str, Tuple]]:
+    """Copy arrays into one shared memory block; returns the block and a layout for workers"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[name] = (offset, array.shape, array.dtype.str)
+        offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        start, shape, dtype = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+    return block, layout
+
+
+def _attach_worker(block_name: str, layout: Dict[str, Tuple], threads: int):
+    """Pool initializer: map the shared dataset and size the TensorFlow thread pools"""
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    block = shared_memory.SharedMemory(name=block_name)
+    _shared["block"] = block
+    for name, (offset, shape, dtype) in layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        array.flags.writeable = False
+        _shared[name] = array
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+# =============================================================================
+# TRIALS
+# =============================================================================
+
+def build_model(n_features: int, layers: List[int], dropout: float, batch_norm: bool, learning_rate: float):
+    """Sequential Dense stack in the style of the notebooks (relu hidden layers, sigmoid output)"""
+    import tensorflow as tf
+    from tensorflow.keras import layers as keras_layers
+
+    model = tf.keras.Sequential([keras_layers.Input(shape=(n_features,))])
+    for i, units in enumerate(layers):
+        model.add(keras_layers.Dense(units, activation="relu"))
+        if batch_norm:
+            model.add(keras_layers.BatchNormalization())
+        # Dropout after the first hidden layer, as in every notebook variant
+        if dropout > 0 and i == 0:
+            model.add(keras_layers.Dropout(dropout))
+    model.add(keras_layers.Dense(1, activation="sigmoid"))
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+                  loss="binary_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def run_trial(trial: int, config: Dict[str, Any], output_dir: str, max_epochs: int,
+              patience: int, seed: int) -> Dict[str, Any]:
+    """Train one configuration in a worker process and export its artifacts"""
+    import tensorflow as tf
+    from sklearn.metrics import roc_auc_score, accuracy_score
+    from numpy_engine import NumpyModel
+
+    tf.keras.utils.set_random_seed(seed + trial)
+    x_fit, y_fit = _shared["x_fit"], _shared["y_fit"]
+    x_val, y_val = _shared["x_val"], _shared["y_val"]
+    x_test, y_test = _shared["x_test"], _shared["y_test"]
+
+    start = time.perf_counter()
+    model = build_model(x_fit.shape[1], config["layers"], config["dropout"],
+                        config["batch_norm"], config["learning_rate"])
+    early_stopping = tf.keras.callbacks.EarlyStopping(
+        monitor="val_loss", patience=patience, restore_best_weights=True
+    )
+    history = model.fit(
+        x_fit, y_fit, validation_data=(x_val, y_val),
+        epochs=max_epochs, batch_size=config["batch_size"],
+        callbacks=[early_stopping], verbose=0
+    )
+
+    val_proba = model.predict(x_val, batch_size=4096, verbose=0).reshape(-1)
+    test_proba = model.predict(x_test, batch_size=4096, verbose=0).reshape(-1)
+    test_loss = float(model.evaluate(x_test, y_test, batch_size=4096, verbose=0)[0])
+
+    trial_dir = Path(output_dir) / f"trial_{trial:03d}"
+    trial_dir.mkdir(parents=True, exist_ok=True)
+    keras_path = trial_dir / "best_model.keras"
+    model.save(keras_path)
+    NumpyModel.from_keras(keras_path).save(trial_dir / "best_model.npz")
+
+    val_losses = history.history["val_loss"]
+    result = {
+        "trial": trial,
+        **config,
+        "val_auc": float(roc_auc_score(y_val, val_proba)),
+        "val_accuracy": float(accuracy_score(y_val, val_proba > 0.5)),
+        "test_auc": float(roc_auc_score(y_test, test_proba)),
+        "test_accuracy": float(accuracy_score(y_test, test_proba > 0.5)),
+        "test_loss": test_loss,
+        "epochs_run": len(val_losses),
+        "best_epoch": int(np.argmin(val_losses)) + 1,
+        "params": int(model.count_params()),
+        "seconds": round(time.perf_counter() - start, 3),
+        "artifact": str(trial_dir),
+    }
+    with open(trial_dir / "trial.json", "w") as f:
+        json.dump({**result, "history": {k: [float(v) for v in vs] for k, vs in history.history.items()}}, f, indent=2)
+    return result
+
+
+# =============================================================================
+# SWEEP
+# =============================================================================
+
+def parse_layers(text: str) -> List[int]:
+    return [int(units) for units in text.split(",") if units.strip()]
+
+
+def search_space(args) -> List[Dict[str, Any]]:
+    """Full grid, or ``--random`` configurations sampled from it without replacement"""
+    grid = [
+        {"layers": parse_layers(layers), "dropout": dropout, "batch_norm": batch_norm,
+         "learning_rate": learning_rate, "batch_size": batch_size}
+        for layers, dropout, batch_norm, learning_rate, batch_size in itertools.product(
+            args.layers, args.dropout, args.batch_norm, args.learning_rate, args.batch_size
+        )
+    ]
+    if args.random and args.random < len(grid):
+        grid = random.Random(args.seed).sample(grid, args.random)
+    return grid
+
+
+def prepare_data(dataset: str, validation_split: float = 0.2) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Notebook-identical split and scaling, done once for the whole sweep"""
+    columns = load_dataset(dataset)
+    x = np.column_stack([columns[column] for column in FEATURE_COLUMNS]).astype(np.float64)
+    y = np.asarray(columns[TARGET_COLUMN], dtype=np.float32)
+    train_idx, test_idx = training_split(len(x), y)
+
+    # Scale with the same pipeline the API serves with (the dataset is already min-max normalized)
+    standardization = fit_standardization(x[train_idx])
+    pipeline = FeaturePipeline.compile(None, standardization)
+    x_train = pipeline.transform(x[train_idx])
+    x_test = pipeline.transform(x[test_idx])
+    y_train, y_test = y[train_idx], y[test_idx]
+
+    # Keras' validation_split takes the last rows of the training data
+    n_fit = int(len(x_train) * (1 - validation_split))
+    arrays = {
+        "x_fit": x_train[:n_fit], "y_fit": y_train[:n_fit],
+        "x_val": x_train[n_fit:], "y_val": y_train[n_fit:],
+        "x_test": x_test, "y_test": y_test,
+    }
+    return arrays, standardization
+
+
+def write_leaderboard(results: List[Dict[str, Any]], output_dir: Path) -> List[Dict[str, Any]]:
+    """Rank by validation AUC (test metrics are reported, never used for selection)"""
+    ranked = sorted(results, key=lambda r: (-r["val_auc"], r["test_loss"]))
+    for rank, result in enumerate(ranked, 1):
+        result["rank"] = rank
+
+    with open(output_dir / "leaderboard.json", "w") as f:
+        json.dump(ranked, f, indent=2)
+    with open(output_dir / "leaderboard.csv", "w") as f:
+        f.write(",".join(LEADERBOARD_COLUMNS) + "\n")
+        for result in ranked:
+            row = dict(result, layers="-".join(str(u) for u in result["layers"]))
+            f.write(",".join(str(row.get(column, "")) for column in LEADERBOARD_COLUMNS) + "\n")
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a grid or random sweep of flood classifiers in parallel")
+    parser.add_argument("--dataset", default="../mapped_dataset_Normalized_version.csv")
+    parser.add_argument("--output", default="sweeps/latest", help="Directory for the leaderboard and trial artifacts")
+    parser.add_argument("--layers", nargs="+", default=["64,32", "128,64", "64,64,64"],
+                        help="Hidden layer sizes per architecture, e.g. 128,64")
+    parser.add_argument("--dropout", nargs="+", type=float, default=[0.3, 0.4])
+    parser.add_argument("--batch-norm", nargs="+", type=lambda v: v.lower() in ("1", "true", "yes"),
+                        default=[False], help="true/false values to try")
+    parser.add_argument("--learning-rate", nargs="+", type=float, default=[0.001])
+    parser.add_argument("--batch-size", nargs="+", type=int, default=[32])
+    parser.add_argument("--random", type=int, default=0, help="Sample this many configurations instead of the full grid")
+    parser.add_argument("--max-epochs", type=int, default=200)
+    parser.add_argument("--patience", type=int, default=10, help="Early-stopping patience in epochs")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    configs = search_space(args)
+    workers = min(args.workers or os.cpu_count() or 1, len(configs))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    arrays, standardization = prepare_data(args.dataset)
+    with open(output_dir / "Standardized_param.json", "w") as f:
+        json.dump(standardization, f, indent=4)
+    print(f"{len(configs)} trials on {workers} workers x {threads} threads; "
+          f"{len(arrays['x_fit'])} fit / {len(arrays['x_val'])} val / {len(arrays['x_test'])} test rows")
+
+    block, layout = share_arrays(arrays)
+    results = []
+    start = time.perf_counter()
+    try:
+        # spawn: TensorFlow is not fork-safe once initialized
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                 initializer=_attach_worker, initargs=(block.name, layout, threads)) as pool:
+            futures = {
+                pool.submit(run_trial, trial, config, str(output_dir), args.max_epochs, args.patience, args.seed): trial
+                for trial, config in enumerate(configs)
+            }
+            for future in as_completed(futures):
+                trial = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Trial {trial} failed: {e}", file=sys.stderr)
+                    continue
+                results.append(result)
+                print(f"Trial {trial:03d} {result['layers']} dropout={result['dropout']} "
+                      f"lr={result['learning_rate']} bs={result['batch_size']}: "
+                      f"val_auc={result['val_auc']:.4f} test_auc={result['test_auc']:.4f} "
+                      f"epochs={result['epochs_run']} ({result['seconds']:.1f}s)")
+    finally:
+        block.close()
+        block.unlink()
+
+    if not results:
+        raise SystemExit("No trial finished")
+    ranked = write_leaderboard(results, output_dir)
+    best = ranked[0]
+    print(f"\nSweep finished in {time.perf_counter() - start:.1f}s; leaderboard: {output_dir / 'leaderboard.csv'}")
+    print(f"Best: trial {best['trial']} val_auc={best['val_auc']:.4f} test_auc={best['test_auc']:.4f} -> {best['artifact']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Packed columnar binary format for machine-to-machine prediction traffic
+
+A request body (``application/x-flood-f32``) is a 12-byte header followed by
+the feature columns, everything little-endian:
+
+    offset  size        field
+    0       4           magic b"FLD1"
+    4       2           format version (1)
+    6       2           number of columns C (13, in REQUEST_FIELDS order)
+    8       4           number of rows N
+    12      4 * C * N   float32 values, column-major (all of column 0, then column 1, ...)
+
+``land_cover`` and ``soil_type`` hold their numeric codes (LAND_COVER_CODES,
+SOIL_TYPE_CODES). NaN in an optional column (population_density,
+historical_floods) means the value was omitted, like a missing JSON field.
+
+Responses use the same header with the magic b"FLP1" and two columns:
+the flood probability and the prediction (0.0 or 1.0).
+
+The whole payload is decoded with one ``np.frombuffer`` and validated a
+column at a time, so no per-row Python objects are created.
+"""
+import struct
+from typing import Any, Dict, List, Mapping, Sequence
+import numpy as np
+
+from feature_pipeline import REQUEST_FIELDS, N_FEATURES
+
+MEDIA_TYPE = "application/x-flood-f32"
+
+REQUEST_MAGIC = b"FLD1"
+RESPONSE_MAGIC = b"FLP1"
+WIRE_FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+
+# Row indices reported per invalid column
+MAX_REPORTED_ROWS = 10
+
+
+def payload_size(rows: int, columns: int = N_FEATURES) -> int:
+    """Bytes of a request payload carrying ``rows`` rows"""
+    return HEADER.size + 4 * columns * rows
+
+
+def declared_rows(body: bytes) -> int:
+    """Row count from the header of a (possibly partial) payload; -1 until the header is complete"""
+    if len(body) < HEADER.size:
+        return -1
+    return HEADER.unpack_from(body)[3]
+
+
+def decode(body: bytes) -> np.ndarray:
+    """Request payload -> raw (N, 13) float32 matrix; raises ValueError on a malformed payload"""
+    if len(body) < HEADER.size:
+        raise ValueError(f"Payload shorter than the {HEADER.size}-byte header")
+    magic, version, columns, rows = HEADER.unpack_from(body)
+    if magic != REQUEST_MAGIC:
+        raise ValueError(f"Bad magic {magic!r}; expected {REQUEST_MAGIC!r}")
+    if version != WIRE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version {version}; expected {WIRE_FORMAT_VERSION}")
+    if columns != N_FEATURES:
+        raise ValueError(f"Expected {N_FEATURES} columns ({', '.join(REQUEST_FIELDS)}), got {columns}")
+    expected = payload_size(rows, columns)
+    if len(body) != expected:
+        raise ValueError(f"Payload is {len(body)} bytes; header declares {rows} rows ({expected} bytes)")
+    block = np.frombuffer(body, dtype="<f4", count=columns * rows, offset=HEADER.size)
+    # One (writable) copy to the row-major native layout the pipeline transforms in place
+    return np.array(block.reshape(columns, rows).T, dtype=np.float32, order="C")
+
+
+def encode(columns: Sequence[np.ndarray], magic: bytes = RESPONSE_MAGIC) -> bytes:
+    """Equal-length columns -> header + column-major little-endian float32 block"""
+    rows = len(columns[0]) if columns else 0
+    block = np.empty((len(columns), rows), dtype="<f4")
+    for i, values in enumerate(columns):
+        block[i] = values
+    return HEADER.pack(magic, WIRE_FORMAT_VERSION, len(columns), rows) + block.tobytes()
+
+
+def validate_columns(matrix: np.ndarray, rules: Mapping[str, Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Check every column of a raw (N, 13) matrix against its rule at once.
+
+    A rule may set ``ge``/``le`` bounds, ``integer``, the allowed ``choices``
+    and whether NaN is allowed (``optional``). Returns one error per failing
+    column, with the number of bad rows and the first few row indices.
+    """
+    errors = []
+    for j, field in enumerate(REQUEST_FIELDS):
+        rule = rules.get(field, {})
+        values = matrix[:, j]
+        missing = np.isnan(values)
+        bad = np.zeros(len(values), dtype=bool) if rule.get("optional") else missing.copy()
+        with np.errstate(invalid="ignore"):
+            if rule.get("ge") is not None:
+                bad |= values < rule["ge"]
+            if rule.get("le") is not None:
+                bad |= values > rule["le"]
+            if rule.get("integer"):
+                bad |= ~missing & (values != np.round(values))
+            if rule.get("choices") is not None:
+                bad |= ~missing & ~np.isin(values, list(rule["choices"]))
+        bad |= np.isinf(values)
+        if bad.any():
+            rows = np.flatnonzero(bad)
+            errors.append({
+                "field": field,
+                "count": int(len(rows)),
+                "rows": rows[:MAX_REPORTED_ROWS].tolist(),
+                "rule": dict(rule),
+            })
+    return errors
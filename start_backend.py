@@ -5,6 +5,7 @@ Start the River Flood Prediction Backend API
 import subprocess
 import sys
 import os
+import importlib.util
 from pathlib import Path
 
 def main():
@@ -22,14 +23,12 @@ def main():
     # Change to backend directory
     os.chdir("backend")
     
-    # Check if requirements are installed
-    try:
-        import fastapi
-        import uvicorn
-        import tensorflow
+    # Check if requirements are installed (find_spec avoids importing heavy packages)
+    missing = [name for name in ("fastapi", "uvicorn", "numpy") if importlib.util.find_spec(name) is None]
+    if not missing:
         print("✓ Backend dependencies found")
-    except ImportError as e:
-        print(f"📦 Installing missing dependencies: {e}")
+    else:
+        print(f"📦 Installing missing dependencies: {', '.join(missing)}")
         subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
         print("✓ Dependencies installed")
     
@@ -64,15 +63,19 @@ def main():
     print("   Press Ctrl+C to stop the server")
     print("-" * 50)
     
-    # Start the server
-    try:
-        subprocess.run([
+    # Start the server (--production: pre-forked workers, no auto-reload)
+    if "--production" in sys.argv:
+        command = [sys.executable, "serve.py", "--port", "8001"]
+    else:
+        command = [
             sys.executable, "-m", "uvicorn", 
             "app:app", 
             "--host", "0.0.0.0", 
             "--port", "8001", 
             "--reload"
-        ])
+        ]
+    try:
+        subprocess.run(command)
     except KeyboardInterrupt:
         print("\n👋 Backend server stopped. Goodbye!")
 
@@ -5,34 +5,39 @@ Start the complete River Flood Prediction System (Backend + Frontend)
 import subprocess
 import sys
 import os
+import importlib.util
 import threading
 import time
 import webbrowser
 from pathlib import Path
 
-def start_backend():
+def start_backend(production=False):
     """Start the backend API server"""
     print("🔧 Starting Backend API...")
-    os.chdir("backend")
-    try:
-        subprocess.run([
+    if production:
+        # Pre-forked workers sharing the preloaded models (see backend/serve.py)
+        command = [sys.executable, "serve.py", "--port", "8001"]
+    else:
+        command = [
             sys.executable, "-m", "uvicorn", 
             "app:app", 
             "--host", "0.0.0.0", 
             "--port", "8001", 
             "--reload"
-        ])
+        ]
+    # cwd instead of os.chdir: both services start from threads of this process
+    try:
+        subprocess.run(command, cwd="backend")
     except KeyboardInterrupt:
         print("Backend stopped")
 
 def start_frontend():
     """Start the frontend web server"""
     print("🎨 Starting Frontend...")
-    os.chdir("frontend")
     try:
         subprocess.run([
             sys.executable, "-m", "http.server", "8080"
-        ])
+        ], cwd="frontend")
     except KeyboardInterrupt:
         print("Frontend stopped")
 
@@ -59,16 +64,13 @@ def main():
     
     # Check dependencies
     print("📦 Checking dependencies...")
-    try:
-        import fastapi
-        import uvicorn
-        import tensorflow
+    # find_spec checks availability without paying for the imports
+    missing = [name for name in ("fastapi", "uvicorn", "numpy") if importlib.util.find_spec(name) is None]
+    if not missing:
         print("✓ Backend dependencies found")
-    except ImportError:
+    else:
         print("📦 Installing backend dependencies...")
-        os.chdir("backend")
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        os.chdir("..")
+        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], cwd="backend")
         print("✓ Backend dependencies installed")
     
     # Check model files
@@ -96,7 +98,8 @@ def main():
     print("-" * 60)
     
     # Start backend in a separate thread
-    backend_thread = threading.Thread(target=start_backend, daemon=True)
+    production = "--production" in sys.argv
+    backend_thread = threading.Thread(target=start_backend, args=(production,), daemon=True)
     backend_thread.start()
     
     # Wait a bit for backend to start